@@ -0,0 +1,130 @@
+"""Shared helpers for the offline benchmark scripts.
+
+Each benchmark produces ``{"benchmark", "meta", "cases": {case: {metric: value}}}``
+JSON; ``--baseline`` compares the run against an earlier result file and exits
+non-zero when a metric regresses past ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+TASK_ROOT = Path(__file__).resolve().parent.parent
+if str(TASK_ROOT) not in sys.path:
+    sys.path.insert(0, str(TASK_ROOT))
+
+# Metric name suffixes and the direction that counts as a regression.
+LOWER_IS_BETTER = ("_us", "_ms", "_s")
+HIGHER_IS_BETTER = ("_hz", "_per_s")
+# Differences below timer resolution noise never count as regressions.
+MIN_DELTA_US = 1.0
+
+
+def summarize_us(samples_s: Any) -> dict[str, float]:
+    """Latency distribution of per-call durations (seconds in, microseconds out)."""
+    us = np.asarray(samples_s, dtype=np.float64) * 1e6
+    if us.size == 0:
+        return {}
+    p50, p95, p99 = np.percentile(us, [50, 95, 99])
+    return {
+        "n": int(us.size),
+        "mean_us": float(us.mean()),
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+        "max_us": float(us.max()),
+        "jitter_us": float(us.std()),
+    }
+
+
+def time_calls(func: Callable[[], Any], *, repeat: int, warmup: int = 10) -> np.ndarray:
+    """Per-call wall times of `func()` in seconds."""
+    for _ in range(warmup):
+        func()
+    out = np.empty(int(repeat), dtype=np.float64)
+    clock = time.perf_counter
+    for i in range(out.size):
+        t0 = clock()
+        func()
+        out[i] = clock() - t0
+    return out
+
+
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--out", type=Path, default=None, help="Write results JSON here.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare against an earlier results JSON.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown before a metric counts as a regression (default 0.25).",
+    )
+
+
+def _meta() -> dict[str, Any]:
+    meta: dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+    }
+    try:
+        from importlib.metadata import version
+
+        meta["psyflow"] = version("psyflow")
+    except Exception:
+        meta["psyflow"] = None
+    return meta
+
+
+def compare_to_baseline(
+    cases: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], *, tolerance: float
+) -> list[str]:
+    """Human-readable regressions of `cases` against `baseline` cases."""
+    regressions = []
+    for case, metrics in cases.items():
+        base = baseline.get(case)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+                continue
+            if metric.endswith(HIGHER_IS_BETTER):
+                if value < old * (1.0 - tolerance):
+                    regressions.append(f"{case}.{metric}: {old:.4g} -> {value:.4g} ({value / old - 1:.0%})")
+            elif metric.endswith("_us") and value - old < MIN_DELTA_US:
+                continue
+            elif metric.endswith(LOWER_IS_BETTER) and value > old * (1.0 + tolerance):
+                regressions.append(f"{case}.{metric}: {old:.4g} -> {value:.4g} (+{value / old - 1:.0%})")
+    return regressions
+
+
+def finish(name: str, cases: dict[str, dict[str, Any]], args: argparse.Namespace) -> int:
+    """Print and save results, run the baseline comparison; returns the process exit code."""
+    result = {"benchmark": name, "meta": _meta(), "cases": cases}
+    for case, metrics in cases.items():
+        shown = " ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in metrics.items())
+        print(f"[{name}] {case}: {shown}")
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(cases, baseline.get("cases", {}), tolerance=args.tolerance)
+    for line in regressions:
+        print(f"[{name}] REGRESSION {line}")
+    print(f"[{name}] baseline={args.baseline} regressions={len(regressions)}")
+    return 1 if regressions else 0
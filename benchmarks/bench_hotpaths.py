@@ -0,0 +1,321 @@
+"""Micro- and macro-benchmarks for the task hot paths.
+
+Usage::
+
+    python -m benchmarks.bench_hotpaths [--quick] [--only CASE ...]
+        [--out results.json] [--baseline old.json] [--tolerance 0.25]
+
+Micro cases time `build_eefrt_offer_conditions` (sequential and counter RNG)
+up to large `n_trials`, random access to one counter-based trial,
+`parse_offer_condition`, `TaskSamplerResponder.act` per phase, `act_batch`
+and `simulate_effort_via_responder` inside a sim runtime context. The macro
+case runs the full `run_trial` against a mock window, keyboard and StimBank
+with phase durations scaled down; it reports wall time and the overhead on
+top of the requested durations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from benchmarks._common import TASK_ROOT, add_common_args, finish, summarize_us, time_calls
+
+SIM_CONFIG = TASK_ROOT / "config" / "config_sampler_sim.yaml"
+PHASE_DURATIONS = (
+    "cue_duration",
+    "anticipation_duration",
+    "ready_duration",
+    "feedback_duration",
+    "reward_feedback_duration",
+    "iti_duration",
+)
+
+
+class MockWindow:
+    """Window stand-in: flips run `callOnFlip` callbacks and return the current time."""
+
+    def __init__(self, frame_s: float = 1.0 / 60.0) -> None:
+        self.monitorFramePeriod = frame_s
+        self.size = (1280, 720)
+        self.units = "pix"
+        self.color = "black"
+        self._on_flip: list[tuple[Callable[..., Any], tuple, dict]] = []
+        self.n_flips = 0
+
+    def callOnFlip(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        self._on_flip.append((func, args, kwargs))
+
+    def flip(self, clearBuffer: bool = True) -> float:
+        t = time.perf_counter()
+        callbacks, self._on_flip = self._on_flip, []
+        for func, args, kwargs in callbacks:
+            func(*args, **kwargs)
+        self.n_flips += 1
+        return t
+
+
+class _MockClock:
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+
+    def getTime(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def reset(self, newT: float = 0.0) -> None:
+        self._t0 = time.perf_counter() - newT
+
+
+class MockKeyboard:
+    """Keyboard stand-in with no physical presses (sim responders drive responses)."""
+
+    def __init__(self) -> None:
+        self.clock = _MockClock()
+
+    def getKeys(self, keyList: Any = None, waitRelease: bool = False, clear: bool = True) -> list:
+        return []
+
+    def clearEvents(self, eventType: Any = None) -> None:
+        return None
+
+
+class MockStim:
+    def __init__(self, name: str, text: str = "") -> None:
+        self.name = name
+        self.text = text
+
+    def draw(self) -> None:
+        return None
+
+
+class MockStimBank:
+    """`get`/`get_and_format` over the config's text templates, without GL."""
+
+    def __init__(self, stim_config: dict[str, Any]) -> None:
+        self._templates = {name: str((spec or {}).get("text", "")) for name, spec in stim_config.items()}
+        self._stims: dict[str, MockStim] = {}
+
+    def get(self, name: str) -> MockStim:
+        if name not in self._stims:
+            self._stims[name] = MockStim(name, self._templates.get(name, ""))
+        return self._stims[name]
+
+    def get_and_format(self, name: str, **format_kwargs: Any) -> MockStim:
+        return MockStim(name, self._templates.get(name, "").format(**format_kwargs))
+
+    def keys(self) -> list[str]:
+        return list(self._templates)
+
+
+@contextmanager
+def sim_runtime(cfg: dict[str, Any]) -> Iterator[Any]:
+    """Enter a psyflow sim runtime context with outputs in a temp dir."""
+    from psyflow import context_from_config, runtime_context
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sim_cfg = dict(cfg.get("sim_config") or {})
+        sim_cfg.update(output_dir=tmp, log_path=str(Path(tmp) / "sim_events.jsonl"))
+        ctx = context_from_config(task_dir=TASK_ROOT, config={**cfg, "sim_config": sim_cfg}, mode="sim")
+        with runtime_context(ctx):
+            yield ctx
+
+
+def _observation(phase: str, trial_id: int, valid_keys: list[str], factors: dict[str, Any]) -> Any:
+    from psyflow.sim import Observation
+
+    return Observation(
+        mode="sim",
+        trial_id=trial_id,
+        block_id="block_0",
+        phase=phase,
+        valid_keys=valid_keys,
+        deadline_s=1.0,
+        response_window_open=True,
+        response_window_s=1.0,
+        condition_id="bench",
+        task_factors=factors,
+        stim_id=phase,
+    )
+
+
+def bench_conditions(quick: bool) -> dict[str, dict[str, Any]]:
+    from src.counter_offers import build_counter_offer_conditions, counter_offer_condition
+    from src.utils import build_eefrt_offer_conditions, parse_offer_condition
+
+    cases = {}
+    sizes = (48, 10_000) if quick else (48, 10_000, 100_000)
+    for n in sizes:
+        repeat = max(3, min(500, 200_000 // n))
+        samples = time_calls(
+            lambda n=n: build_eefrt_offer_conditions(n, ["offer"], seed=1, enable_logging=False),
+            repeat=repeat,
+            warmup=2,
+        )
+        cases[f"build_conditions_n{n}"] = summarize_us(samples)
+        samples = time_calls(
+            lambda n=n: build_counter_offer_conditions(n, ["offer"], seed=1, enable_logging=False),
+            repeat=repeat,
+            warmup=2,
+        )
+        cases[f"build_conditions_counter_n{n}"] = summarize_us(samples)
+    last = sizes[-1]
+    cases[f"counter_condition_random_access_n{last}"] = summarize_us(
+        time_calls(
+            lambda: counter_offer_condition(last, n_trials=last, seed=1, block_idx=0),
+            repeat=2_000 if not quick else 500,
+        )
+    )
+    conditions = build_eefrt_offer_conditions(1_000, ["offer"], seed=1, enable_logging=False)
+    cycle = itertools.cycle(conditions)
+    cases["parse_offer_condition"] = summarize_us(
+        time_calls(lambda: parse_offer_condition(next(cycle)), repeat=20_000 if not quick else 5_000)
+    )
+    return cases
+
+
+def bench_responder(cfg: dict[str, Any], quick: bool) -> dict[str, dict[str, Any]]:
+    from responders import TaskSamplerResponder
+
+    kwargs = dict(((cfg.get("sim_config") or {}).get("responder") or {}).get("kwargs") or {})
+    responder = TaskSamplerResponder(**kwargs)
+    responder.start_session(None, np.random.default_rng(0))
+    repeat = 5_000 if quick else 20_000
+    offer = {
+        "offer_probability": 0.5,
+        "offer_hard_reward": 2.8,
+        "offer_easy_reward": 1.0,
+        "easy_required_presses": 30,
+        "hard_required_presses": 100,
+    }
+    observations = {
+        "offer_choice": _observation("offer_choice", 1, [responder.easy_key, responder.hard_key], offer),
+        "effort_execution_window": _observation(
+            "effort_execution_window", 1, [responder.effort_key], {"choice_option": "hard"}
+        ),
+        "continue": _observation("instruction_text", 1, ["space"], {}),
+    }
+    cases = {
+        f"sampler_act_{phase}": summarize_us(time_calls(lambda o=obs: responder.act(o), repeat=repeat))
+        for phase, obs in observations.items()
+    }
+
+    n_batch = 10_000
+    probs = np.full(n_batch, 0.5)
+    rewards = np.full(n_batch, 2.8)
+    rng = np.random.default_rng(0)
+    cases[f"sampler_act_batch_n{n_batch}"] = summarize_us(
+        time_calls(lambda: responder.act_batch(probs, rewards, rng=rng), repeat=50 if not quick else 10, warmup=2)
+    )
+    responder.end_session()
+    return cases
+
+
+def bench_simulate_effort(cfg: dict[str, Any], quick: bool) -> dict[str, dict[str, Any]]:
+    from src.utils import simulate_effort_via_responder
+
+    counter = itertools.count(1)
+    with sim_runtime(cfg):
+        samples = time_calls(
+            lambda: simulate_effort_via_responder(
+                trial_id=next(counter),
+                block_id="block_0",
+                condition_id="bench",
+                task_factors={"choice_option": "hard", "required_presses": 100},
+                effort_key="space",
+                deadline_s=21.0,
+            ),
+            repeat=2_000 if quick else 10_000,
+        )
+    return {"simulate_effort_via_responder": summarize_us(samples)}
+
+
+def bench_run_trial(cfg: dict[str, Any], quick: bool, duration_scale: float) -> dict[str, dict[str, Any]]:
+    from psyflow import TaskSettings, initialize_triggers
+
+    from src.run_trial import run_trial
+    from src.schedule import OfferSchedule
+
+    settings = TaskSettings.from_dict(cfg["task_config"])
+    settings.triggers = cfg["trigger_config"]
+    requested = 0.0
+    for key in PHASE_DURATIONS:
+        scaled = float(getattr(settings, key)) * duration_scale
+        setattr(settings, key, scaled)
+        requested += scaled
+    n_trials = 20 if quick else 100
+    schedule = OfferSchedule.build(
+        {**dict(cfg.get("condition_generation_config") or {}), "enable_logging": False},
+        condition_labels=["offer"],
+        trials_per_block=n_trials,
+        block_seeds=[1],
+    )
+    win, kb = MockWindow(), MockKeyboard()
+    stim_bank = MockStimBank(cfg["stim_config"])
+    trigger_runtime = initialize_triggers(mock=True)
+
+    wall = np.empty(n_trials, dtype=np.float64)
+    with sim_runtime(cfg):
+        for i, condition in enumerate(schedule.block(0)):
+            t0 = time.perf_counter()
+            run_trial(
+                win,
+                kb,
+                settings,
+                condition,
+                stim_bank=stim_bank,
+                trigger_runtime=trigger_runtime,
+                block_id="block_0",
+                block_idx=0,
+            )
+            wall[i] = time.perf_counter() - t0
+    trigger_runtime.close()
+    overhead = wall - requested
+    return {
+        "run_trial_wall": summarize_us(wall),
+        "run_trial_overhead": {**summarize_us(overhead), "flips_per_trial": win.n_flips / n_trials},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark EEfRT task hot paths.")
+    parser.add_argument("--config", type=Path, default=SIM_CONFIG, help="Sim config (responder, stimuli, timing).")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and smaller sizes.")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=("conditions", "responder", "simulate_effort", "run_trial"),
+        default=None,
+    )
+    parser.add_argument(
+        "--duration-scale",
+        type=float,
+        default=0.02,
+        help="Scale applied to phase durations in the run_trial case (default 0.02).",
+    )
+    add_common_args(parser)
+    args = parser.parse_args()
+
+    from psyflow import load_config
+
+    cfg = load_config(str(args.config), extra_keys=["condition_generation"])
+    groups: dict[str, Callable[[], dict[str, dict[str, Any]]]] = {
+        "conditions": lambda: bench_conditions(args.quick),
+        "responder": lambda: bench_responder(cfg, args.quick),
+        "simulate_effort": lambda: bench_simulate_effort(cfg, args.quick),
+        "run_trial": lambda: bench_run_trial(cfg, args.quick, args.duration_scale),
+    }
+    cases: dict[str, dict[str, Any]] = {}
+    for name in args.only or groups:
+        cases.update(groups[name]())
+    return finish("bench_hotpaths", cases, args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""Trigger path latency and throughput.
+
+Usage::
+
+    python -m benchmarks.bench_triggers [--config config/config.yaml] [--n 2000]
+        [--out results.json] [--baseline old.json]
+
+Drives every code in the config's trigger map through the mock runtime
+(`initialize_triggers(mock=True)`, as in qa/sim), the configured driver
+(`serial_url` on `loop://`, offline) and the async front end over that driver.
+Each runtime is driven at a frame-paced "realistic" rate and as a back-to-back
+burst; cases report per-send latency percentiles, jitter and throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from benchmarks._common import TASK_ROOT, add_common_args, finish, summarize_us
+from src.triggers import AsyncTriggerRuntime
+
+
+def _wait_until(deadline: float) -> None:
+    remaining = deadline - time.perf_counter()
+    if remaining > 0.002:
+        time.sleep(remaining - 0.002)
+    while time.perf_counter() < deadline:
+        pass
+
+
+def drive(runtime: Any, codes: list[int], *, n: int, interval_s: float) -> dict[str, Any]:
+    """Send `n` codes (cycling the map) `interval_s` apart (0 = burst); time each `send()`."""
+    lat = np.empty(n, dtype=np.float64)
+    clock = time.perf_counter
+    start = clock()
+    for i in range(n):
+        if interval_s > 0:
+            _wait_until(start + i * interval_s)
+        t0 = clock()
+        runtime.send(codes[i % len(codes)])
+        lat[i] = clock() - t0
+    elapsed = clock() - start
+    out = summarize_us(lat)
+    out["throughput_hz"] = n / elapsed if elapsed > 0 else float("inf")
+    if isinstance(runtime, AsyncTriggerRuntime):
+        # time until the sender thread has written everything
+        runtime.flush(timeout=60.0)
+        delivered = clock() - start
+        records = runtime.drain()
+        e2e = [r["done_t"] - r["enqueue_t"] for r in records]
+        out["delivered_hz"] = len(records) / delivered if delivered > 0 else float("inf")
+        out.update({f"e2e_{k}": v for k, v in summarize_us(e2e).items() if k != "n"})
+        out["errors"] = sum(1 for r in records if r["error"])
+    return out
+
+
+def _runtimes(config_path: str) -> dict[str, Callable[[], Any]]:
+    from psyflow import initialize_triggers, load_config
+
+    cfg = load_config(config_path)
+    return {
+        "mock": lambda: initialize_triggers(mock=True),
+        "driver": lambda: initialize_triggers(cfg),
+        "async_driver": lambda: AsyncTriggerRuntime(initialize_triggers(cfg)),
+    }
+
+
+def trigger_codes(config_path: str) -> list[int]:
+    from psyflow import load_config
+
+    cfg = load_config(config_path)
+    return [int(code) for code in cfg["trigger_config"].values() if code is not None]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark trigger send latency and throughput.")
+    parser.add_argument("--config", default=str(TASK_ROOT / "config" / "config.yaml"))
+    parser.add_argument("--n", type=int, default=2000, help="Sends per burst case.")
+    parser.add_argument("--n-paced", type=int, default=300, help="Sends per realistic (frame-paced) case.")
+    parser.add_argument("--interval-ms", type=float, default=1000.0 / 60.0, help="Realistic inter-send interval.")
+    parser.add_argument("--runtimes", nargs="+", default=["mock", "driver", "async_driver"])
+    add_common_args(parser)
+    args = parser.parse_args()
+
+    codes = trigger_codes(args.config)
+    factories = _runtimes(args.config)
+    cases: dict[str, dict[str, Any]] = {}
+    for name in args.runtimes:
+        try:
+            runtime = factories[name]()
+        except Exception as exc:  # e.g. pyserial missing for the loop:// driver
+            print(f"[bench_triggers] skip {name}: {exc!r}")
+            continue
+        try:
+            drive(runtime, codes, n=min(50, args.n), interval_s=0.0)  # warm-up
+            cases[f"{name}_realistic"] = drive(runtime, codes, n=args.n_paced, interval_s=args.interval_ms / 1e3)
+            cases[f"{name}_burst"] = drive(runtime, codes, n=args.n, interval_s=0.0)
+        finally:
+            runtime.close()
+    return finish("bench_triggers", cases, args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
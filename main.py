@@ -1,27 +1,35 @@
+from __future__ import annotations
+
+import time
+
+# Launch reference for the startup report, taken before any other import.
+LAUNCH_T = time.perf_counter()
+
+import argparse
+import itertools
+import sys
 from contextlib import nullcontext
 from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-from psychopy import core
+# Task modules below only need numpy; psychopy/psyflow load on the path that uses them.
+from src.adaptive import offer_designer
+from src.event_log import install_buffered_log
+from src.frame_timing import FrameTimer, frame_report_path
+from src.presses import EffortPressLog, press_log_path
+from src.qa_acceptance import AcceptanceValidator, acceptance_report_path
+from src.resume import ResumeState
+from src.schedule import session_schedule
+from src.startup import LazyPreloader, StartupTimer, idle_scope, startup_report_path
+from src.stats import OfferStatsAccumulator, summary_path
+from src.stim_cache import CachedStimBank
+from src.trial_writer import TrialStreamWriter, stream_path
+from src.triggers import AsyncTriggerRuntime
+from src.virtual_clock import FastForward
 
-from psyflow import (
-    BlockUnit,
-    StimBank,
-    StimUnit,
-    SubInfo,
-    TaskRunOptions,
-    TaskSettings,
-    context_from_config,
-    count_down,
-    initialize_exp,
-    initialize_triggers,
-    load_config,
-    parse_task_run_options,
-    runtime_context,
-)
-
-from src import build_eefrt_offer_conditions, run_trial
+if TYPE_CHECKING:
+    from psyflow import TaskRunOptions
 
 
 MODES = ("human", "qa", "sim")
@@ -32,17 +40,157 @@ DEFAULT_CONFIG_BY_MODE = {
 }
 
 
-def run(options: TaskRunOptions):
+def parse_task_flags(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """Split EEfRT-specific flags from the arguments psyflow parses."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="sim mode only: run the windowless engine (src/headless.py) instead of PsychoPy.",
+    )
+    parser.add_argument(
+        "--virtual-clock",
+        action="store_true",
+        help="qa/sim only: advance phase durations, deadlines and responder RTs on a virtual clock (no real-time waits).",
+    )
+    parser.add_argument(
+        "--resume",
+        type=Path,
+        default=None,
+        metavar="RESULT_FILE",
+        help="Continue an interrupted session from its results (.stream.jsonl or .csv); not with --headless.",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print import and initialization timings (config, triggers, window, StimBank, first flip).",
+    )
+    return parser.parse_known_args(argv)
+
+
+def stream_trials(
+    trial_func,
+    writer: TrialStreamWriter,
+    block_id: str,
+    start_index: int = 0,
+    stats: OfferStatsAccumulator | None = None,
+    triggers: AsyncTriggerRuntime | None = None,
+    validator: AcceptanceValidator | None = None,
+):
+    """Wrap a block's trial function so each row hits the stream as soon as it returns.
+
+    Adds the `trial_index`/`block_id`/`condition` columns `BlockUnit` appends
+    after the call, so streamed rows match the in-memory ones, plus the trial's
+    trigger latency columns in async dispatch mode (sends between trials, such
+    as exp/block onsets, are logged and left out of both the columns and the
+    acceptance trigger count), feeds the session
+    statistics accumulator and, in QA, checks the row against the acceptance
+    criteria (the failing row is still streamed).
+    """
+    from psychopy import logging
+
+    trial_counter = itertools.count(start_index)
+
+    def run_streamed(win, kb, settings, condition, **kwargs):
+        if triggers is not None:
+            outside = triggers.begin_trial()
+            if outside:
+                logging.data(f"[EEfRTTriggers] between_trials codes={[r['code'] for r in outside]}")
+        if validator is not None:
+            validator.begin_trial()
+        row = trial_func(win, kb, settings, condition, **kwargs)
+        row.update({"trial_index": next(trial_counter), "block_id": block_id, "condition": condition})
+        if triggers is not None:
+            row.update(triggers.trial_columns())
+        writer.write(row)
+        if validator is not None:
+            validator.check_row(row)
+        if stats is not None:
+            stats.add(row)
+            logging.data(stats.monitor_line())
+        return row
+
+    return run_streamed
+
+
+def run_headless(options: TaskRunOptions, cfg: dict, startup: StartupTimer) -> None:
+    """Run sim mode without a window, StimBank or frame loop."""
+    with startup.phase("import_headless"):
+        from src.headless import run_headless_session
+
+    task_root = Path(__file__).resolve().parent
+    press_log = EffortPressLog()
+    stats = OfferStatsAccumulator()
+    writers: list[TrialStreamWriter] = []
+
+    def open_stream(settings) -> None:
+        settings.save_to_json()
+        writers.append(TrialStreamWriter(stream_path(settings.res_file)))
+
+    with startup.phase("headless_session"):
+        settings, all_data = run_headless_session(
+            cfg,
+            task_root=task_root,
+            press_log=press_log,
+            on_settings=open_stream,
+            on_trial=lambda row: (writers[0].write(row), stats.add(row)),
+        )
+    writers[0].finalize_csv(settings.res_file)
+    stats.write_summary_csv(summary_path(settings.res_file))
+    press_log.save(press_log_path(settings.res_file))
+    print(f"[EEfRT] headless trials={len(all_data)} results={settings.res_file}")
+
+
+def run(options: TaskRunOptions, flags: argparse.Namespace | None = None, startup: StartupTimer | None = None):
     """Run EEfRT task in human/qa/sim mode with one auditable flow."""
+    flags = flags or argparse.Namespace(headless=False, virtual_clock=False, resume=None, profile_startup=False)
+    startup = startup or StartupTimer(LAUNCH_T)
     task_root = Path(__file__).resolve().parent
-    cfg = load_config(str(options.config_path), extra_keys=["condition_generation"])
+    with startup.phase("config_load"):
+        from psyflow import load_config
+
+        cfg = load_config(str(options.config_path), extra_keys=["condition_generation"])
     print(f"[EEfRT] mode={options.mode} config={options.config_path}")
+    if flags.headless:
+        if options.mode != "sim":
+            raise ValueError("--headless is only supported in sim mode")
+        if flags.resume is not None:
+            raise ValueError("--resume is not supported with --headless; re-run the headless session instead")
+        run_headless(options, cfg, startup)
+        if flags.profile_startup:
+            print(startup.format_profile())
+        return
+    if flags.virtual_clock and options.mode not in ("qa", "sim"):
+        raise ValueError("--virtual-clock is only supported in qa/sim mode")
+    with startup.phase("import_window_stack"):
+        from psychopy import core, logging
+        from psyflow import (
+            BlockUnit,
+            StimBank,
+            StimUnit,
+            SubInfo,
+            TaskSettings,
+            context_from_config,
+            count_down,
+            initialize_exp,
+            initialize_triggers,
+            next_trial_id,
+            runtime_context,
+        )
+
+        from src.run_trial import prewarm_offer_stims, run_trial
+    resume = ResumeState.load(flags.resume) if flags.resume is not None else None
+    if resume is not None:
+        print(f"[EEfRT] resume={resume.source} completed_trials={len(resume.done)} reward={resume.total_reward:.2f}")
 
     output_dir: Path | None = None
     runtime_scope = nullcontext()
     runtime_ctx = None
+    event_log = None
     if options.mode in ("qa", "sim"):
-        runtime_ctx = context_from_config(task_dir=task_root, config=cfg, mode=options.mode)
+        with startup.phase("runtime_context"):
+            runtime_ctx = context_from_config(task_dir=task_root, config=cfg, mode=options.mode)
+            event_log = install_buffered_log(runtime_ctx, cfg.get("sim_config"), append=resume is not None)
         output_dir = runtime_ctx.output_dir
         runtime_scope = runtime_context(runtime_ctx)
 
@@ -72,102 +220,218 @@ def run(options: TaskRunOptions):
         settings.triggers = cfg["trigger_config"]
         settings.condition_generation = cfg.get("condition_generation_config", {})
         settings.save_to_json()
-        trigger_runtime = initialize_triggers(mock=True) if options.mode in ("qa", "sim") else initialize_triggers(cfg)
+        validator = None
+        if options.mode == "qa":
+            qa_cfg = cfg.get("qa_config") or dict((cfg.get("raw") or {}).get("qa") or {})
+            validator = AcceptanceValidator.from_config(
+                qa_cfg.get("acceptance_criteria"),
+                trigger_map=settings.triggers,
+                report_path=acceptance_report_path(settings.res_file),
+            )
+        with startup.phase("schedule"):
+            schedule, schedule_source = session_schedule(settings, settings.condition_generation, task_root=task_root)
+        logging.data(f"[EEfRTSchedule] {schedule_source} key={schedule.key[:16]} blocks={schedule.n_blocks}")
+        designer = offer_designer(settings, settings.condition_generation)
+        if designer is not None:
+            logging.data(f"[EEfRTAdaptive] offers={len(designer.offers)} particles={designer.weights.shape[0]}")
+        with startup.phase("triggers"):
+            trigger_runtime = initialize_triggers(mock=True) if options.mode in ("qa", "sim") else initialize_triggers(cfg)
+            if validator is not None:
+                trigger_runtime = validator.watch(trigger_runtime)
+            if str(getattr(settings, "trigger_dispatch", "sync")).lower() == "async":
+                trigger_runtime = AsyncTriggerRuntime(trigger_runtime)
 
-        win, kb = initialize_exp(settings)
+        with startup.phase("window"):
+            win, kb = initialize_exp(settings)
+        startup.mark("window_ready")
+        fast_forward = None
+        if flags.virtual_clock:
+            frame_s = float(getattr(win, "monitorFramePeriod", None) or (1.0 / 60.0))
+            fast_forward = FastForward(frame_s=frame_s).install(win, kb)
 
-        stim_bank = StimBank(win, cfg["stim_config"])
+        with startup.phase("stim_bank"):
+            stim_bank = StimBank(win, cfg["stim_config"])
         if options.mode not in ("qa", "sim"):
-            stim_bank = stim_bank.convert_to_voice("instruction_text")
-        stim_bank = stim_bank.preload_all()
+            # The voice plays with the first screen, so it cannot be deferred past it. With
+            # assets/instruction_text_voice.mp3 present this only registers the Sound; TTS
+            # (network) runs only when the asset is missing. Timed separately in the profile.
+            with startup.phase("instruction_voice"):
+                stim_bank = stim_bank.convert_to_voice("instruction_text")
+        with startup.phase("stim_preload"):
+            preload_mode = str(getattr(settings, "stim_preload", "eager")).lower()
+            preloader = None
+            if preload_mode == "lazy":
+                first_screen = [name for name in ("instruction_text", "instruction_text_voice") if stim_bank.has(name)]
+                for name in first_screen:
+                    stim_bank.get(name)
+                rest = [name for name in stim_bank.keys() if name not in first_screen]
+                preloader = LazyPreloader(win, stim_bank, rest, timer=startup)
+            else:
+                stim_bank = stim_bank.preload_all()
+            cache_size = int(getattr(settings, "stim_cache_size", 64) or 0)
+            if cache_size > 0:
+                stim_bank = CachedStimBank(stim_bank, maxsize=cache_size)
+        startup.mark("stims_ready")
+        startup.info.update(mode=options.mode, stim_preload=preload_mode)
 
         trigger_runtime.send(settings.triggers.get("exp_onset"))
         instr = StimUnit("instruction_text", win, kb, runtime=trigger_runtime).add_stim(stim_bank.get("instruction_text"))
         if options.mode not in ("qa", "sim"):
             instr.add_stim(stim_bank.get("instruction_text_voice"))
-        instr.wait_and_continue()
+        startup.mark_first_flip(win)
+        with idle_scope(preloader):
+            instr.wait_and_continue()
+        logging.data(f"[EEfRTStartup] {startup.report()}")
+        print(f"[EEfRT] startup launch_to_first_flip={startup.marks.get('first_flip', float('nan')):.3f}s preload={preload_mode}")
+        if flags.profile_startup:
+            print(startup.format_profile())
 
-        all_data: list[dict] = []
-        cg_cfg = dict(getattr(settings, "condition_generation", {}) or {})
-        for block_i in range(settings.total_blocks):
-            if options.mode not in ("qa", "sim"):
-                count_down(win, 3, color="black")
-
-            block = (
-                BlockUnit(
-                    block_id=f"block_{block_i}",
+        stats = OfferStatsAccumulator()
+        res_stream = stream_path(settings.res_file)
+        writer = TrialStreamWriter(
+            res_stream,
+            resume=resume is not None and resume.source.resolve() == res_stream.resolve(),
+        )
+        if resume is not None:
+            # Completed trials count toward summaries and the final CSV.
+            for row in resume.rows:
+                stats.add(row)
+            if validator is not None:
+                validator.n_trials = len(resume.rows)
+            if resume.source.resolve() != writer.path.resolve():
+                for row in resume.rows:
+                    writer.write(row)
+            if designer is not None:
+                designer.replay(resume.rows)
+        press_log = EffortPressLog()
+        if resume is not None:
+            press_log = EffortPressLog.for_resume(press_log_path(settings.res_file), resume.rows)
+            # psyflow numbers trials from 1 per session; continue after the completed ones
+            last_trial_id = max(len(resume.rows), press_log.max_trial_id)
+            # each call consumes an id, so only advance when trials were completed
+            if last_trial_id > 0:
+                while next_trial_id() < last_trial_id:
+                    pass
+        frame_timer = FrameTimer(win) if bool(getattr(settings, "frame_timing_report", False)) else None
+        try:
+            for block_i in range(settings.total_blocks):
+                block_id = f"block_{block_i}"
+                block = BlockUnit(
+                    block_id=block_id,
                     block_idx=block_i,
                     settings=settings,
                     window=win,
                     keyboard=kb,
-                )
-                .generate_conditions(
-                    func=build_eefrt_offer_conditions,
-                    condition_labels=list(getattr(settings, "conditions", ["offer"])),
-                    probability_levels=list(cg_cfg.get("probability_levels", [0.12, 0.50, 0.88])),
-                    hard_reward_levels=list(cg_cfg.get("hard_reward_levels", [1.24, 1.68, 2.11, 2.55, 2.99, 3.43, 3.86, 4.30])),
-                    randomize_order=bool(cg_cfg.get("randomize_order", True)),
-                    no_choice_hard_prob=float(cg_cfg.get("no_choice_hard_prob", 0.50)),
-                    enable_logging=bool(cg_cfg.get("enable_logging", True)),
-                )
-                .on_start(lambda b: trigger_runtime.send(settings.triggers.get("block_onset")))
-                .on_end(lambda b: trigger_runtime.send(settings.triggers.get("block_end")))
-                .run_trial(
-                    partial(
-                        run_trial,
-                        stim_bank=stim_bank,
-                        trigger_runtime=trigger_runtime,
-                        block_id=f"block_{block_i}",
-                        block_idx=block_i,
+                ).add_condition(schedule.block(block_i))
+                resumed_trials = 0
+                if resume is not None:
+                    resumed_trials = len(resume.block_rows(block_id))
+                    block.conditions = resume.remaining(block_id, list(block.conditions))
+                    if not block.conditions:
+                        continue
+                if isinstance(stim_bank, CachedStimBank):
+                    offers = block.conditions if designer is None else designer.candidate_conditions()
+                    prewarm_offer_stims(win, settings, offers, stim_bank)
+
+                if options.mode not in ("qa", "sim"):
+                    count_down(win, 3, color="black")
+                if frame_timer is not None:
+                    frame_timer.begin_block()
+                block = (
+                    block.on_start(lambda b: trigger_runtime.send(settings.triggers.get("block_onset")))
+                    .on_end(lambda b: trigger_runtime.send(settings.triggers.get("block_end")))
+                    .run_trial(
+                        partial(
+                            stream_trials(
+                                run_trial,
+                                writer,
+                                block_id,
+                                start_index=resumed_trials,
+                                stats=stats,
+                                triggers=trigger_runtime if isinstance(trigger_runtime, AsyncTriggerRuntime) else None,
+                                validator=validator,
+                            ),
+                            stim_bank=stim_bank,
+                            trigger_runtime=trigger_runtime,
+                            block_id=block_id,
+                            block_idx=block_i,
+                            press_log=press_log,
+                            frame_timer=frame_timer,
+                            stim_preloader=preloader,
+                            offer_designer=designer,
+                        )
                     )
                 )
-                .to_dict(all_data)
-            )
 
-            block_trials = block.get_all_data()
-            n_block = max(1, len(block_trials))
-            hard_rate = sum(1 for trial in block_trials if trial.get("choice_option") == "hard") / n_block
-            completion_rate = sum(1 for trial in block_trials if trial.get("effort_completed", False)) / n_block
-            total_reward = sum(float(trial.get("reward_amount", 0.0) or 0.0) for trial in block_trials)
-            StimUnit("block", win, kb, runtime=trigger_runtime).add_stim(
+                # keep the side-car current so an interrupted session can resume from it
+                press_log.save(press_log_path(settings.res_file))
+                block_summary = stats.block_summary(block_id)
+                logging.data(f"[EEfRTStats] {block_id} {block_summary}")
+                StimUnit("block", win, kb, runtime=trigger_runtime).add_stim(
+                    stim_bank.get_and_format(
+                        "block_break",
+                        block_num=block_i + 1,
+                        total_blocks=settings.total_blocks,
+                        hard_rate=block_summary["hard_rate"],
+                        completion_rate=block_summary["completion_rate"],
+                        total_reward=f"{block_summary['total_reward']:.2f}",
+                    )
+                ).wait_and_continue()
+
+            final = stats.session_summary()
+            StimUnit("goodbye", win, kb, runtime=trigger_runtime).add_stim(
                 stim_bank.get_and_format(
-                    "block_break",
-                    block_num=block_i + 1,
-                    total_blocks=settings.total_blocks,
-                    hard_rate=hard_rate,
-                    completion_rate=completion_rate,
-                    total_reward=f"{total_reward:.2f}",
+                    "good_bye",
+                    total_reward=f"{final['total_reward']:.2f}",
+                    hard_rate=f"{final['hard_rate']:.1%}",
+                    completion_rate=f"{final['completion_rate']:.1%}",
                 )
-            ).wait_and_continue()
-
-        final_reward = sum(float(trial.get("reward_amount", 0.0) or 0.0) for trial in all_data)
-        n_all = max(1, len(all_data))
-        final_hard_rate = sum(1 for trial in all_data if trial.get("choice_option") == "hard") / n_all
-        final_completion_rate = sum(1 for trial in all_data if trial.get("effort_completed", False)) / n_all
-        StimUnit("goodbye", win, kb, runtime=trigger_runtime).add_stim(
-            stim_bank.get_and_format(
-                "good_bye",
-                total_reward=f"{final_reward:.2f}",
-                hard_rate=f"{final_hard_rate:.1%}",
-                completion_rate=f"{final_completion_rate:.1%}",
-            )
-        ).wait_and_continue(terminate=True)
+            ).wait_and_continue(terminate=True)
 
-        trigger_runtime.send(settings.triggers.get("exp_end"))
-        pd.DataFrame(all_data).to_csv(settings.res_file, index=False)
-        trigger_runtime.close()
+            trigger_runtime.send(settings.triggers.get("exp_end"))
+            writer.finalize_csv(settings.res_file)
+            stats.write_summary_csv(summary_path(settings.res_file))
+            if frame_timer is not None:
+                frame_timer.write_report(frame_report_path(settings.res_file))
+            if isinstance(stim_bank, CachedStimBank):
+                logging.data(f"[EEfRTStimCache] {stim_bank.stats()}")
+            if preloader is not None:
+                startup.info.update(stims_warmed=preloader.n_warmed, stims_pending=len(preloader.pending))
+            startup.write_report(startup_report_path(settings.res_file))
+            if validator is not None:
+                validator.finish()
+                print(f"[EEfRT] qa acceptance passed trials={validator.n_trials}")
+            if fast_forward is not None:
+                logging.data(f"[EEfRTVirtualClock] simulated_s={fast_forward.clock.now():.3f} flips={fast_forward.n_flips}")
+                print(f"[EEfRT] virtual_clock simulated={fast_forward.clock.now():.1f}s flips={fast_forward.n_flips}")
+        finally:
+            # also on the QA fail-fast path (QAAcceptanceError) or an aborted run: keep the
+            # stream for --resume, write the partial CSV, save the side-car and stop the trigger thread
+            if writer.path.exists():
+                writer.finalize_csv(settings.res_file, remove_stream=False)
+            press_log.save(press_log_path(settings.res_file))
+            if fast_forward is not None:
+                fast_forward.uninstall()
+            if event_log is not None:
+                event_log.close()
+            trigger_runtime.close()
         core.quit()
 
 
 def main() -> None:
+    startup = StartupTimer(LAUNCH_T)
+    startup.mark("main_entered")
     task_root = Path(__file__).resolve().parent
+    flags, sys.argv[1:] = parse_task_flags(sys.argv[1:])
+    with startup.phase("import_psyflow"):
+        from psyflow import parse_task_run_options
     options = parse_task_run_options(
         task_root=task_root,
         description="Run EEfRT Task in human/qa/sim mode.",
         default_config_by_mode=DEFAULT_CONFIG_BY_MODE,
         modes=MODES,
     )
-    run(options)
+    run(options, flags, startup)
 
 
 if __name__ == "__main__":
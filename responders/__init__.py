@@ -1,5 +1,5 @@
 """Task-specific responders/samplers for simulation mode."""
 
-from .task_sampler import TaskSamplerResponder
+from .task_sampler import PressBatch, SamplerBatch, TaskSamplerResponder
 
-__all__ = ["TaskSamplerResponder"]
+__all__ = ["PressBatch", "SamplerBatch", "TaskSamplerResponder"]
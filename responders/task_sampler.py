@@ -5,15 +5,76 @@ import math
 import random as _py_random
 from typing import Any
 
+import numpy as np
 from psyflow.sim.contracts import Action, Feedback, Observation, SessionInfo
 
 
+# Parameters a population simulation may vary per agent in `act_batch`.
+BATCH_PARAM_FIELDS = (
+    "lapse_rate",
+    "choice_rt_mean_s",
+    "choice_rt_sd_s",
+    "hard_choice_bias",
+    "hard_choice_reward_weight",
+    "hard_choice_prob_weight",
+    "hard_choice_effort_weight",
+    "base_press_rate_hz",
+    "hard_press_rate_penalty_hz",
+    "press_rate_sd_hz",
+)
+
+
+@dataclass
+class SamplerBatch:
+    """Vectorized sampler output for N agents/offers.
+
+    `choice` is 1 (hard), 0 (easy) or -1 (choice lapse, no key);
+    `rt_s` and `press_rate_hz` are NaN where the respective phase lapsed.
+    """
+
+    choice: np.ndarray
+    rt_s: np.ndarray
+    p_hard: np.ndarray
+    press_rate_hz: np.ndarray
+
+
+# Renewal effort-model parameters `simulate_presses` may vary per agent.
+PRESS_PARAM_FIELDS = (
+    "press_ipi_cv",
+    "warmup_slowdown",
+    "warmup_presses",
+    "fatigue_per_press",
+    "first_press_rt_mean_s",
+    "first_press_rt_sd_s",
+)
+
+
+@dataclass
+class PressBatch:
+    """Outcome of N simulated effort windows under the renewal press model.
+
+    `first_rt_s`/`time_to_criterion_s` are NaN where no press / no completion;
+    `times_s` is the (N, max required presses) NaN-padded timeline when requested.
+    """
+
+    press_count: np.ndarray
+    completed: np.ndarray
+    first_rt_s: np.ndarray
+    time_to_criterion_s: np.ndarray
+    times_s: np.ndarray | None = None
+
+
 @dataclass
 class TaskSamplerResponder:
     """Task-specific EEfRT sampler responder.
 
     - `offer_choice` phase: choose easy/hard option from utility model.
     - `effort_execution_window` phase: provide effort key with press-rate metadata.
+      With `effort_model="renewal"` the window is simulated press by press:
+      gamma inter-press intervals (CV `press_ipi_cv`) around the sampled rate,
+      slowed by a warm-up that decays over `warmup_presses` and by a
+      multiplicative fatigue drift per press. The full timeline goes into the
+      action meta as `press_times_s`.
     - Other phases: provide quick continue key if valid.
     """
 
@@ -34,6 +95,14 @@ class TaskSamplerResponder:
     hard_press_rate_penalty_hz: float = 1.2
     press_rate_sd_hz: float = 0.8
 
+    effort_model: str = "rate"  # rate | renewal
+    press_ipi_cv: float = 0.15
+    warmup_slowdown: float = 0.4
+    warmup_presses: float = 4.0
+    fatigue_per_press: float = 0.003
+    first_press_rt_mean_s: float = 0.35
+    first_press_rt_sd_s: float = 0.08
+
     min_rt_s: float = 0.08
     continue_rt_s: float = 0.2
 
@@ -45,6 +114,14 @@ class TaskSamplerResponder:
         self.base_press_rate_hz = max(0.1, float(self.base_press_rate_hz))
         self.hard_press_rate_penalty_hz = max(0.0, float(self.hard_press_rate_penalty_hz))
         self.press_rate_sd_hz = max(1e-6, float(self.press_rate_sd_hz))
+        self.effort_model = str(self.effort_model).strip().lower()
+        if self.effort_model not in ("rate", "renewal"):
+            raise ValueError(f"Unsupported effort_model {self.effort_model!r}; expected 'rate' or 'renewal'")
+        self.press_ipi_cv = max(1e-3, float(self.press_ipi_cv))
+        self.warmup_slowdown = max(0.0, float(self.warmup_slowdown))
+        self.warmup_presses = max(1e-6, float(self.warmup_presses))
+        self.fatigue_per_press = float(self.fatigue_per_press)
+        self.first_press_rt_sd_s = max(1e-6, float(self.first_press_rt_sd_s))
         self.min_rt_s = max(0.01, float(self.min_rt_s))
         self.continue_rt_s = max(self.min_rt_s, float(self.continue_rt_s))
 
@@ -134,6 +211,8 @@ class TaskSamplerResponder:
         if choice_option == "hard":
             base_rate -= self.hard_press_rate_penalty_hz
         sampled_rate = max(0.3, self._normal(base_rate, self.press_rate_sd_hz))
+        if self.effort_model == "renewal":
+            return self._renewal_action(obs, effort_key, phase, choice_option, sampled_rate)
         rt = max(self.min_rt_s, 1.0 / sampled_rate)
 
         return Action(
@@ -147,6 +226,195 @@ class TaskSamplerResponder:
             },
         )
 
+    def _np_rng(self) -> np.random.Generator:
+        if isinstance(self._rng, np.random.Generator):
+            return self._rng
+        # Derive a generator from the session stream so runs stay reproducible.
+        return np.random.default_rng(int(self._random() * 2**32))
+
+    def _renewal_action(
+        self, obs: Observation, effort_key: str, phase: str, choice_option: str, sampled_rate: float
+    ) -> Action:
+        factors = dict(obs.task_factors or {})
+        required = int(factors.get("required_presses", 0) or 0)
+        deadline = float(obs.deadline_s if obs.deadline_s is not None else factors.get("effort_deadline_s", 0.0))
+        batch = self.simulate_presses(sampled_rate, required, deadline, rng=self._np_rng(), return_times=True)
+        count = int(batch.press_count[0])
+        times = batch.times_s[0, :count]
+        meta = {
+            "source": "eefrt_sampler",
+            "phase": phase,
+            "effort_model": "renewal",
+            "press_rate_hz": sampled_rate,
+            "choice_option": choice_option,
+            "press_count": count,
+            "press_times_s": [round(float(t), 4) for t in times],
+        }
+        if count == 0:
+            return Action(key=None, rt_s=None, meta={**meta, "outcome": "no_press"})
+        return Action(key=effort_key, rt_s=float(times[0]), meta=meta)
+
+    def simulate_presses(
+        self,
+        press_rate_hz: Any,
+        required_presses: Any,
+        deadline_s: Any,
+        *,
+        params: dict[str, Any] | None = None,
+        rng: np.random.Generator | None = None,
+        chunk_size: int = 65536,
+        return_times: bool = False,
+    ) -> PressBatch:
+        """Renewal-process press timelines for N effort windows, in chunks of `chunk_size`.
+
+        Inputs broadcast to a common length N (NaN rates, e.g. effort lapses from
+        `act_batch`, produce no presses). Press i >= 1 follows the previous one
+        after `gamma(mean=1, cv=press_ipi_cv) * warmup(i) * (1 + fatigue_per_press * i) / rate`,
+        the first press after `first_press_rt`; pressing stops at the requirement
+        or the deadline, as in `run_effort_execution`.
+        """
+        rate, required, deadline = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(press_rate_hz, dtype=float)),
+            np.atleast_1d(np.asarray(required_presses, dtype=np.int64)),
+            np.atleast_1d(np.asarray(deadline_s, dtype=float)),
+        )
+        n = rate.shape[0]
+        overrides = dict(params or {})
+        unknown = set(overrides) - set(PRESS_PARAM_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported simulate_presses params: {sorted(unknown)}")
+        p = {
+            name: np.broadcast_to(np.asarray(overrides.get(name, getattr(self, name)), dtype=float), (n,))
+            for name in PRESS_PARAM_FIELDS
+        }
+        if rng is None:
+            rng = self._rng if isinstance(self._rng, np.random.Generator) else np.random.default_rng()
+
+        width = int(required.max()) if n else 0
+        press_count = np.zeros(n, dtype=np.int32)
+        first_rt = np.full(n, np.nan)
+        ttc = np.full(n, np.nan)
+        times_out = np.full((n, width), np.nan) if return_times else None
+        idx = np.arange(width, dtype=float)
+        # With shared parameters the per-press warm-up x fatigue profile is one row.
+        varying = n > 0 and any(np.ptp(p[name]) > 0 for name in PRESS_PARAM_FIELDS[:4])
+        step = max(1, int(chunk_size))
+        for lo in range(0, n if width else 0, step):
+            sl = slice(lo, min(n, lo + step))
+            rows = sl if varying else slice(lo, lo + 1)
+            k = 1.0 / np.maximum(p["press_ipi_cv"][rows], 1e-3) ** 2
+            if varying:
+                ipi = rng.standard_gamma(k[:, None], size=(sl.stop - lo, width))
+            else:
+                # scalar shape is a much cheaper draw; float32 noise is ample for ms timing
+                ipi = rng.standard_gamma(k[0], size=(sl.stop - lo, width), dtype=np.float32).astype(np.float64)
+            warmup = np.maximum(p["warmup_presses"][rows, None], 1e-6)
+            profile = 1.0 + p["warmup_slowdown"][rows, None] * np.exp(-idx / warmup)
+            profile *= np.maximum(1.0 + p["fatigue_per_press"][rows, None] * idx, 0.05)
+            ipi *= profile / k[:, None]
+            ipi /= rate[sl, None]
+            first = rng.normal(p["first_press_rt_mean_s"][sl], np.maximum(p["first_press_rt_sd_s"][sl], 1e-6))
+            ipi[:, 0] = np.maximum(self.min_rt_s, first)
+            times = np.cumsum(ipi, axis=1)
+            valid = (times <= deadline[sl, None]) & (idx < required[sl, None]) & np.isfinite(rate[sl, None])
+            times[~valid] = np.nan
+
+            count = valid.sum(axis=1).astype(np.int32)
+            press_count[sl] = count
+            first_rt[sl] = times[:, 0]
+            done = (count >= required[sl]) & (required[sl] > 0)
+            hit = np.nonzero(done)[0]
+            ttc[sl][hit] = times[hit, required[sl][hit] - 1]
+            if times_out is not None:
+                times_out[sl] = times
+
+        return PressBatch(
+            press_count=press_count,
+            completed=(press_count >= required) & (required > 0),
+            first_rt_s=first_rt,
+            time_to_criterion_s=ttc,
+            times_s=times_out,
+        )
+
+    def _batch_params(self, params: dict[str, Any] | None, n: int) -> dict[str, np.ndarray]:
+        overrides = dict(params or {})
+        unknown = set(overrides) - set(BATCH_PARAM_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported act_batch params: {sorted(unknown)}")
+        out = {
+            name: np.broadcast_to(np.asarray(overrides.get(name, getattr(self, name)), dtype=float), (n,))
+            for name in BATCH_PARAM_FIELDS
+        }
+        # Same sanitizing as __post_init__, applied per agent.
+        out["lapse_rate"] = np.clip(out["lapse_rate"], 0.0, 1.0)
+        out["choice_rt_sd_s"] = np.maximum(out["choice_rt_sd_s"], 1e-6)
+        out["base_press_rate_hz"] = np.maximum(out["base_press_rate_hz"], 0.1)
+        out["hard_press_rate_penalty_hz"] = np.maximum(out["hard_press_rate_penalty_hz"], 0.0)
+        out["press_rate_sd_hz"] = np.maximum(out["press_rate_sd_hz"], 1e-6)
+        return out
+
+    def act_batch(
+        self,
+        offer_probability: Any,
+        offer_hard_reward: Any,
+        offer_easy_reward: Any = 1.0,
+        easy_required_presses: Any = 30,
+        hard_required_presses: Any = 100,
+        *,
+        fallback_hard: Any = None,
+        params: dict[str, Any] | None = None,
+        rng: np.random.Generator | None = None,
+    ) -> SamplerBatch:
+        """Sample offer_choice and effort_execution_window for N offers at once.
+
+        Offer arguments broadcast to a common length N. `params` maps any of
+        `BATCH_PARAM_FIELDS` to a scalar or a length-N array of per-agent values;
+        unspecified fields fall back to this responder's attributes. Choice lapses
+        execute the `fallback_hard` option (easy when omitted), as `run_trial`
+        does with the scheduled fallback choice. All draws come from one
+        `numpy.random.Generator` and follow the same distributions as `act()`.
+        """
+        prob, hard_reward, easy_reward, easy_req, hard_req = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (
+                offer_probability,
+                offer_hard_reward,
+                offer_easy_reward,
+                easy_required_presses,
+                hard_required_presses,
+            ))
+        )
+        prob = np.atleast_1d(prob)
+        n = prob.shape[0]
+        hard_reward, easy_reward, easy_req, hard_req = (
+            np.broadcast_to(np.atleast_1d(x), (n,)) for x in (hard_reward, easy_reward, easy_req, hard_req)
+        )
+        p = self._batch_params(params, n)
+        if rng is None:
+            rng = self._rng if isinstance(self._rng, np.random.Generator) else np.random.default_rng()
+
+        utility_hard = (
+            p["hard_choice_bias"]
+            + p["hard_choice_reward_weight"] * (hard_reward - easy_reward)
+            + p["hard_choice_prob_weight"] * (prob - 0.5)
+            - p["hard_choice_effort_weight"] * np.maximum(0.0, hard_req - easy_req)
+        )
+        p_hard = 0.5 * (1.0 + np.tanh(0.5 * utility_hard))
+
+        choice_lapse = rng.random(n) < p["lapse_rate"]
+        choose_hard = rng.random(n) < p_hard
+        rt = np.maximum(self.min_rt_s, rng.normal(p["choice_rt_mean_s"], p["choice_rt_sd_s"]))
+        choice = np.where(choice_lapse, -1, choose_hard.astype(np.int8)).astype(np.int8)
+        rt[choice_lapse] = np.nan
+
+        fallback = np.zeros(n, dtype=bool) if fallback_hard is None else np.broadcast_to(np.asarray(fallback_hard, dtype=bool), (n,))
+        executed_hard = np.where(choice_lapse, fallback, choose_hard)
+        effort_lapse = rng.random(n) < p["lapse_rate"]
+        base_rate = p["base_press_rate_hz"] - np.where(executed_hard, p["hard_press_rate_penalty_hz"], 0.0)
+        press_rate = np.maximum(0.3, rng.normal(base_rate, p["press_rate_sd_hz"]))
+        press_rate[effort_lapse] = np.nan
+
+        return SamplerBatch(choice=choice, rt_s=rt, p_hard=p_hard, press_rate_hz=press_rate)
+
     def act(self, obs: Observation) -> Action:
         factors = dict(obs.task_factors or {})
         phase = str(obs.phase or factors.get("stage") or "").strip().lower()
@@ -1,2 +1,23 @@
-from .utils import build_eefrt_offer_conditions
-from .run_trial import run_trial
+from importlib import import_module
+
+# Public names resolve on first access so that importing a light submodule
+# (e.g. `src.trial_writer`) does not pull in psychopy/psyflow.
+_EXPORTS = {
+    "build_eefrt_offer_conditions": ".utils",
+    "condition_generation_kwargs": ".utils",
+    "prewarm_offer_stims": ".run_trial",
+    "run_trial": ".run_trial",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    source = _EXPORTS.get(name)
+    if source is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = import_module(source, __name__)
+    # Importing `.run_trial` binds the submodule to `src.run_trial`; rebind the function.
+    for export, export_source in _EXPORTS.items():
+        if export_source == source:
+            globals()[export] = getattr(module, export)
+    return globals()[name]
@@ -0,0 +1,180 @@
+"""Adaptive (Bayesian design) offer selection.
+
+With `condition_generation.design: adaptive` the block schedule still supplies
+each trial's tuple (trial index, fallback choice, reward draw), but the offer
+itself is chosen right before the choice screen: `AdaptiveOfferDesigner`
+keeps a weighted particle posterior over the choice model used by the
+sampler and `src.choice_fit`,
+``P(hard) = sigmoid(bias + reward_weight * (hard_reward - easy_reward) + prob_weight * (probability - 0.5))``,
+and picks the (probability, hard_reward) cell of the configured grid with the
+largest expected information gain about those weights. Each free choice then
+reweights the particles (forced fallback choices carry no information);
+when the effective sample size collapses they are resampled with Liu-West
+shrinkage jitter. A decision is one (particles x offers) pass: about 2 ms for
+2000 particles on the default 24-offer grid, plus well under 1 ms for the
+update, so it fits easily in the ITI.
+
+The prior is centered on `condition_generation.adaptive_prior_mean`. The
+configs use the sampler's effective weights for their press requirements
+(`src.choice_fit.sampler_choice_params`: bias = hard_choice_bias -
+hard_choice_effort_weight * (hard - easy presses), e.g. -3.8 for 30/100
+presses). The fixed requirement cost makes the bias much lower than the
+other weights alone suggest. Without that key the prior is centered on an
+indifferent participant (bias 0); `adaptive_prior_sd` keeps it wide either way.
+
+The scheduled condition id is kept in `planned_condition_id` (the recorded
+`condition_label` names the offer actually shown), so `--resume` can match
+completed trials against the regenerated schedule.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any
+
+import numpy as np
+
+from .choice_fit import CHOICE_PARAMS
+from .utils import EEFRTOfferCondition, condition_generation_kwargs, offer_condition_id, parse_offer_condition
+
+
+def _entropy_bits(p: np.ndarray) -> np.ndarray:
+    p = np.clip(p, 1e-12, 1.0 - 1e-12)
+    return -(p * np.log2(p) + (1.0 - p) * np.log2(1.0 - p))
+
+
+class AdaptiveOfferDesigner:
+    """Chooses each trial's offer to maximize expected information about the choice weights."""
+
+    def __init__(
+        self,
+        probability_levels: list[float],
+        hard_reward_levels: list[float],
+        *,
+        easy_reward: float = 1.0,
+        n_particles: int = 2000,
+        prior_mean: tuple[float, float, float] = (0.0, 0.5, 1.0),
+        prior_sd: tuple[float, float, float] = (1.5, 1.0, 2.0),
+        shrinkage: float = 0.98,
+        seed: int | None = None,
+    ) -> None:
+        self.easy_reward = float(easy_reward)
+        self.offers = [(float(p), round(float(r), 2)) for p, r in itertools.product(probability_levels, hard_reward_levels)]
+        if not self.offers:
+            raise ValueError("Adaptive offer design requires non-empty probability_levels and hard_reward_levels")
+        self.features = np.array([[1.0, r - self.easy_reward, p - 0.5] for p, r in self.offers])
+        self.rng = np.random.default_rng(seed)
+        n = max(10, int(n_particles))
+        self.particles = self.rng.normal(prior_mean, prior_sd, size=(n, 3))
+        self.weights = np.full(n, 1.0 / n)
+        self.shrinkage = float(shrinkage)
+        self.n_updates = 0
+        self._last_gain: float | None = None
+        self._planned_id: str | None = None
+
+    def _choice_probs(self, features: np.ndarray) -> np.ndarray:
+        return 0.5 * (1.0 + np.tanh(0.5 * (self.particles @ features.T)))
+
+    def information_gain(self) -> np.ndarray:
+        """Expected information (bits) about the weights from one free choice at each offer."""
+        p = self._choice_probs(self.features)  # (particles, offers)
+        p_mean = self.weights @ p
+        return _entropy_bits(p_mean) - self.weights @ _entropy_bits(p)
+
+    def next_offer(self) -> tuple[float, float]:
+        gain = self.information_gain()
+        best = np.flatnonzero(gain >= gain.max() - 1e-12)
+        i = int(best[0] if best.size == 1 else self.rng.choice(best))
+        self._last_gain = float(gain[i])
+        return self.offers[i]
+
+    def assign(self, condition: Any) -> EEFRTOfferCondition:
+        """Replace a scheduled condition's offer with the most informative one, keeping its other fields."""
+        _prob, _reward, planned_id, trial_index, fallback_choice, reward_draw_u = parse_offer_condition(condition)
+        self._planned_id = planned_id
+        prob, hard_reward = self.next_offer()
+        cond_id = offer_condition_id(prob, hard_reward, trial_index or 0)
+        return (prob, hard_reward, cond_id, trial_index, fallback_choice, reward_draw_u)
+
+    def update(self, *, probability: float, hard_reward: float, hard: bool, forced: bool = False) -> None:
+        if forced:
+            return
+        x = np.array([1.0, float(hard_reward) - self.easy_reward, float(probability) - 0.5])
+        p = self._choice_probs(x[None, :])[:, 0]
+        self.weights *= p if hard else 1.0 - p
+        total = self.weights.sum()
+        if not np.isfinite(total) or total <= 0.0:
+            self.weights.fill(1.0 / self.weights.shape[0])
+        else:
+            self.weights /= total
+        self.n_updates += 1
+        if 1.0 / np.sum(self.weights**2) < 0.5 * self.weights.shape[0]:
+            self._resample()
+
+    def _resample(self) -> None:
+        n = self.weights.shape[0]
+        positions = (self.rng.random() + np.arange(n)) / n
+        idx = np.minimum(np.searchsorted(np.cumsum(self.weights), positions), n - 1)
+        mean = self.weights @ self.particles
+        cov = np.cov(self.particles.T, aweights=self.weights)
+        a = self.shrinkage
+        jitter = self.rng.multivariate_normal(np.zeros(3), (1.0 - a**2) * cov, size=n, method="cholesky")
+        self.particles = a * self.particles[idx] + (1.0 - a) * mean + jitter
+        self.weights = np.full(n, 1.0 / n)
+
+    def replay(self, rows: Any) -> None:
+        """Condition the posterior on already-recorded trial rows (e.g. when resuming)."""
+        for row in rows:
+            if row.get("choice_option") not in ("easy", "hard"):
+                continue
+            forced = row.get("choice_forced")
+            self.update(
+                probability=float(row.get("offer_probability") or 0.0),
+                hard_reward=float(row.get("offer_hard_reward") or 0.0),
+                hard=row.get("choice_option") == "hard",
+                forced=forced.strip().lower() in ("true", "1", "yes") if isinstance(forced, str) else bool(forced),
+            )
+
+    def posterior(self) -> dict[str, float]:
+        mean = self.weights @ self.particles
+        sd = np.sqrt(np.maximum(self.weights @ (self.particles - mean) ** 2, 0.0))
+        out: dict[str, float] = {}
+        for i, name in enumerate(CHOICE_PARAMS):
+            out[f"design_{name}_mean"] = float(mean[i])
+            out[f"design_{name}_sd"] = float(sd[i])
+        return out
+
+    def trial_columns(self) -> dict[str, Any]:
+        """Per-trial design columns: scheduled condition id, expected gain of the chosen offer and the updated posterior."""
+        return {"planned_condition_id": self._planned_id, "design_info_bits": self._last_gain, **self.posterior()}
+
+    def candidate_conditions(self) -> list[EEFRTOfferCondition]:
+        """Every offer the designer can pick, as condition tuples (e.g. for stim pre-warming)."""
+        return [(p, r, offer_condition_id(p, r, 0), 0, "easy", 0.0) for p, r in self.offers]
+
+
+def offer_designer(settings: Any, cg_cfg: dict[str, Any] | None) -> AdaptiveOfferDesigner | None:
+    """Session designer when `condition_generation.design` is `adaptive`, else None.
+
+    Seeded from the session's `overall_seed`, so a subject's offer sequence is
+    reproducible given the same choices.
+    """
+    cg_cfg = dict(cg_cfg or {})
+    design = str(cg_cfg.get("design", "grid") or "grid").strip().lower()
+    if design == "grid":
+        return None
+    if design != "adaptive":
+        raise ValueError(f"Unsupported condition_generation.design {design!r}; expected 'grid' or 'adaptive'")
+    levels = condition_generation_kwargs(cg_cfg)
+    return AdaptiveOfferDesigner(
+        levels["probability_levels"],
+        levels["hard_reward_levels"],
+        easy_reward=float(getattr(settings, "easy_reward", 1.0)),
+        n_particles=int(cg_cfg.get("adaptive_particles", 2000) or 2000),
+        **{
+            key: tuple(float(v) for v in cg_cfg[f"adaptive_{key}"])
+            for key in ("prior_mean", "prior_sd")
+            if cg_cfg.get(f"adaptive_{key}") is not None
+        },
+        seed=getattr(settings, "overall_seed", None),
+    )
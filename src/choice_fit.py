@@ -0,0 +1,224 @@
+"""Maximum-likelihood fits of the sampler's hard-choice model to session data.
+
+The choice utility is the one `TaskSamplerResponder._choice_action` samples
+from, ``P(hard) = sigmoid(bias + reward_weight * (hard_reward - easy_reward)
++ prob_weight * (probability - 0.5))``. Within a session the press requirements
+are fixed, so the sampler's `- hard_choice_effort_weight * (hard - easy presses)`
+term is absorbed into `bias` (see `sampler_choice_params`).
+
+Lapses (no response in the choice window) show up as forced fallback choices
+(`choice_forced`). They carry no preference information: forced trials are
+left out of the logistic likelihood and the lapse rate is their fraction.
+
+All sessions are fitted together by batched Newton-Raphson on padded
+`(sessions, trials, 3)` arrays, so thousands of sessions cost a few dense
+NumPy passes::
+
+    python -m src.choice_fit outputs/sim/*.csv --out choice_fits.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+CHOICE_PARAMS = ("bias", "reward_weight", "prob_weight")
+# TaskSamplerResponder field for each fitted parameter.
+SAMPLER_FIELDS = {
+    "bias": "hard_choice_bias",
+    "reward_weight": "hard_choice_reward_weight",
+    "prob_weight": "hard_choice_prob_weight",
+}
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+@dataclass
+class ChoiceData:
+    """Padded design arrays for S sessions of up to T trials."""
+
+    sessions: list[str]
+    x: np.ndarray  # (S, T, 3) features [1, reward diff, probability - 0.5]
+    y: np.ndarray  # (S, T) 1 = hard
+    mask: np.ndarray  # (S, T) True = free (non-forced) choice
+    n_trials: np.ndarray  # (S,) all trials, forced included
+    n_forced: np.ndarray  # (S,)
+
+    @classmethod
+    def from_rows(cls, sessions: dict[str, Sequence[dict[str, Any]]]) -> "ChoiceData":
+        """Build from trial rows (results CSV rows or in-memory trial dicts) per session."""
+        names = list(sessions)
+        width = max((len(rows) for rows in sessions.values()), default=0)
+        x = np.zeros((len(names), width, 3))
+        y = np.zeros((len(names), width))
+        mask = np.zeros((len(names), width), dtype=bool)
+        n_trials = np.zeros(len(names), dtype=np.int64)
+        n_forced = np.zeros(len(names), dtype=np.int64)
+        for s, name in enumerate(names):
+            rows = [row for row in sessions[name] if row.get("choice_option") in ("easy", "hard")]
+            n = len(rows)
+            if not n:
+                continue
+            prob = np.array([float(row.get("offer_probability") or 0.0) for row in rows])
+            hard_reward = np.array([float(row.get("offer_hard_reward") or 0.0) for row in rows])
+            easy_reward = np.array([float(row.get("offer_easy_reward") or 0.0) for row in rows])
+            forced = np.array([_truthy(row.get("choice_forced", False)) for row in rows])
+            x[s, :n, 0] = 1.0
+            x[s, :n, 1] = hard_reward - easy_reward
+            x[s, :n, 2] = prob - 0.5
+            y[s, :n] = [row.get("choice_option") == "hard" for row in rows]
+            mask[s, :n] = ~forced
+            n_trials[s] = n
+            n_forced[s] = int(forced.sum())
+        return cls(sessions=names, x=x, y=y, mask=mask, n_trials=n_trials, n_forced=n_forced)
+
+
+@dataclass
+class ChoiceFit:
+    """Per-session estimates; arrays are indexed like `sessions`."""
+
+    sessions: list[str]
+    params: np.ndarray  # (S, 3) in CHOICE_PARAMS order
+    se: np.ndarray  # (S, 3)
+    lapse: np.ndarray
+    lapse_se: np.ndarray
+    n_trials: np.ndarray
+    n_choices: np.ndarray
+    loglik: np.ndarray
+    iterations: int
+    converged: np.ndarray
+
+    def rows(self) -> list[dict[str, Any]]:
+        out = []
+        for s, session in enumerate(self.sessions):
+            row: dict[str, Any] = {
+                "session": session,
+                "n_trials": int(self.n_trials[s]),
+                "n_choices": int(self.n_choices[s]),
+                "converged": bool(self.converged[s]),
+                "loglik": float(self.loglik[s]),
+            }
+            for i, name in enumerate(CHOICE_PARAMS):
+                row[name] = float(self.params[s, i])
+                row[f"{name}_se"] = float(self.se[s, i])
+            row["lapse_rate"] = float(self.lapse[s])
+            row["lapse_rate_se"] = float(self.lapse_se[s])
+            out.append(row)
+        return out
+
+    def write_csv(self, path: str | Path) -> Path:
+        path = Path(path)
+        rows = self.rows()
+        fieldnames = list(rows[0]) if rows else ["session"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+
+def fit_choice_model(
+    data: ChoiceData,
+    *,
+    ridge: float = 1e-3,
+    max_iter: int = 50,
+    tol: float = 1e-8,
+    max_step: float = 5.0,
+) -> ChoiceFit:
+    """Batched Newton-Raphson MLE of the choice weights for every session at once.
+
+    `ridge` is a small L2 penalty that keeps sessions with (quasi-)separated
+    choices, e.g. all-hard, finite; standard errors come from the inverse of
+    the penalized observed information at the optimum. Sessions still moving
+    by more than `tol` after `max_iter` steps are flagged `converged=False`.
+    """
+    n_sessions = len(data.sessions)
+    x = data.x
+    y = data.y
+    m = data.mask.astype(float)
+    eye = np.eye(3) * float(ridge)
+    w = np.zeros((n_sessions, 3))
+    active = np.ones(n_sessions, dtype=bool)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        z = np.einsum("stk,sk->st", x, w)
+        p = 0.5 * (1.0 + np.tanh(0.5 * z))  # overflow-free sigmoid
+        grad = np.einsum("stk,st->sk", x, m * (y - p)) - ridge * w
+        v = m * p * (1.0 - p)
+        hess = np.einsum("stk,st,stl->skl", x, v, x) + eye
+        step = np.linalg.solve(hess, grad[..., None])[..., 0]
+        norm = np.linalg.norm(step, axis=1)
+        step *= np.minimum(1.0, max_step / np.maximum(norm, 1e-300))[:, None]
+        step[~active] = 0.0
+        w += step
+        active &= norm > tol
+        if not active.any():
+            break
+
+    z = np.einsum("stk,sk->st", x, w)
+    p = 0.5 * (1.0 + np.tanh(0.5 * z))
+    v = m * p * (1.0 - p)
+    cov = np.linalg.inv(np.einsum("stk,st,stl->skl", x, v, x) + eye)
+    se = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0))
+    # log p = -log1p(exp(-z)), log(1 - p) = -log1p(exp(z))
+    loglik = -(m * (y * np.logaddexp(0.0, -z) + (1.0 - y) * np.logaddexp(0.0, z))).sum(axis=1)
+
+    n = np.maximum(data.n_trials, 1)
+    lapse = data.n_forced / n
+    return ChoiceFit(
+        sessions=list(data.sessions),
+        params=w,
+        se=se,
+        lapse=lapse,
+        lapse_se=np.sqrt(lapse * (1.0 - lapse) / n),
+        n_trials=data.n_trials,
+        n_choices=data.mask.sum(axis=1),
+        loglik=loglik,
+        iterations=iterations,
+        converged=~active,
+    )
+
+
+def sampler_choice_params(responder_kwargs: dict[str, Any], *, easy_presses: int, hard_presses: int) -> dict[str, float]:
+    """The generating values `fit_choice_model` recovers for a sampler config."""
+    from responders import TaskSamplerResponder
+
+    responder = TaskSamplerResponder(**responder_kwargs)
+    effort = responder.hard_choice_effort_weight * max(0.0, float(hard_presses - easy_presses))
+    params = {name: float(getattr(responder, field)) for name, field in SAMPLER_FIELDS.items()}
+    params["bias"] -= effort
+    params["lapse_rate"] = responder.lapse_rate
+    return params
+
+
+def read_session_csv(path: str | Path) -> list[dict[str, Any]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit the EEfRT sampler choice model to results CSVs.")
+    parser.add_argument("results", nargs="+", type=Path, help="Trial results CSVs, one session each.")
+    parser.add_argument("--out", type=Path, default=Path("choice_fits.csv"), help="Output CSV, one row per session.")
+    parser.add_argument("--ridge", type=float, default=1e-3, help="L2 penalty on the weights (default 1e-3).")
+    args = parser.parse_args()
+    data = ChoiceData.from_rows({str(path): read_session_csv(path) for path in args.results})
+    fit = fit_choice_model(data, ridge=args.ridge)
+    fit.write_csv(args.out)
+    print(
+        f"[EEfRT choice_fit] sessions={len(fit.sessions)} converged={int(fit.converged.sum())} "
+        f"iterations={fit.iterations} out={args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
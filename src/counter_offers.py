@@ -0,0 +1,177 @@
+"""Counter-based (random-access) offer generation.
+
+`build_eefrt_offer_conditions` draws a block from one sequential
+`random.Random(seed)` stream, so trial k can only be reproduced by replaying
+trials 1..k-1. With `condition_generation.rng: counter` every draw is instead a
+hash of (seed, subject, block, trial, stream) through the SplitMix64 finalizer:
+any trial's spec is computed on its own, in constant time, and blocks can be
+generated in parallel, sliced or checked against a saved schedule.
+
+Balancing is kept per cycle of the probability x reward grid: trial k sits at
+position ``(k - 1) % G`` of cycle ``(k - 1) // G`` (G = grid size), and each
+cycle is a keyed permutation of the grid, so every complete cycle shows each
+offer exactly once and a final partial cycle is a keyed draw without
+replacement. With `randomize_order: false` complete cycles keep grid order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+from typing import Any
+
+import numpy as np
+
+from .utils import EEFRTOfferCondition, condition_generation_kwargs, offer_condition_id
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+# Draw streams within one trial / cycle.
+_STREAM_ORDER = 0
+_STREAM_FALLBACK = 1
+_STREAM_REWARD = 2
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    # wrapping uint64 arithmetic; callers silence overflow warnings
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def _hash(*words: Any) -> np.ndarray:
+    """Keyed 64-bit hash of broadcastable integer words."""
+    h = np.zeros((), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for word in words:
+            h = _mix64(h ^ (np.asarray(word, dtype=np.uint64) + _GOLDEN))
+    return h
+
+
+def _uniform(h: np.ndarray) -> np.ndarray:
+    return (h >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+
+def counter_key(seed: int | None, subject: str = "") -> int:
+    """64-bit session key from a block seed and subject id."""
+    subject_word = int.from_bytes(hashlib.sha256(str(subject).encode("utf-8")).digest()[:8], "little")
+    return int(_hash(np.uint64(int(seed or 0) & 0xFFFFFFFFFFFFFFFF), np.uint64(subject_word)))
+
+
+def counter_offer_arrays(
+    trial_index: np.ndarray,
+    *,
+    n_trials: int,
+    key: int,
+    block_idx: int,
+    probability_levels: list[float],
+    hard_reward_levels: list[float],
+    randomize_order: bool = True,
+    no_choice_hard_prob: float = 0.5,
+) -> dict[str, np.ndarray]:
+    """Offer columns for 1-based `trial_index` values of an `n_trials` block; cost is independent of the index."""
+    combos = np.array([(float(p), round(float(r), 2)) for p, r in itertools.product(probability_levels, hard_reward_levels)])
+    if combos.size == 0:
+        raise ValueError("EEfRT condition generation requires non-empty probability_levels and hard_reward_levels")
+    k = np.asarray(trial_index, dtype=np.int64).reshape(-1) - 1
+    if np.any(k < 0) or np.any(k >= int(n_trials)):
+        raise IndexError(f"trial_index must be in 1..{int(n_trials)}")
+    g = combos.shape[0]
+    cycle, pos = np.divmod(k, g)
+    block_key = _hash(np.uint64(key), np.uint64(int(block_idx)))
+
+    # keyed permutation of the grid per cycle: rank the cycle's G hashed slots
+    slots = _hash(block_key, np.uint64(_STREAM_ORDER), cycle.astype(np.uint64)[:, None], np.arange(g, dtype=np.uint64)[None, :])
+    order = np.argsort(slots, axis=1, kind="stable")
+    offer = np.take_along_axis(order, pos[:, None], axis=1)[:, 0]
+    if not randomize_order:
+        complete = (cycle + 1) * g <= int(n_trials)
+        offer = np.where(complete, pos, offer)
+
+    trial = k.astype(np.uint64) + np.uint64(1)
+    p_hard = max(0.0, min(1.0, float(no_choice_hard_prob)))
+    return {
+        "probability": combos[offer, 0],
+        "hard_reward": combos[offer, 1],
+        "trial_index": k + 1,
+        "fallback_hard": _uniform(_hash(block_key, np.uint64(_STREAM_FALLBACK), trial)) < p_hard,
+        "reward_draw_u": _uniform(_hash(block_key, np.uint64(_STREAM_REWARD), trial)),
+    }
+
+
+def _conditions(columns: dict[str, np.ndarray]) -> list[EEFRTOfferCondition]:
+    return [
+        (float(p), float(r), offer_condition_id(float(p), float(r), int(t)), int(t), "hard" if f else "easy", float(u))
+        for p, r, t, f, u in zip(
+            columns["probability"],
+            columns["hard_reward"],
+            columns["trial_index"],
+            columns["fallback_hard"],
+            columns["reward_draw_u"],
+        )
+    ]
+
+
+def counter_offer_condition(
+    trial_index: int,
+    *,
+    n_trials: int,
+    seed: int | None,
+    block_idx: int,
+    subject: str = "",
+    cg_cfg: dict[str, Any] | None = None,
+) -> EEFRTOfferCondition:
+    """One trial's condition tuple, computed directly from its (seed, subject, block, trial) key."""
+    kwargs = condition_generation_kwargs(cg_cfg)
+    columns = counter_offer_arrays(
+        np.array([trial_index]),
+        n_trials=n_trials,
+        key=counter_key(seed, subject),
+        block_idx=block_idx,
+        probability_levels=kwargs["probability_levels"],
+        hard_reward_levels=kwargs["hard_reward_levels"],
+        randomize_order=kwargs["randomize_order"],
+        no_choice_hard_prob=kwargs["no_choice_hard_prob"],
+    )
+    return _conditions(columns)[0]
+
+
+def build_counter_offer_conditions(
+    n_trials: int,
+    condition_labels: list[Any] | None = None,
+    *,
+    seed: int | None = None,
+    block_idx: int = 0,
+    subject: str = "",
+    probability_levels: list[float] | None = None,
+    hard_reward_levels: list[float] | None = None,
+    randomize_order: bool = True,
+    no_choice_hard_prob: float = 0.5,
+    enable_logging: bool = True,
+    **_: Any,
+) -> list[EEFRTOfferCondition]:
+    """Counter-based counterpart of `build_eefrt_offer_conditions` (same tuple format)."""
+    n = max(0, int(n_trials))
+    if n == 0:
+        return []
+    columns = counter_offer_arrays(
+        np.arange(1, n + 1),
+        n_trials=n,
+        key=counter_key(seed, subject),
+        block_idx=block_idx,
+        probability_levels=list(probability_levels or [0.12, 0.50, 0.88]),
+        hard_reward_levels=list(hard_reward_levels or [1.24, 1.68, 2.11, 2.55, 2.99, 3.43, 3.86, 4.30]),
+        randomize_order=randomize_order,
+        no_choice_hard_prob=no_choice_hard_prob,
+    )
+    out = _conditions(columns)
+
+    if enable_logging:
+        from psychopy import logging
+
+        keys, counts = np.unique(np.round(columns["probability"] * 100).astype(int), return_counts=True)
+        prob_dist = {int(key): int(count) for key, count in zip(keys, counts)}
+        logging.data(f"[EEfRTConditionGen] n_trials={n} seed={seed} block={block_idx} rng=counter prob_dist={prob_dist}")
+
+    return out
@@ -0,0 +1,308 @@
+"""Buffered sim event logging and columnar event tables.
+
+Responders log one JSON object per observation/action to `sim.log_path`.
+`BufferedEventLog` is a drop-in for the runtime context's `sim_logger` that
+serializes events into a buffer and writes them in batches, optionally
+gzip-compressed. Enable it in the sim config::
+
+    sim:
+      log_buffer_events: 512   # events per write; 0 keeps psyflow's logger
+      log_compress: false      # true: write <log_path>.gz
+
+`convert_logs` turns one or more JSONL logs (plain or .gz) into a columnar
+`.npz` with rows sorted by (session, phase, trial_id) and a (session, phase)
+group index. It streams the logs twice (column types and widths, then values
+into preallocated arrays), so memory holds only the typed columns, never
+the parsed events, so `EventTable.select(phase="effort_execution_window")` slices
+the matching rows without parsing any JSON::
+
+    python -m src.event_log outputs/sweep/*/sim_events.jsonl --out events.npz
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+EVENT_TABLE_VERSION = 1
+MISSING_TRIAL = -1
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class BufferedEventLog:
+    """Callable JSONL event sink with batched writes (`flush_every` events per write).
+
+    The log starts empty unless `append=True` (continuing a resumed session).
+    """
+
+    def __init__(self, path: str | Path, *, flush_every: int = 512, compress: bool = False, append: bool = False) -> None:
+        path = Path(path)
+        if compress and path.suffix != ".gz":
+            path = path.with_name(f"{path.name}.gz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_every = max(1, int(flush_every))
+        self.n_events = 0
+        self._buffer: list[str] = []
+        mode = "a" if append else "w"
+        if path.suffix == ".gz":
+            self._fh = gzip.open(path, f"{mode}t", encoding="utf-8", compresslevel=6)
+        else:
+            self._fh = open(path, mode, encoding="utf-8")
+
+    def __call__(self, event: dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=_jsonable))
+        self.n_events += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._fh.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self.flush()
+        self._fh.close()
+
+    def __enter__(self) -> "BufferedEventLog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def install_buffered_log(ctx: Any, sim_cfg: dict[str, Any] | None, *, append: bool = False) -> BufferedEventLog | None:
+    """Swap `ctx.sim_logger` for a `BufferedEventLog` when `sim.log_buffer_events` > 0.
+
+    Must run before the session's responder adapter is built. Returns the log
+    (close it when the session ends) or None when buffering is off. Pass
+    `append=True` only when resuming the session that wrote `sim.log_path`.
+    """
+    sim_cfg = dict(sim_cfg or {})
+    flush_every = int(sim_cfg.get("log_buffer_events", 0) or 0)
+    log_path = sim_cfg.get("log_path")
+    if ctx is None or flush_every <= 0 or not log_path:
+        return None
+    log = BufferedEventLog(
+        log_path,
+        flush_every=flush_every,
+        compress=bool(sim_cfg.get("log_compress", False)),
+        append=append,
+    )
+    try:
+        ctx.sim_logger = log
+    except AttributeError:  # immutable context: keep psyflow's logger
+        log.close()
+        return None
+    return log
+
+
+def iter_events(path: str | Path) -> Iterator[dict[str, Any]]:
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _render(value: Any) -> str:
+    """String cell for a value in a text column; nested values as compact JSON."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_jsonable)
+
+
+class _ColumnSpec:
+    """Running type/width of one column, gathered in the first pass."""
+
+    __slots__ = ("present", "all_bool", "all_int", "all_num", "width")
+
+    def __init__(self) -> None:
+        self.present = 0
+        self.all_bool = self.all_int = self.all_num = True
+        self.width = 1
+
+    def observe(self, value: Any) -> None:
+        if value is None:
+            return
+        self.present += 1
+        is_bool = isinstance(value, bool)
+        is_num = isinstance(value, (int, float)) and not is_bool
+        self.all_bool = self.all_bool and is_bool
+        self.all_int = self.all_int and is_num and isinstance(value, int)
+        self.all_num = self.all_num and is_num
+        width = len(value) if isinstance(value, str) else len(_render(value))
+        if width > self.width:
+            self.width = width
+
+    def allocate(self, n: int) -> np.ndarray:
+        """Typed column: bool, int, float (missing -> NaN) or fixed-width unicode."""
+        complete = self.present == n and n > 0
+        if complete and self.all_bool:
+            return np.zeros(n, dtype=bool)
+        if complete and self.all_int:
+            return np.zeros(n, dtype=np.int64)
+        if self.present and self.all_num:
+            return np.full(n, np.nan, dtype=np.float64)
+        return np.full(n, "", dtype=f"<U{self.width}")
+
+
+def _iter_log_events(paths: list[str | Path]) -> Iterator[dict[str, Any]]:
+    for path in paths:
+        default_session = str(path).removesuffix(".gz").removesuffix(".jsonl")
+        for event in iter_events(path):
+            event.setdefault("session", event.get("session_id") or default_session)
+            yield event
+
+
+def convert_logs(paths: list[str | Path], out: str | Path) -> Path:
+    """Write the events of `paths` as a sorted, indexed columnar `.npz`.
+
+    Top-level event fields become columns; nested values (meta, task factors)
+    are kept as compact JSON strings. `session` is the event's `session_id`
+    when present, else the log's path without `.jsonl`/`.gz`. The logs are
+    read twice: once for column types and widths, then into preallocated
+    arrays, so peak memory is the output columns rather than the events.
+    """
+    paths = list(paths)
+    specs: dict[str, _ColumnSpec] = {}
+    n = 0
+    for event in _iter_log_events(paths):
+        for key, value in event.items():
+            spec = specs.get(key)
+            if spec is None:
+                spec = specs[key] = _ColumnSpec()
+            spec.observe(value)
+        n += 1
+
+    session = np.full(n, "", dtype=f"<U{specs['session'].width if 'session' in specs else 1}")
+    phase = np.full(n, "", dtype=f"<U{specs['phase'].width if 'phase' in specs else 1}")
+    trial_id = np.full(n, MISSING_TRIAL, dtype=np.int64)
+    keys = {"session": session, "phase": phase, "trial_id": trial_id}
+    columns = {key: spec.allocate(n) for key, spec in specs.items() if key not in keys}
+    text = {key for key, column in columns.items() if column.dtype.kind == "U"}
+    for i, event in enumerate(_iter_log_events(paths)):
+        for key, value in event.items():
+            if value is None:
+                continue
+            if key == "trial_id":
+                if not isinstance(value, bool):
+                    trial_id[i] = int(value)
+            elif key in ("session", "phase"):
+                keys[key][i] = str(value)
+            elif key in text:
+                columns[key][i] = _render(value)
+            else:
+                columns[key][i] = value
+
+    order = np.lexsort((trial_id, phase, session))
+    arrays = {name: values[order] for name, values in keys.items()}
+    for key in list(columns):
+        arrays[f"col_{key}"] = columns.pop(key)[order]
+
+    pairs = np.char.add(np.char.add(arrays["session"], "\x1f"), arrays["phase"])
+    _, starts = np.unique(pairs, return_index=True)
+    starts = np.sort(starts).astype(np.int64)
+    stops = np.append(starts[1:], n).astype(np.int64) if starts.size else starts
+
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        out,
+        version=np.int64(EVENT_TABLE_VERSION),
+        index_session=arrays["session"][starts],
+        index_phase=arrays["phase"][starts],
+        index_start=starts.astype(np.int64),
+        index_stop=stops,
+        **arrays,
+    )
+    return out
+
+
+@dataclass
+class EventTable:
+    """Columnar events loaded from `convert_logs` output."""
+
+    columns: dict[str, np.ndarray]
+    index_session: np.ndarray
+    index_phase: np.ndarray
+    index_start: np.ndarray
+    index_stop: np.ndarray
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EventTable":
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != EVENT_TABLE_VERSION:
+                raise ValueError(f"Unsupported event table version {version} in {path}")
+            columns = {key: data[key] for key in ("session", "phase", "trial_id")}
+            columns.update({key[4:]: data[key] for key in data.files if key.startswith("col_")})
+            return cls(
+                columns=columns,
+                index_session=data["index_session"],
+                index_phase=data["index_phase"],
+                index_start=data["index_start"],
+                index_stop=data["index_stop"],
+            )
+
+    def __len__(self) -> int:
+        return int(self.columns["session"].shape[0])
+
+    def select(
+        self,
+        *,
+        phase: str | None = None,
+        session: str | None = None,
+        trial_id: int | None = None,
+        columns: list[str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Rows for one phase and/or session (and optionally one trial), via the group index."""
+        groups = np.ones(self.index_start.shape[0], dtype=bool)
+        if phase is not None:
+            groups &= self.index_phase == phase
+        if session is not None:
+            groups &= self.index_session == session
+        rows_parts = []
+        for start, stop in zip(self.index_start[groups], self.index_stop[groups]):
+            if trial_id is not None:
+                # rows are sorted by trial_id within a group
+                ids = self.columns["trial_id"][start:stop]
+                lo, hi = np.searchsorted(ids, [trial_id, trial_id + 1])
+                start, stop = start + lo, start + hi
+            rows_parts.append(np.arange(start, stop))
+        rows = np.concatenate(rows_parts) if rows_parts else np.empty(0, dtype=np.int64)
+        names = columns or list(self.columns)
+        return {name: self.columns[name][rows] for name in names}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert sim event logs (JSONL or .jsonl.gz) to an indexed .npz table.")
+    parser.add_argument("logs", nargs="+", type=Path, help="Sim event logs.")
+    parser.add_argument("--out", type=Path, default=Path("sim_events.npz"), help="Output .npz.")
+    args = parser.parse_args()
+    out = convert_logs(args.logs, args.out)
+    table = EventTable.load(out)
+    print(f"[EEfRT event_log] events={len(table)} groups={table.index_start.shape[0]} out={out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# Session histogram of flip intervals: 0.1 ms bins up to 250 ms (last bin is overflow).
+_HIST_BIN_S = 1e-4
+_HIST_BINS = 2500
+
+
+class FrameTimer:
+    """Opt-in per-phase flip-interval recorder.
+
+    Wraps `win.flip` on the window instance and stores each flip time of the
+    current trial in a preallocated buffer tagged with the active phase.
+    A trial's first interval is measured from the previous trial's last flip
+    only when no other screen flipped in between and no block started
+    (`begin_block()`), so block breaks are not charged to the next trial.
+    `end_trial()` returns `{unit_label}_frame_*` trial columns; `write_report()`
+    saves session-level per-phase aggregates.
+    """
+
+    def __init__(self, win: Any, capacity: int = 16384) -> None:
+        self.win = win
+        self.frame_s = float(getattr(win, "monitorFramePeriod", 1.0 / 60.0) or (1.0 / 60.0))
+        self._flip_times = np.empty(int(capacity), dtype=np.float64)
+        self._flip_phase = np.empty(int(capacity), dtype=np.int16)
+        self._n = 0
+        self._overflow = 0
+        self._trial_end: float | None = None
+        self._carry = np.nan
+        self._phase_idx = -1
+        self._phases: list[str] = []
+        self._requested: dict[str, float | None] = {}
+        self._session: dict[str, dict[str, Any]] = {}
+        self._hist: dict[str, np.ndarray] = {}
+        self._orig_flip = win.flip
+        win.flip = self._flip
+
+    def uninstall(self) -> None:
+        self.win.flip = self._orig_flip
+
+    def _flip(self, *args: Any, **kwargs: Any) -> Any:
+        t = self._orig_flip(*args, **kwargs)
+        now = float(t) if t is not None else None
+        if now is None:
+            from psychopy import core
+
+            now = float(core.getTime())
+        if self._phase_idx >= 0:
+            if self._n == 0:
+                # interval from the previous trial's last (ITI) flip, if it directly preceded this trial
+                self._carry = now - self._trial_end if self._trial_end is not None else np.nan
+            if self._n < self._flip_times.size:
+                self._flip_times[self._n] = now
+                self._flip_phase[self._n] = self._phase_idx
+                self._n += 1
+            else:
+                self._overflow += 1
+            self._trial_end = now
+        else:
+            # a screen outside the trials (instructions, block break) breaks the carry
+            self._trial_end = None
+        return t
+
+    def begin_block(self) -> None:
+        """Start a block: its first trial does not carry the interval from the previous block."""
+        self._trial_end = None
+
+    def begin_phase(self, phase: str, requested_s: float | None = None) -> None:
+        """Tag subsequent flips with `phase`.
+
+        `requested_s` is the duration actually shown (after any QA timing
+        scale), or None for response-terminated phases.
+        """
+        if phase not in self._requested:
+            self._phases.append(phase)
+        self._requested[phase] = None if requested_s is None else float(requested_s)
+        self._phase_idx = self._phases.index(phase)
+
+    def end_trial(self) -> dict[str, Any]:
+        """Summarize the trial's flips per phase and reset the trial buffer."""
+        n = self._n
+        times = self._flip_times[:n]
+        tags = self._flip_phase[:n]
+        intervals = np.empty(n, dtype=np.float64)
+        if n:
+            intervals[0] = self._carry
+            intervals[1:] = np.diff(times)
+
+        out: dict[str, Any] = {}
+        for idx, phase in enumerate(self._phases):
+            mask = tags == idx
+            if not mask.any():
+                continue
+            phase_int = intervals[mask]
+            phase_int = phase_int[np.isfinite(phase_int)]
+            dropped = int(np.sum(np.maximum(np.rint(phase_int / self.frame_s) - 1, 0)[phase_int > 1.5 * self.frame_s]))
+            first = int(np.argmax(mask))
+            later = np.nonzero(~mask[first:])[0]
+            end_t = times[first + later[0]] if later.size else times[np.nonzero(mask)[0][-1]] + self.frame_s
+            measured = float(end_t - times[first])
+            requested = self._requested.get(phase)
+            cols = {
+                "frame_n": int(mask.sum()),
+                "frame_dropped": dropped,
+                "frame_max_ms": float(phase_int.max() * 1e3) if phase_int.size else None,
+                "frame_p95_ms": float(np.percentile(phase_int, 95) * 1e3) if phase_int.size else None,
+                "frame_jitter_ms": float(np.max(np.abs(phase_int - self.frame_s)) * 1e3) if phase_int.size else None,
+                "frame_duration_dev_ms": (measured - requested) * 1e3 if requested is not None else None,
+            }
+            out.update({f"{phase}_{k}": v for k, v in cols.items()})
+            self._accumulate(phase, phase_int, dropped, cols["frame_duration_dev_ms"])
+
+        out["frame_overflow"] = self._overflow
+        self._n = 0
+        self._overflow = 0
+        self._phase_idx = -1
+        self._carry = np.nan
+        return out
+
+    def _accumulate(self, phase: str, intervals: np.ndarray, dropped: int, dev_ms: float | None) -> None:
+        agg = self._session.setdefault(
+            phase,
+            {"trials": 0, "flips": 0, "dropped": 0, "max_ms": 0.0, "dev_ms_sum": 0.0, "dev_ms_max_abs": None, "dev_n": 0},
+        )
+        agg["trials"] += 1
+        agg["flips"] += int(intervals.size)
+        agg["dropped"] += dropped
+        if intervals.size:
+            agg["max_ms"] = max(agg["max_ms"], float(intervals.max() * 1e3))
+            bins = np.minimum((intervals / _HIST_BIN_S).astype(np.int64), _HIST_BINS - 1)
+            hist = self._hist.setdefault(phase, np.zeros(_HIST_BINS, dtype=np.int64))
+            np.add.at(hist, bins, 1)
+        if dev_ms is not None:
+            agg["dev_ms_sum"] += dev_ms
+            agg["dev_n"] += 1
+            agg["dev_ms_max_abs"] = max(agg["dev_ms_max_abs"] or 0.0, abs(dev_ms))
+
+    def _percentile_ms(self, phase: str, q: float) -> float | None:
+        hist = self._hist.get(phase)
+        if hist is None or hist.sum() == 0:
+            return None
+        idx = int(np.searchsorted(np.cumsum(hist), q / 100.0 * hist.sum()))
+        return (idx + 0.5) * _HIST_BIN_S * 1e3
+
+    def report(self) -> dict[str, Any]:
+        phases = {}
+        for phase, agg in self._session.items():
+            phases[phase] = {
+                "trials": agg["trials"],
+                "flips": agg["flips"],
+                "dropped_frames": agg["dropped"],
+                "interval_p50_ms": self._percentile_ms(phase, 50),
+                "interval_p95_ms": self._percentile_ms(phase, 95),
+                "interval_p99_ms": self._percentile_ms(phase, 99),
+                "interval_max_ms": agg["max_ms"],
+                "duration_dev_mean_ms": agg["dev_ms_sum"] / agg["dev_n"] if agg["dev_n"] else None,
+                "duration_dev_max_abs_ms": agg["dev_ms_max_abs"],
+            }
+        return {"frame_period_ms": self.frame_s * 1e3, "phases": phases}
+
+    def write_report(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+def frame_report_path(res_file: str | Path) -> Path:
+    res = Path(res_file)
+    return res.with_name(f"{res.stem}_frame_timing.json")
@@ -0,0 +1,511 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+
+from psyflow import TaskSettings, context_from_config, next_trial_id, runtime_context
+from psyflow.sim import Observation, get_context
+
+from .adaptive import offer_designer
+from .event_log import install_buffered_log
+from .presses import EffortPressLog, record_presses
+from .records import TrialRecordStore
+from .schedule import session_schedule
+from .utils import (
+    choose_fallback_key,
+    parse_offer_condition,
+    qa_scale_duration,
+    reward_draw_win,
+    session_responder,
+    simulate_effort_via_responder,
+    simulated_close_time,
+)
+from .virtual_clock import VirtualClock
+
+# Windowless sim engine: same phases, responder contracts and trial columns as
+# run_trial, but every phase advances a VirtualClock instead of flipping a window.
+# Phase durations go through qa_scale_duration, as StimUnit scales them in QA runs.
+
+
+class HeadlessUnit:
+    """Window-free stand-in for `StimUnit` that records the same state columns."""
+
+    def __init__(self, unit_label: str, clock: VirtualClock, trigger_runtime: Any = None) -> None:
+        self.label = unit_label
+        self.clock = clock
+        self.trigger_runtime = trigger_runtime
+        self.state: dict[str, Any] = {}
+        self._created = clock.now()
+
+    def set_state(self, prefix: str | None = None, **kwargs: Any) -> "HeadlessUnit":
+        effective_prefix = prefix if prefix is not None else self.label
+        for k, v in kwargs.items():
+            self.state[f"{effective_prefix}_{k}" if effective_prefix else k] = v
+        return self
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        if key in self.state:
+            return self.state[key]
+        return self.state.get(f"{self.label}_{key}", default)
+
+    def to_dict(self, target: dict[str, Any] | None = None) -> "HeadlessUnit":
+        if target is not None:
+            target.update(self.state)
+        return self
+
+    def send_trigger(self, code: Any) -> None:
+        if self.trigger_runtime is not None and code is not None:
+            self.trigger_runtime.send(code)
+
+    def _onset(self, duration: float, onset_trigger: Any) -> float:
+        self.set_state(duration=duration)
+        flip_time = self.clock.flip()
+        self.send_trigger(onset_trigger)
+        self.set_state(
+            onset_time=flip_time - self._created,
+            onset_time_global=flip_time,
+            onset_trigger=onset_trigger,
+            flip_time=flip_time,
+        )
+        return flip_time
+
+    def show(self, duration: float, onset_trigger: Any = None) -> "HeadlessUnit":
+        onset = self._onset(duration, onset_trigger)
+        close = self.clock.advance(max(0.0, float(duration) - self.clock.frame_s))
+        self.set_state(close_time=close - onset, close_time_global=close)
+        return self
+
+    def capture_response(
+        self,
+        *,
+        keys: list[str],
+        duration: float,
+        action: Any,
+        onset_trigger: Any = None,
+        response_trigger: dict[str, Any] | None = None,
+        timeout_trigger: Any = None,
+        correct_keys: list[str] | None = None,
+    ) -> "HeadlessUnit":
+        onset = self._onset(duration, onset_trigger)
+        correct = list(correct_keys if correct_keys is not None else keys)
+        key = getattr(action, "key", None)
+        rt = getattr(action, "rt_s", None)
+        if key in keys and rt is not None and float(rt) <= float(duration):
+            rt = float(rt)
+            close = self.clock.advance(rt)
+            code = (response_trigger or {}).get(key)
+            self.set_state(
+                hit=key in correct,
+                correct_keys=correct,
+                response=key,
+                key_press=True,
+                rt=rt,
+                close_time=rt,
+                close_time_global=close,
+            )
+            self.send_trigger(code)
+            self.set_state(response_trigger=code)
+            return self
+
+        close = self.clock.advance(float(duration))
+        self.set_state(
+            hit=False,
+            correct_keys=correct,
+            response=None,
+            key_press=False,
+            rt=None,
+            close_time=close - onset,
+            close_time_global=close,
+            timeout_trigger=timeout_trigger,
+        )
+        self.send_trigger(timeout_trigger)
+        return self
+
+
+def _observe(
+    *,
+    mode: str,
+    trial_id: int,
+    block_id: str | None,
+    phase: str,
+    valid_keys: list[str],
+    deadline_s: float,
+    condition_id: str,
+    task_factors: dict[str, Any],
+    stim_id: str,
+) -> Observation:
+    return Observation(
+        mode=mode,
+        trial_id=trial_id,
+        block_id=block_id,
+        phase=phase,
+        valid_keys=valid_keys,
+        deadline_s=deadline_s,
+        response_window_open=bool(valid_keys),
+        response_window_s=deadline_s,
+        condition_id=condition_id,
+        task_factors=task_factors,
+        stim_id=stim_id,
+    )
+
+
+def run_trial_headless(
+    settings: Any,
+    condition: Any,
+    *,
+    clock: VirtualClock,
+    adapter: Any,
+    trigger_runtime: Any = None,
+    block_id: str | None = None,
+    block_idx: int | None = None,
+    press_log: EffortPressLog | None = None,
+    offer_designer: Any = None,
+) -> dict[str, Any]:
+    """Run one EEfRT trial without a window; mirrors `run_trial` phase by phase."""
+    ctx = get_context()
+    if ctx is None or ctx.responder is None:
+        raise RuntimeError("run_trial_headless requires an active sim runtime context with a responder")
+
+    if offer_designer is not None:
+        condition = offer_designer.assign(condition)
+    probability, hard_reward, cond_id, planned_trial_index, fallback_choice, reward_draw_u = parse_offer_condition(condition)
+    trial_id = next_trial_id()
+    frame = clock.frame_s
+    triggers = settings.triggers
+
+    easy_reward = float(getattr(settings, "easy_reward", 1.00))
+    easy_presses = int(getattr(settings, "easy_required_presses", 30))
+    hard_presses = int(getattr(settings, "hard_required_presses", 100))
+    easy_deadline = qa_scale_duration(float(getattr(settings, "easy_time_limit_s", 7.0)), frame)
+    hard_deadline = qa_scale_duration(float(getattr(settings, "hard_time_limit_s", 21.0)), frame)
+    effort_key = str(getattr(settings, "effort_key", "space"))
+    choice_keys = list(getattr(settings, "choice_keys", ["f", "j"]))
+    easy_key = str(choice_keys[0])
+    hard_key = str(choice_keys[1] if len(choice_keys) > 1 else choice_keys[0])
+
+    trial_data: dict[str, Any] = {
+        "offer_probability": probability,
+        "offer_hard_reward": hard_reward,
+        "offer_easy_reward": easy_reward,
+        "planned_trial_index": planned_trial_index,
+    }
+
+    def make_unit(label: str) -> HeadlessUnit:
+        return HeadlessUnit(label, clock, trigger_runtime)
+
+    def set_phase_context(phase: str, duration: float, task_factors: dict[str, Any], stim_id: str) -> None:
+        # display-only phase: hand the responder the same context `set_trial_context` gives it in run_trial
+        obs = _observe(
+            mode=ctx.mode,
+            trial_id=trial_id,
+            block_id=block_id,
+            phase=phase,
+            valid_keys=[],
+            deadline_s=qa_scale_duration(float(duration), frame),
+            condition_id=cond_id,
+            task_factors=task_factors,
+            stim_id=stim_id,
+        )
+        adapter.handle_response(obs, ctx.responder)
+
+    # phase: offer_fixation
+    set_phase_context(
+        "offer_fixation",
+        settings.cue_duration,
+        {
+            "stage": "offer_fixation",
+            "offer_probability": probability,
+            "offer_hard_reward": hard_reward,
+            "block_idx": block_idx,
+        },
+        "fixation",
+    )
+    make_unit("offer_fixation").show(
+        duration=qa_scale_duration(float(settings.cue_duration), frame),
+        onset_trigger=triggers.get("cue_onset"),
+    ).to_dict(trial_data)
+
+    # --- Choice stage (phase label: offer_choice) ---
+    choice_deadline = qa_scale_duration(float(settings.anticipation_duration), frame)
+    choice_obs = _observe(
+        mode=ctx.mode,
+        trial_id=trial_id,
+        block_id=block_id,
+        phase="offer_choice",
+        valid_keys=[easy_key, hard_key],
+        deadline_s=choice_deadline,
+        condition_id=cond_id,
+        task_factors={
+            "stage": "offer_choice",
+            "offer_probability": probability,
+            "offer_hard_reward": hard_reward,
+            "offer_easy_reward": easy_reward,
+            "easy_required_presses": easy_presses,
+            "hard_required_presses": hard_presses,
+            "easy_key": easy_key,
+            "hard_key": hard_key,
+            "block_idx": block_idx,
+        },
+        stim_id="choice_layout",
+    )
+    choice = make_unit("offer_choice").capture_response(
+        keys=[easy_key, hard_key],
+        correct_keys=[easy_key, hard_key],
+        duration=choice_deadline,
+        action=adapter.handle_response(choice_obs, ctx.responder).used_action,
+        onset_trigger=triggers.get("choice_onset"),
+        response_trigger={
+            easy_key: triggers.get("choice_easy_press"),
+            hard_key: triggers.get("choice_hard_press"),
+        },
+        timeout_trigger=triggers.get("choice_no_response"),
+    )
+
+    choice_key = choice.get_state("response", None)
+    choice_forced = False
+    if choice_key not in (easy_key, hard_key):
+        choice_key = choose_fallback_key(fallback_choice=fallback_choice, easy_key=easy_key, hard_key=hard_key)
+        choice_forced = True
+        choice.send_trigger(triggers.get("choice_forced"))
+
+    choice_option = "hard" if choice_key == hard_key else "easy"
+    required_presses = hard_presses if choice_option == "hard" else easy_presses
+    effort_deadline = hard_deadline if choice_option == "hard" else easy_deadline
+    chosen_reward = hard_reward if choice_option == "hard" else easy_reward
+
+    choice.set_state(
+        choice_key=choice_key,
+        choice_option=choice_option,
+        choice_forced=choice_forced,
+        required_presses=required_presses,
+        effort_deadline_s=effort_deadline,
+        chosen_reward=chosen_reward,
+    ).to_dict(trial_data)
+    if offer_designer is not None:
+        offer_designer.update(probability=probability, hard_reward=hard_reward, hard=choice_option == "hard", forced=choice_forced)
+        trial_data.update(offer_designer.trial_columns())
+
+    # --- Ready ---
+    set_phase_context(
+        "ready",
+        settings.ready_duration,
+        {
+            "stage": "ready",
+            "choice_option": choice_option,
+            "required_presses": required_presses,
+            "effort_deadline_s": effort_deadline,
+            "block_idx": block_idx,
+        },
+        "ready_text",
+    )
+    make_unit("ready").show(
+        duration=qa_scale_duration(float(settings.ready_duration), frame),
+        onset_trigger=triggers.get("ready_onset"),
+    ).to_dict(trial_data)
+
+    # --- Effort stage (phase label: effort_execution_window) ---
+    target = make_unit("effort_execution")
+    target_factors = {
+        "stage": "effort_execution_window",
+        "choice_option": choice_option,
+        "required_presses": required_presses,
+        "effort_deadline_s": effort_deadline,
+        "offer_probability": probability,
+        "offer_hard_reward": hard_reward,
+        "offer_easy_reward": easy_reward,
+        "chosen_reward": chosen_reward,
+        "block_idx": block_idx,
+    }
+    onset_global = clock.now()
+    target.send_trigger(triggers.get("target_onset"))
+    target.set_state(onset_time=0.0, onset_time_global=onset_global, flip_time=clock.flip())
+
+    press_count, first_rt, press_times = simulate_effort_via_responder(
+        trial_id=trial_id,
+        block_id=block_id,
+        condition_id=cond_id,
+        task_factors=target_factors,
+        effort_key=effort_key,
+        deadline_s=effort_deadline,
+    )
+    if press_count > 0:
+        target.send_trigger(triggers.get("target_key_press"))
+    close_time = simulated_close_time(
+        press_times,
+        press_count=press_count,
+        first_rt=first_rt,
+        required_presses=required_presses,
+        deadline_s=effort_deadline,
+    )
+    effort_completed = press_count >= required_presses
+    target.send_trigger(triggers.get("target_complete" if effort_completed else "target_fail"))
+    clock.advance(close_time)
+
+    target.set_state(
+        response=effort_key if press_count > 0 else None,
+        key_press=press_count > 0,
+        rt=first_rt,
+        response_time=first_rt,
+        response_time_global=onset_global + float(first_rt) if first_rt is not None else None,
+        hit=effort_completed,
+        required_presses=required_presses,
+        press_count=press_count,
+        effort_deadline_s=effort_deadline,
+        choice_option=choice_option,
+        close_time=close_time,
+        close_time_global=onset_global + close_time,
+        counter_renders=0,
+        dropped_frames=0,
+        **record_presses(
+            press_log,
+            press_times,
+            required_presses=required_presses,
+            trial_id=trial_id,
+            block_id=block_id,
+            planned_trial_index=planned_trial_index,
+        ),
+    ).to_dict(trial_data)
+
+    # phase: effort_feedback
+    completion_key = "effort_success_feedback" if effort_completed else "effort_fail_feedback"
+    set_phase_context(
+        "effort_feedback",
+        settings.feedback_duration,
+        {
+            "stage": "effort_feedback",
+            "choice_option": choice_option,
+            "effort_completed": effort_completed,
+            "block_idx": block_idx,
+        },
+        completion_key,
+    )
+    make_unit("effort_feedback").show(
+        duration=qa_scale_duration(float(settings.feedback_duration), frame),
+        onset_trigger=triggers.get("feedback_onset"),
+    ).to_dict(trial_data)
+
+    # --- Reward outcome ---
+    reward_win = bool(effort_completed and reward_draw_win(probability=probability, reward_draw_u=reward_draw_u))
+    reward_amount = float(chosen_reward if reward_win else 0.0)
+    if not effort_completed:
+        reward_key, reward_code = "reward_incomplete_feedback", triggers.get("reward_incomplete_onset")
+    elif reward_win:
+        reward_key, reward_code = "reward_win_feedback", triggers.get("reward_win_onset")
+    else:
+        reward_key, reward_code = "reward_nowin_feedback", triggers.get("reward_nowin_onset")
+    set_phase_context(
+        "reward_feedback",
+        settings.reward_feedback_duration,
+        {
+            "stage": "reward_feedback",
+            "choice_option": choice_option,
+            "effort_completed": effort_completed,
+            "reward_win": reward_win,
+            "reward_probability": probability,
+            "block_idx": block_idx,
+        },
+        reward_key,
+    )
+    make_unit("reward_feedback").show(
+        duration=qa_scale_duration(float(settings.reward_feedback_duration), frame),
+        onset_trigger=reward_code,
+    ).set_state(
+        reward_win=reward_win,
+        reward_amount=reward_amount,
+        reward_probability=probability,
+    ).to_dict(trial_data)
+
+    # phase: inter_trial_interval
+    set_phase_context(
+        "inter_trial_interval",
+        settings.iti_duration,
+        {"stage": "inter_trial_interval", "block_idx": block_idx},
+        "fixation",
+    )
+    make_unit("iti").show(
+        duration=qa_scale_duration(float(settings.iti_duration), frame),
+        onset_trigger=triggers.get("iti_onset"),
+    ).to_dict(trial_data)
+
+    trial_data.update(
+        {
+            "condition_label": cond_id,
+            "choice_option": choice_option,
+            "choice_key": choice_key,
+            "choice_forced": choice_forced,
+            "effort_required_presses": required_presses,
+            "effort_press_count": press_count,
+            "effort_completed": effort_completed,
+            "reward_win": reward_win,
+            "reward_amount": reward_amount,
+        }
+    )
+    return trial_data
+
+
+def run_headless_session(
+    cfg: dict[str, Any],
+    *,
+    task_root: Path,
+    trigger_runtime: Any = None,
+    press_log: EffortPressLog | None = None,
+    on_settings: Callable[[TaskSettings], None] | None = None,
+    on_trial: Callable[[dict[str, Any]], None] | None = None,
+) -> tuple[TaskSettings, TrialRecordStore]:
+    """Run every block of a sim config without a window.
+
+    Returns the resolved `TaskSettings` and the trial rows as a typed
+    `TrialRecordStore`, including the `trial_index`, `block_id` and
+    `condition` columns `BlockUnit` appends.
+    `on_settings` runs once the settings are resolved and `on_trial` receives
+    each row as soon as it is produced (e.g. a streaming writer).
+    """
+    ctx = context_from_config(task_dir=task_root, config=cfg, mode="sim")
+    event_log = install_buffered_log(ctx, cfg.get("sim_config"))
+    rows = TrialRecordStore()
+    try:
+        with runtime_context(ctx):
+            participant_id = "sim"
+            if ctx.session is not None:
+                participant_id = str(ctx.session.participant_id or "sim")
+
+            settings = TaskSettings.from_dict(cfg["task_config"])
+            settings.save_path = str(ctx.output_dir)
+            settings.add_subinfo({"subject_id": participant_id})
+            settings.triggers = cfg["trigger_config"]
+            settings.condition_generation = cfg.get("condition_generation_config", {})
+            if on_settings is not None:
+                on_settings(settings)
+
+            # one adapter for choice and effort observations alike
+            responder = session_responder(ctx)
+            if responder is None:
+                raise RuntimeError("Headless sim requires a configured sim responder.")
+            adapter = responder.adapter
+            clock = VirtualClock(frame_s=float(getattr(settings, "frame_time", 1.0 / 60.0) or (1.0 / 60.0)))
+            schedule, _source = session_schedule(settings, settings.condition_generation, task_root=task_root)
+            designer = offer_designer(settings, settings.condition_generation)
+
+            for block_i in range(settings.total_blocks):
+                block_id = f"block_{block_i}"
+                for trial_index, condition in enumerate(schedule.block(block_i)):
+                    row = run_trial_headless(
+                        settings,
+                        condition,
+                        clock=clock,
+                        adapter=adapter,
+                        trigger_runtime=trigger_runtime,
+                        block_id=block_id,
+                        block_idx=block_i,
+                        press_log=press_log,
+                        offer_designer=designer,
+                    )
+                    row.update({"trial_index": trial_index, "block_id": block_id, "condition": condition})
+                    rows.append(row)
+                    if on_trial is not None:
+                        on_trial(row)
+    finally:
+        # flush buffered events even when a trial raises
+        if event_log is not None:
+            event_log.close()
+    return settings, rows
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+def press_buffer(required_presses: int) -> np.ndarray:
+    """Preallocate one trial's press-time buffer before the effort loop starts.
+
+    The loop stops at `required_presses`, but one `getKeys()` batch may
+    overshoot, so a small margin is kept.
+    """
+    return np.empty(max(1, int(required_presses)) + 32, dtype=np.float64)
+
+
+def summarize_press_times(times: np.ndarray, required_presses: int) -> dict[str, Any]:
+    """Summary columns for one trial's press timestamps (seconds from effort onset)."""
+    n = int(times.size)
+    out: dict[str, Any] = {
+        "press_median_ipi_s": None,
+        "press_ipi_cv": None,
+        "press_rate_hz": None,
+        "press_rate_first_half_hz": None,
+        "press_rate_second_half_hz": None,
+        "press_ipi_slope_s": None,
+        "time_to_criterion_s": float(times[required_presses - 1]) if 0 < required_presses <= n else None,
+    }
+    if n < 2:
+        return out
+
+    ipi = np.diff(times)
+    span = float(times[-1] - times[0])
+    out["press_median_ipi_s"] = float(np.median(ipi))
+    mean_ipi = float(ipi.mean())
+    out["press_ipi_cv"] = float(ipi.std() / mean_ipi) if mean_ipi > 0 else None
+    out["press_rate_hz"] = float((n - 1) / span) if span > 0 else None
+
+    half = ipi.size // 2
+    if half >= 1:
+        first, second = ipi[:half], ipi[half:]
+        out["press_rate_first_half_hz"] = float(1.0 / first.mean()) if first.mean() > 0 else None
+        out["press_rate_second_half_hz"] = float(1.0 / second.mean()) if second.mean() > 0 else None
+    if ipi.size >= 3:
+        # Fatigue: change in inter-press interval per press (positive = slowing).
+        out["press_ipi_slope_s"] = float(np.polyfit(np.arange(ipi.size, dtype=np.float64), ipi, 1)[0])
+    return out
+
+
+class EffortPressLog:
+    """Session-level store of every effort press timestamp.
+
+    Trials are appended into one flat float32 buffer with CSR-style offsets, so
+    a session's presses are a handful of arrays rather than per-press objects.
+    `save()` writes a side-car `.npz`; a trial row links to it through
+    `effort_execution_press_log_row`.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._times = np.empty(max(1, int(capacity)), dtype=np.float32)
+        self._n_times = 0
+        self._offsets: list[int] = [0]
+        self._trial_ids: list[int] = []
+        self._block_ids: list[str] = []
+        self._planned_indices: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._trial_ids)
+
+    def append(
+        self,
+        times: np.ndarray,
+        *,
+        trial_id: int,
+        block_id: str | None,
+        planned_trial_index: int | None,
+    ) -> int:
+        """Copy one trial's presses in; returns the side-car row index."""
+        n = int(times.size)
+        need = self._n_times + n
+        if need > self._times.size:
+            grown = np.empty(max(need, 2 * self._times.size), dtype=np.float32)
+            grown[: self._n_times] = self._times[: self._n_times]
+            self._times = grown
+        self._times[self._n_times : need] = times
+        self._n_times = need
+        self._offsets.append(need)
+        self._trial_ids.append(int(trial_id))
+        self._block_ids.append(str(block_id or ""))
+        self._planned_indices.append(-1 if planned_trial_index is None else int(planned_trial_index))
+        return len(self._trial_ids) - 1
+
+    @property
+    def max_trial_id(self) -> int:
+        return max(self._trial_ids, default=0)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EffortPressLog":
+        with np.load(path, allow_pickle=False) as data:
+            times = data["times_s"]
+            log = cls(capacity=max(4096, 2 * int(times.size)))
+            log._times[: times.size] = times
+            log._n_times = int(times.size)
+            log._offsets = [int(v) for v in data["offsets"]]
+            log._trial_ids = [int(v) for v in data["trial_id"]]
+            log._block_ids = [str(v) for v in data["block_id"]]
+            log._planned_indices = [int(v) for v in data["planned_trial_index"]]
+        return log
+
+    @classmethod
+    def for_resume(cls, path: str | Path, rows: list[dict[str, Any]]) -> "EffortPressLog":
+        """Continue a resumed session's side-car so new trials get fresh row indexes.
+
+        Loads `path` when it exists. Rows the completed trials reference but the
+        side-car lacks (presses not yet saved when the session stopped) are
+        filled with empty entries, so `effort_execution_press_log_row` values
+        never repeat.
+        """
+        log = cls.load(path) if Path(path).exists() else cls()
+        referenced = {}
+        for row in rows:
+            index = row.get("effort_execution_press_log_row")
+            if index not in (None, ""):
+                referenced[int(index)] = row
+        for index in range(len(log), max(referenced, default=-1) + 1):
+            row = referenced.get(index, {})
+            planned = row.get("planned_trial_index")
+            log.append(
+                np.empty(0, dtype=np.float32),
+                trial_id=-1,
+                block_id=row.get("block_id"),
+                planned_trial_index=None if planned in (None, "") else int(planned),
+            )
+        return log
+
+    def trial_times(self, row: int) -> np.ndarray:
+        return self._times[self._offsets[row] : self._offsets[row + 1]]
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            times_s=self._times[: self._n_times],
+            offsets=np.asarray(self._offsets, dtype=np.int64),
+            trial_id=np.asarray(self._trial_ids, dtype=np.int64),
+            block_id=np.asarray(self._block_ids, dtype=str),
+            planned_trial_index=np.asarray(self._planned_indices, dtype=np.int64),
+        )
+        return path
+
+
+def record_presses(
+    press_log: EffortPressLog | None,
+    times: np.ndarray,
+    *,
+    required_presses: int,
+    trial_id: int,
+    block_id: str | None,
+    planned_trial_index: int | None,
+) -> dict[str, Any]:
+    """Store one trial's presses and return its effort state columns."""
+    row = None
+    if press_log is not None:
+        row = press_log.append(times, trial_id=trial_id, block_id=block_id, planned_trial_index=planned_trial_index)
+    return {"press_log_row": row, **summarize_press_times(times, required_presses)}
+
+
+def press_log_path(res_file: str | Path) -> Path:
+    """Side-car path next to the trial CSV."""
+    res = Path(res_file)
+    return res.with_name(f"{res.stem}_effort_presses.npz")
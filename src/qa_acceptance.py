@@ -0,0 +1,192 @@
+"""Incremental QA acceptance checks with fail-fast abort.
+
+`qa.acceptance_criteria` is compiled once into an `AcceptanceValidator`. Each
+trial row is checked as `main.py` streams it, and trigger sends are checked
+through `watch()`, so a broken QA run stops at the first bad trial. The
+error carries a report naming the criterion, trial and block, plus the phase
+for column and key failures (trigger and trial-count failures are trial-level,
+so their `phase` is None). The same report is written to
+`qa_acceptance_report.json` next to the trace.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+# StimUnit labels used by run_trial, in trial order; column prefixes map to these.
+TRIAL_PHASES = (
+    "offer_fixation",
+    "offer_choice",
+    "ready",
+    "effort_execution",
+    "effort_feedback",
+    "reward_feedback",
+    "iti",
+)
+# Row columns holding a pressed key (other than `<phase>_response`).
+KEY_COLUMNS = ("choice_key",)
+
+
+class QAAcceptanceError(RuntimeError):
+    """A QA acceptance criterion failed; `report` says where (`phase` only for column/key criteria)."""
+
+    def __init__(self, report: dict[str, Any]) -> None:
+        self.report = report
+        where = ", ".join(f"{k}={report[k]}" for k in ("trial_index", "block_id", "phase") if report.get(k) is not None)
+        super().__init__(f"QA acceptance failed [{report['criterion']}]{f' {where}' if where else ''}: {report['message']}")
+
+
+def _phase_of(column: str) -> str | None:
+    for phase in sorted(TRIAL_PHASES, key=len, reverse=True):
+        if column.startswith(f"{phase}_"):
+            return phase
+    return None
+
+
+class _TriggerWatch:
+    """Trigger runtime proxy that records sends for the validator."""
+
+    def __init__(self, runtime: Any, validator: "AcceptanceValidator") -> None:
+        self.runtime = runtime
+        self._validator = validator
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.runtime, attr)
+
+    def send(self, code: Any, *args: Any, **kwargs: Any) -> Any:
+        if code is not None:
+            self._validator.record_trigger(code)
+        return self.runtime.send(code, *args, **kwargs)
+
+
+class AcceptanceValidator:
+    """`qa.acceptance_criteria` compiled for per-trial checks.
+
+    Criteria: `required_columns` (present and non-empty in every row),
+    `expected_trial_count` (never exceeded; reached by `finish()`),
+    `allowed_keys` (every recorded response key) and `triggers_required`
+    (each trial sends at least one trigger and every code is in the map).
+    """
+
+    def __init__(
+        self,
+        *,
+        required_columns: list[str] | None = None,
+        expected_trial_count: int | None = None,
+        allowed_keys: list[str] | None = None,
+        triggers_required: bool = False,
+        trigger_map: dict[str, Any] | None = None,
+        report_path: str | Path | None = None,
+    ) -> None:
+        self.required = tuple((column, _phase_of(column)) for column in (required_columns or []))
+        self.expected_trial_count = int(expected_trial_count) if expected_trial_count is not None else None
+        self.allowed_keys = frozenset(str(k) for k in allowed_keys) if allowed_keys else None
+        self.key_columns = tuple((f"{phase}_response", phase) for phase in TRIAL_PHASES) + tuple(
+            (column, "offer_choice") for column in KEY_COLUMNS
+        )
+        self.triggers_required = bool(triggers_required)
+        self.trigger_names = {code: name for name, code in (trigger_map or {}).items() if code is not None}
+        self.report_path = Path(report_path) if report_path is not None else None
+        self.n_trials = 0
+        self._trial_triggers = 0
+        self._bad_trigger: Any = None
+
+    @classmethod
+    def from_config(
+        cls,
+        criteria: dict[str, Any] | None,
+        *,
+        trigger_map: dict[str, Any] | None = None,
+        report_path: str | Path | None = None,
+    ) -> "AcceptanceValidator | None":
+        """Validator for a `qa.acceptance_criteria` mapping; None when there are no criteria."""
+        criteria = dict(criteria or {})
+        if not criteria:
+            return None
+        return cls(
+            required_columns=list(criteria.get("required_columns") or []),
+            expected_trial_count=criteria.get("expected_trial_count"),
+            allowed_keys=criteria.get("allowed_keys"),
+            triggers_required=bool(criteria.get("triggers_required", False)),
+            trigger_map=trigger_map,
+            report_path=report_path,
+        )
+
+    def watch(self, trigger_runtime: Any) -> Any:
+        """Wrap the trigger runtime so sends are checked (no-op without `triggers_required`)."""
+        return _TriggerWatch(trigger_runtime, self) if self.triggers_required else trigger_runtime
+
+    def begin_trial(self) -> None:
+        """Start a trial's trigger count; sends before this (exp/block onsets) do not count toward it."""
+        self._trial_triggers = 0
+
+    def record_trigger(self, code: Any) -> None:
+        # Called from the sender thread in async dispatch: record only, raise at the trial boundary.
+        self._trial_triggers += 1
+        if self._bad_trigger is None and self.trigger_names and code not in self.trigger_names:
+            self._bad_trigger = code
+
+    def _fail(self, criterion: str, message: str, row: dict[str, Any] | None = None, **extra: Any) -> None:
+        row = row or {}
+        report = {
+            "criterion": criterion,
+            "message": message,
+            "trial_index": row.get("trial_index"),
+            "trial_id": row.get("trial_id"),
+            "block_id": row.get("block_id"),
+            "condition": row.get("condition_label"),
+            "trials_checked": self.n_trials,
+            **extra,
+        }
+        report.setdefault("phase", None)
+        if self.report_path is not None:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, default=str)
+        raise QAAcceptanceError(report)
+
+    def check_row(self, row: dict[str, Any]) -> None:
+        """Check one finished trial row; raises `QAAcceptanceError` on the first violation."""
+        self.n_trials += 1
+        if self.expected_trial_count is not None and self.n_trials > self.expected_trial_count:
+            self._fail(
+                "expected_trial_count",
+                f"trial {self.n_trials} exceeds expected_trial_count={self.expected_trial_count}",
+                row,
+            )
+        for column, phase in self.required:
+            value = row.get(column)
+            if value is None or value == "":
+                self._fail("required_columns", f"column {column!r} missing or empty", row, phase=phase, column=column)
+        if self.allowed_keys is not None:
+            for column, phase in self.key_columns:
+                value = row.get(column)
+                if value not in (None, "") and str(value) not in self.allowed_keys:
+                    self._fail(
+                        "allowed_keys",
+                        f"{column}={value!r} not in allowed_keys {sorted(self.allowed_keys)}",
+                        row,
+                        phase=phase,
+                        column=column,
+                    )
+        if self.triggers_required:
+            sent, bad = self._trial_triggers, self._bad_trigger
+            self._trial_triggers = 0
+            if bad is not None:
+                self._fail("triggers_required", f"trigger code {bad!r} is not in the trigger map", row, code=bad)
+            if sent == 0:
+                self._fail("triggers_required", "no trigger was sent during the trial", row)
+
+    def finish(self) -> None:
+        """End-of-run check for criteria that need the whole session."""
+        if self.expected_trial_count is not None and self.n_trials != self.expected_trial_count:
+            self._fail(
+                "expected_trial_count",
+                f"run ended after {self.n_trials} trials, expected {self.expected_trial_count}",
+            )
+
+
+def acceptance_report_path(res_file: str | Path) -> Path:
+    return Path(res_file).with_name("qa_acceptance_report.json")
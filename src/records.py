@@ -0,0 +1,241 @@
+"""Typed columnar storage for trial rows.
+
+`TrialRecordStore` keeps each trial column in a preallocated NumPy array that
+doubles when full, instead of one dict of boxed values per trial. Column kinds
+are fixed from the first row that sets them (every trial passes the same
+phases, so the first row carries the full set):
+
+- ``f`` float64, missing as NaN
+- ``i`` int64 and ``b`` bool, each with a validity mask
+- ``s`` strings as int32 category codes into a per-column vocabulary (-1 = missing)
+- ``o`` object, for values that are none of the above (e.g. the condition tuple)
+
+A numeric column that later receives a wider value is widened in place (bool
+to int, bool or int to float, anything to object for strings); columns keep
+the order in which their keys first appear, even when the first value is None.
+`to_pandas()` hands the arrays to nullable extension arrays and categoricals
+without a per-row pass; `to_arrow()` does the same for pyarrow.
+"""
+
+from __future__ import annotations
+
+import numbers
+from typing import Any, Iterator
+
+import numpy as np
+
+_NUMPY_DTYPES = {"f": np.float64, "i": np.int64, "b": np.bool_, "s": np.int32, "o": object}
+
+
+def _kind(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return "b"
+    if isinstance(value, numbers.Integral):
+        return "i"
+    if isinstance(value, numbers.Real):
+        return "f"
+    if isinstance(value, str):
+        return "s"
+    return "o"
+
+
+def _merge_kind(current: str, new: str) -> str:
+    if current == new:
+        return current
+    if {current, new} == {"i", "b"}:
+        return "i"
+    if {current, new} <= {"i", "f", "b"}:
+        return "f"
+    return "o"
+
+
+class _Column:
+    __slots__ = ("kind", "values", "mask", "vocab", "codes")
+
+    def __init__(self, kind: str, capacity: int) -> None:
+        self.kind = kind
+        self.values = np.full(capacity, np.nan) if kind == "f" else np.zeros(capacity, dtype=_NUMPY_DTYPES[kind])
+        self.mask = np.zeros(capacity, dtype=bool) if kind in ("i", "b") else None
+        self.vocab: list[str] = []
+        self.codes: dict[str, int] = {}
+        if kind == "s":
+            self.values.fill(-1)
+        elif kind == "o":
+            self.values.fill(None)
+
+    def grow(self, capacity: int) -> None:
+        old = self.values.shape[0]
+        fill = {"f": np.nan, "s": -1, "o": None}.get(self.kind, 0)
+        values = np.full(capacity, fill, dtype=self.values.dtype)
+        values[:old] = self.values
+        self.values = values
+        if self.mask is not None:
+            mask = np.zeros(capacity, dtype=bool)
+            mask[:old] = self.mask
+            self.mask = mask
+
+    def set(self, i: int, value: Any) -> None:
+        if value is None:
+            return
+        if self.kind == "s":
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.vocab)
+                self.vocab.append(value)
+            self.values[i] = code
+            return
+        self.values[i] = value
+        if self.mask is not None:
+            self.mask[i] = True
+
+    def get(self, i: int) -> Any:
+        if self.kind == "s":
+            code = int(self.values[i])
+            return self.vocab[code] if code >= 0 else None
+        if self.mask is not None and not self.mask[i]:
+            return None
+        value = self.values[i]
+        if self.kind == "f":
+            return None if np.isnan(value) else float(value)
+        return value.item() if isinstance(value, np.generic) else value
+
+    def decoded(self, n: int) -> np.ndarray:
+        """Values as an object array with None for missing (used when widening)."""
+        return np.array([self.get(i) for i in range(n)], dtype=object)
+
+
+class TrialRecordStore:
+    """Append trial rows into typed, preallocated columns."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._capacity = max(1, int(capacity))
+        self._n = 0
+        self._columns: dict[str, _Column] = {}
+        # every key seen so far, in first-seen order; a column is created on its first non-None value
+        self._order: dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._order)
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for column in self._columns.values():
+            total += column.values.nbytes + (column.mask.nbytes if column.mask is not None else 0)
+        return total
+
+    def _column_for(self, name: str, value: Any) -> _Column | None:
+        kind = _kind(value)
+        column = self._columns.get(name)
+        if column is None:
+            if kind is None:
+                return None
+            column = self._columns[name] = _Column(kind, self._capacity)
+            return column
+        if (
+            kind is None
+            or kind == column.kind
+            or column.kind == "o"
+            or (column.kind == "f" and kind in ("i", "b"))
+            or (column.kind == "i" and kind == "b")
+        ):
+            return column
+        return self._widen(name, _merge_kind(column.kind, kind))
+
+    def _widen(self, name: str, kind: str) -> _Column:
+        old = self._columns[name]
+        column = _Column(kind, self._capacity)
+        for i, value in enumerate(old.decoded(self._n)):
+            column.set(i, value)
+        self._columns[name] = column
+        return column
+
+    def append(self, row: dict[str, Any]) -> None:
+        if self._n == self._capacity:
+            self._capacity *= 2
+            for column in self._columns.values():
+                column.grow(self._capacity)
+        i = self._n
+        for name, value in row.items():
+            if name not in self._order:
+                self._order[name] = None
+            column = self._column_for(name, value)
+            if column is not None:
+                column.set(i, value)
+        self._n += 1
+
+    def extend(self, rows: Any) -> None:
+        for row in rows:
+            self.append(row)
+
+    def row(self, i: int) -> dict[str, Any]:
+        if not -self._n <= i < self._n:
+            raise IndexError(i)
+        i %= self._n
+        columns = self._columns
+        return {name: columns[name].get(i) if name in columns else None for name in self._order}
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(self._n):
+            yield self.row(i)
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw column values (view): category codes for strings, unmasked values for int/bool."""
+        if name in self._order and name not in self._columns:
+            return np.full(self._n, None, dtype=object)
+        return self._columns[name].values[: self._n]
+
+    def to_pandas(self) -> Any:
+        import pandas as pd
+
+        n = self._n
+        data: dict[str, Any] = {}
+        for name in self._order:
+            column = self._columns.get(name)
+            if column is None:
+                data[name] = np.full(n, None, dtype=object)
+                continue
+            values = column.values[:n]
+            if column.kind == "f" or column.kind == "o":
+                data[name] = values
+            elif column.kind == "i":
+                data[name] = pd.arrays.IntegerArray(values, ~column.mask[:n])
+            elif column.kind == "b":
+                data[name] = pd.arrays.BooleanArray(values, ~column.mask[:n])
+            else:
+                data[name] = pd.Categorical.from_codes(values, categories=column.vocab)
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self) -> Any:
+        import pyarrow as pa
+
+        n = self._n
+        arrays, names = [], []
+        for name in self._order:
+            column = self._columns.get(name)
+            if column is None:
+                arrays.append(pa.nulls(n))
+                names.append(name)
+                continue
+            values = column.values[:n]
+            if column.kind == "f":
+                array = pa.array(values, mask=np.isnan(values))
+            elif column.kind in ("i", "b"):
+                array = pa.array(values, mask=~column.mask[:n])
+            elif column.kind == "s":
+                indices = pa.array(values, mask=values < 0)
+                array = pa.DictionaryArray.from_arrays(indices, pa.array(column.vocab, type=pa.string()))
+            else:
+                array = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+            arrays.append(array)
+            names.append(name)
+        return pa.Table.from_arrays(arrays, names=names)
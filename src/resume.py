@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .trial_writer import iter_stream
+from .utils import parse_offer_condition
+
+
+def _coerce(value: str) -> Any:
+    """Undo CSV stringification for values written by `TrialStreamWriter.finalize_csv`."""
+    if value == "":
+        return None
+    if value in ("True", "False"):
+        return value == "True"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_result_rows(path: str | Path) -> list[dict[str, Any]]:
+    """Read finished trials from a trial stream (`.jsonl`) or a results CSV."""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        return list(iter_stream(path))
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [{k: _coerce(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+
+@dataclass
+class ResumeState:
+    """Trials already completed in an interrupted session."""
+
+    source: Path
+    rows: list[dict[str, Any]]
+    done: dict[tuple[str, int], dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ResumeState":
+        rows = read_result_rows(path)
+        done = {}
+        for row in rows:
+            if row.get("planned_trial_index") is None:
+                continue
+            done[(str(row.get("block_id")), int(row["planned_trial_index"]))] = row
+        return cls(source=Path(path), rows=rows, done=done)
+
+    @property
+    def total_reward(self) -> float:
+        return sum(float(row.get("reward_amount") or 0.0) for row in self.rows)
+
+    def block_rows(self, block_id: str) -> list[dict[str, Any]]:
+        return [row for row in self.rows if str(row.get("block_id")) == block_id]
+
+    def remaining(self, block_id: str, conditions: list[Any]) -> list[Any]:
+        """Drop completed trials from a regenerated block schedule.
+
+        Raises `ValueError` if a completed trial's condition id does not match
+        the regenerated spec (different seed, subject or condition config).
+        Adaptive-design rows are checked on `planned_condition_id`, since their
+        `condition_label` names the offer the designer chose instead.
+        """
+        todo = []
+        for condition in conditions:
+            _p, _r, cond_id, planned_trial_index, _fallback, _u = parse_offer_condition(condition)
+            row = self.done.get((block_id, int(planned_trial_index or 0)))
+            if row is None:
+                todo.append(condition)
+                continue
+            recorded = row.get("planned_condition_id") or row.get("condition_label")
+            if recorded not in (None, cond_id):
+                raise ValueError(
+                    f"Resume schedule mismatch in {block_id} trial {planned_trial_index}: "
+                    f"results have {recorded!r}, regenerated {cond_id!r}"
+                )
+        return todo
@@ -4,21 +4,30 @@ from functools import partial
 from typing import Any
 
 from psyflow import StimUnit, set_trial_context, next_trial_id
-from psyflow.sim import get_context
-from .utils import choose_fallback_key, parse_offer_condition, reward_draw_win, run_effort_execution
+from .utils import (
+    choose_fallback_key,
+    effort_text_args,
+    offer_text_args,
+    parse_offer_condition,
+    qa_scale_duration,
+    reward_draw_win,
+    reward_text_args,
+    run_effort_execution,
+)
+from .startup import idle_scope
 
 # run_trial uses task-specific phase labels via set_trial_context(...).
 
 
 def _qa_scale_duration(duration_s: float, win) -> float:
-    base = max(0.0, float(duration_s))
-    ctx = get_context()
-    if ctx is None or not ctx.config.enable_scaling:
-        return base
     frame = float(getattr(win, "monitorFramePeriod", 1.0 / 60.0) or (1.0 / 60.0))
-    min_frames = int(max(1, ctx.config.min_frames))
-    scaled = base * float(ctx.config.timing_scale)
-    return max(scaled, frame * min_frames)
+    return qa_scale_duration(duration_s, frame)
+
+
+def _begin_phase(frame_timer, phase: str, requested_s: float | None, win) -> None:
+    # deviation is measured against the duration actually shown, i.e. after the QA timing scale
+    if frame_timer is not None:
+        frame_timer.begin_phase(phase, None if requested_s is None else _qa_scale_duration(requested_s, win))
 
 
 def run_trial(
@@ -30,8 +39,14 @@ def run_trial(
     trigger_runtime,
     block_id=None,
     block_idx=None,
+    press_log=None,
+    frame_timer=None,
+    stim_preloader=None,
+    offer_designer=None,
 ):
     """Run one EEfRT trial."""
+    if offer_designer is not None:
+        condition = offer_designer.assign(condition)
     probability, hard_reward, cond_id, planned_trial_index, fallback_choice, reward_draw_u = parse_offer_condition(condition)
     trial_id = next_trial_id()
 
@@ -73,37 +88,24 @@ def run_trial(
         },
         stim_id="fixation",
     )
+    _begin_phase(frame_timer, "offer_fixation", float(settings.cue_duration), win)
     cue.show(
         duration=float(settings.cue_duration),
         onset_trigger=settings.triggers.get("cue_onset"),
     ).to_dict(trial_data)
 
     # --- Choice stage (phase label: offer_choice) ---
-    choice = (
-        make_unit(unit_label="offer_choice")
-        .add_stim(
-            stim_bank.get_and_format(
-                "choice_header",
-                probability_pct=int(round(probability * 100)),
-            )
-        )
-        .add_stim(
-            stim_bank.get_and_format(
-                "choice_left",
-                easy_reward=f"{easy_reward:.2f}",
-                easy_presses=easy_presses,
-                easy_deadline_s=f"{easy_deadline:.1f}",
-            )
-        )
-        .add_stim(
-            stim_bank.get_and_format(
-                "choice_right",
-                hard_reward=f"{hard_reward:.2f}",
-                hard_presses=hard_presses,
-                hard_deadline_s=f"{hard_deadline:.1f}",
-            )
-        )
-    )
+    choice = make_unit(unit_label="offer_choice")
+    for name, format_args in offer_text_args(
+        probability=probability,
+        hard_reward=hard_reward,
+        easy_reward=easy_reward,
+        easy_presses=easy_presses,
+        hard_presses=hard_presses,
+        easy_deadline=easy_deadline,
+        hard_deadline=hard_deadline,
+    ).items():
+        choice.add_stim(stim_bank.get_and_format(name, **format_args))
     set_trial_context(
         choice,
         trial_id=trial_id,
@@ -125,6 +127,7 @@ def run_trial(
         },
         stim_id="choice_layout",
     )
+    _begin_phase(frame_timer, "offer_choice", None, win)
     choice.capture_response(
         keys=[easy_key, hard_key],
         correct_keys=[easy_key, hard_key],
@@ -162,15 +165,20 @@ def run_trial(
         effort_deadline_s=effort_deadline,
         chosen_reward=chosen_reward,
     ).to_dict(trial_data)
+    if offer_designer is not None:
+        offer_designer.update(probability=probability, hard_reward=hard_reward, hard=choice_option == "hard", forced=choice_forced)
+        trial_data.update(offer_designer.trial_columns())
 
     # --- Ready ---
     ready = make_unit(unit_label="ready").add_stim(
         stim_bank.get_and_format(
             "ready_text",
-            choice_label=choice_label,
-            required_presses=required_presses,
-            effort_key=effort_key.upper(),
-            time_limit_s=f"{effort_deadline:.1f}",
+            **effort_text_args(
+                choice_label=choice_label,
+                required_presses=required_presses,
+                effort_key=effort_key,
+                effort_deadline=effort_deadline,
+            ),
         )
     )
     set_trial_context(
@@ -190,6 +198,7 @@ def run_trial(
         },
         stim_id="ready_text",
     )
+    _begin_phase(frame_timer, "ready", float(settings.ready_duration), win)
     ready.show(
         duration=float(settings.ready_duration),
         onset_trigger=settings.triggers.get("ready_onset"),
@@ -220,6 +229,7 @@ def run_trial(
         stim_id="effort_stage",
     )
 
+    _begin_phase(frame_timer, "effort_execution", None, win)
     effort_result = run_effort_execution(
         win=win,
         kb=kb,
@@ -241,6 +251,8 @@ def run_trial(
         required_presses=required_presses,
         effort_key=effort_key,
         effort_deadline=effort_deadline,
+        planned_trial_index=planned_trial_index,
+        press_log=press_log,
     )
     press_count = int(effort_result["press_count"])
     first_rt = effort_result["first_rt"]
@@ -266,6 +278,7 @@ def run_trial(
         },
         stim_id=completion_key,
     )
+    _begin_phase(frame_timer, "effort_feedback", float(settings.feedback_duration), win)
     feedback.show(
         duration=float(settings.feedback_duration),
         onset_trigger=settings.triggers.get("feedback_onset"),
@@ -278,10 +291,7 @@ def run_trial(
         reward_stim = stim_bank.get("reward_incomplete_feedback")
         reward_code = settings.triggers.get("reward_incomplete_onset")
     elif reward_win:
-        reward_stim = stim_bank.get_and_format(
-            "reward_win_feedback",
-            reward_amount=f"{reward_amount:.2f}",
-        )
+        reward_stim = stim_bank.get_and_format("reward_win_feedback", **reward_text_args(reward_amount))
         reward_code = settings.triggers.get("reward_win_onset")
     else:
         reward_stim = stim_bank.get("reward_nowin_feedback")
@@ -312,6 +322,7 @@ def run_trial(
             else "reward_nowin_feedback"
         ),
     )
+    _begin_phase(frame_timer, "reward_feedback", float(settings.reward_feedback_duration), win)
     reward_fb.show(
         duration=float(settings.reward_feedback_duration),
         onset_trigger=reward_code,
@@ -334,10 +345,14 @@ def run_trial(
         task_factors={"stage": "inter_trial_interval", "block_idx": block_idx},
         stim_id="fixation",
     )
-    iti.show(
-        duration=float(settings.iti_duration),
-        onset_trigger=settings.triggers.get("iti_onset"),
-    ).to_dict(trial_data)
+    _begin_phase(frame_timer, "iti", float(settings.iti_duration), win)
+    with idle_scope(stim_preloader):
+        iti.show(
+            duration=float(settings.iti_duration),
+            onset_trigger=settings.triggers.get("iti_onset"),
+        ).to_dict(trial_data)
+    if frame_timer is not None:
+        trial_data.update(frame_timer.end_trial())
 
     trial_data.update(
         {
@@ -355,3 +370,53 @@ def run_trial(
 
     return trial_data
 
+
+def prewarm_offer_stims(win, settings, conditions, stim_bank) -> int:
+    """Format every text screen the block's offers can show, filling `stim_bank`'s cache.
+
+    Covers the choice screen per offer, the ready/effort prompts for both
+    options and the win feedback for every reachable reward. Returns the number
+    of formatted stims requested.
+    """
+    easy_reward = float(getattr(settings, "easy_reward", 1.00))
+    easy_presses = int(getattr(settings, "easy_required_presses", 30))
+    hard_presses = int(getattr(settings, "hard_required_presses", 100))
+    easy_deadline = _qa_scale_duration(float(getattr(settings, "easy_time_limit_s", 7.0)), win)
+    hard_deadline = _qa_scale_duration(float(getattr(settings, "hard_time_limit_s", 21.0)), win)
+    effort_key = str(getattr(settings, "effort_key", "space"))
+    options = (
+        (str(getattr(settings, "easy_choice_label")), easy_presses, easy_deadline),
+        (str(getattr(settings, "hard_choice_label")), hard_presses, hard_deadline),
+    )
+
+    requests: dict[tuple, tuple[str, dict[str, Any]]] = {}
+    rewards = {easy_reward}
+    for condition in conditions:
+        probability, hard_reward, *_rest = parse_offer_condition(condition)
+        rewards.add(hard_reward)
+        for name, format_args in offer_text_args(
+            probability=probability,
+            hard_reward=hard_reward,
+            easy_reward=easy_reward,
+            easy_presses=easy_presses,
+            hard_presses=hard_presses,
+            easy_deadline=easy_deadline,
+            hard_deadline=hard_deadline,
+        ).items():
+            requests[(name, *sorted(format_args.items()))] = (name, format_args)
+    for choice_label, required_presses, effort_deadline in options:
+        format_args = effort_text_args(
+            choice_label=choice_label,
+            required_presses=required_presses,
+            effort_key=effort_key,
+            effort_deadline=effort_deadline,
+        )
+        for name in ("ready_text", "effort_prompt"):
+            requests[(name, *sorted(format_args.items()))] = (name, format_args)
+    for reward in rewards:
+        format_args = reward_text_args(reward)
+        requests[("reward_win_feedback", *sorted(format_args.items()))] = ("reward_win_feedback", format_args)
+
+    for name, format_args in requests.values():
+        stim_bank.get_and_format(name, **format_args)
+    return len(requests)
@@ -0,0 +1,271 @@
+"""Precomputed, cacheable session offer schedules.
+
+A schedule holds every block's offer conditions for one session in a compact
+`.npz` file (no pickled objects). Files are named by a hash of the
+`condition_generation` config, condition labels, trials per block and block
+seeds, so any session with the same inputs loads the identical schedule.
+
+Export schedules for a study up front::
+
+    python -m src.schedule config/config.yaml --subjects 101 102 103 --out-dir schedules
+
+and point `condition_generation.schedule_dir` at the directory; `main.py`
+then loads the matching file at startup (and writes it on a cache miss).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .counter_offers import build_counter_offer_conditions
+from .utils import EEFRTOfferCondition, build_eefrt_offer_conditions, condition_generation_kwargs
+
+SCHEDULE_VERSION = 1
+
+
+def schedule_key(
+    cg_cfg: dict[str, Any] | None,
+    *,
+    condition_labels: list[Any],
+    trials_per_block: int,
+    block_seeds: list[int | None],
+    subject: str = "",
+) -> str:
+    """Content hash of every input that determines a session's offer schedule."""
+    kwargs = condition_generation_kwargs(cg_cfg)
+    kwargs.pop("enable_logging")
+    if kwargs["rng"] == "sequential":
+        # sequential schedules ignore the subject; keep their pre-counter keys
+        kwargs.pop("rng")
+    else:
+        kwargs["subject"] = str(subject)
+    spec = {
+        "version": SCHEDULE_VERSION,
+        "condition_generation": kwargs,
+        "condition_labels": [str(label) for label in condition_labels],
+        "trials_per_block": int(trials_per_block),
+        "block_seeds": [None if s is None else int(s) for s in block_seeds],
+    }
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def schedule_filename(key: str) -> str:
+    return f"eefrt_schedule_{key[:16]}.npz"
+
+
+@dataclass(frozen=True)
+class OfferSchedule:
+    """Column-wise offer conditions for all blocks of one session."""
+
+    key: str
+    block_seeds: np.ndarray
+    offsets: np.ndarray
+    probability: np.ndarray
+    hard_reward: np.ndarray
+    condition_id: np.ndarray
+    trial_index: np.ndarray
+    fallback_hard: np.ndarray
+    reward_draw_u: np.ndarray
+
+    @property
+    def n_blocks(self) -> int:
+        return int(self.offsets.size - 1)
+
+    @classmethod
+    def build(
+        cls,
+        cg_cfg: dict[str, Any] | None,
+        *,
+        condition_labels: list[Any],
+        trials_per_block: int,
+        block_seeds: list[int | None],
+        subject: str = "",
+    ) -> "OfferSchedule":
+        kwargs = condition_generation_kwargs(cg_cfg)
+        rng = kwargs.pop("rng")
+        if rng == "counter":
+            blocks = [
+                build_counter_offer_conditions(
+                    int(trials_per_block), condition_labels, seed=seed, block_idx=block_idx, subject=subject, **kwargs
+                )
+                for block_idx, seed in enumerate(block_seeds)
+            ]
+        elif rng == "sequential":
+            blocks = [
+                build_eefrt_offer_conditions(int(trials_per_block), condition_labels, seed=seed, **kwargs)
+                for seed in block_seeds
+            ]
+        else:
+            raise ValueError(f"Unsupported condition_generation.rng {rng!r}; expected 'sequential' or 'counter'")
+        rows = [row for block in blocks for row in block]
+        offsets = np.zeros(len(blocks) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(block) for block in blocks])
+        return cls(
+            key=schedule_key(
+                cg_cfg,
+                condition_labels=condition_labels,
+                trials_per_block=trials_per_block,
+                block_seeds=block_seeds,
+                subject=subject,
+            ),
+            block_seeds=np.array([-1 if s is None else int(s) for s in block_seeds], dtype=np.int64),
+            offsets=offsets,
+            probability=np.array([r[0] for r in rows], dtype=np.float64),
+            hard_reward=np.array([r[1] for r in rows], dtype=np.float64),
+            condition_id=np.array([r[2] for r in rows], dtype=np.str_),
+            trial_index=np.array([r[3] for r in rows], dtype=np.int32),
+            fallback_hard=np.array([r[4] == "hard" for r in rows], dtype=bool),
+            reward_draw_u=np.array([r[5] for r in rows], dtype=np.float64),
+        )
+
+    def block(self, block_idx: int) -> list[EEFRTOfferCondition]:
+        """Conditions for one block in the tuple format `run_trial` consumes."""
+        lo, hi = int(self.offsets[block_idx]), int(self.offsets[block_idx + 1])
+        return [
+            (
+                float(self.probability[i]),
+                float(self.hard_reward[i]),
+                str(self.condition_id[i]),
+                int(self.trial_index[i]),
+                "hard" if self.fallback_hard[i] else "easy",
+                float(self.reward_draw_u[i]),
+            )
+            for i in range(lo, hi)
+        ]
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(
+            tmp_path,
+            key=np.array(self.key),
+            version=np.array(SCHEDULE_VERSION),
+            block_seeds=self.block_seeds,
+            offsets=self.offsets,
+            probability=self.probability,
+            hard_reward=self.hard_reward,
+            condition_id=self.condition_id,
+            trial_index=self.trial_index,
+            fallback_hard=self.fallback_hard,
+            reward_draw_u=self.reward_draw_u,
+        )
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path, *, expected_key: str | None = None) -> "OfferSchedule":
+        """Read a schedule file; raises `ValueError` if it was built from other inputs."""
+        with np.load(path, allow_pickle=False) as data:
+            key = str(data["key"])
+            if int(data["version"]) != SCHEDULE_VERSION:
+                raise ValueError(f"Schedule {path} has version {int(data['version'])}, expected {SCHEDULE_VERSION}")
+            if expected_key is not None and key != expected_key:
+                raise ValueError(f"Schedule {path} key {key[:16]} does not match config key {expected_key[:16]}")
+            return cls(
+                key=key,
+                block_seeds=data["block_seeds"],
+                offsets=data["offsets"],
+                probability=data["probability"],
+                hard_reward=data["hard_reward"],
+                condition_id=data["condition_id"],
+                trial_index=data["trial_index"],
+                fallback_hard=data["fallback_hard"],
+                reward_draw_u=data["reward_draw_u"],
+            )
+
+
+def session_schedule(settings: Any, cg_cfg: dict[str, Any] | None, *, task_root: Path) -> tuple[OfferSchedule, str]:
+    """Load the session schedule from `condition_generation.schedule_dir`, building it on a miss.
+
+    Returns the schedule and its source: `"loaded"`, `"saved"` (built and cached)
+    or `"built"` (no schedule dir configured).
+    """
+    spec = dict(
+        condition_labels=list(getattr(settings, "conditions", ["offer"])),
+        trials_per_block=int(getattr(settings, "trials_per_block", 0)),
+        block_seeds=list(settings.block_seed),
+        subject=_schedule_subject(settings, getattr(settings, "subject_id", "")),
+    )
+    schedule_dir = (cg_cfg or {}).get("schedule_dir")
+    if not schedule_dir:
+        return OfferSchedule.build(cg_cfg, **spec), "built"
+
+    key = schedule_key(cg_cfg, **spec)
+    path = Path(schedule_dir)
+    if not path.is_absolute():
+        path = task_root / path
+    path = path / schedule_filename(key)
+    if path.exists():
+        return OfferSchedule.load(path, expected_key=key), "loaded"
+    schedule = OfferSchedule.build(cg_cfg, **spec)
+    schedule.save(path)
+    return schedule, "saved"
+
+
+def _schedule_subject(settings: Any, subject_id: Any) -> str:
+    """Subject part of the counter key: only `same_within_sub` schedules differ by subject."""
+    return str(subject_id or "") if settings.seed_mode == "same_within_sub" else ""
+
+
+def _subject_block_seeds(settings: Any, subject_id: str) -> list[int | None]:
+    """Block seeds `TaskSettings.add_subinfo` would assign to `subject_id`."""
+    if settings.seed_mode == "same_within_sub" and all(seed is None for seed in settings.block_seed):
+        overall_seed = int(hashlib.sha256(str(subject_id).encode()).hexdigest(), 16) % (10**8)
+        settings.set_block_seed(overall_seed)
+        seeds = list(settings.block_seed)
+        settings.block_seed = [None] * settings.total_blocks
+        return seeds
+    return list(settings.block_seed)
+
+
+def export_schedules(config_path: Path, subjects: list[str], out_dir: Path) -> dict[str, Path]:
+    """Write one schedule file per distinct subject schedule; returns subject -> file."""
+    from psyflow import TaskSettings, load_config
+
+    cfg = load_config(str(config_path), extra_keys=["condition_generation"])
+    settings = TaskSettings.from_dict(cfg["task_config"])
+    cg_cfg = dict(cfg.get("condition_generation_config", {}) or {})
+    cg_cfg["enable_logging"] = False
+    labels = list(getattr(settings, "conditions", ["offer"]))
+    n_trials = int(getattr(settings, "trials_per_block", 0))
+
+    written: dict[str, Path] = {}
+    by_key: dict[str, Path] = {}
+    for subject_id in subjects:
+        seeds = _subject_block_seeds(settings, subject_id)
+        spec = dict(
+            condition_labels=labels,
+            trials_per_block=n_trials,
+            block_seeds=seeds,
+            subject=_schedule_subject(settings, subject_id),
+        )
+        key = schedule_key(cg_cfg, **spec)
+        if key not in by_key:
+            schedule = OfferSchedule.build(cg_cfg, **spec)
+            by_key[key] = schedule.save(out_dir / schedule_filename(key))
+        written[subject_id] = by_key[key]
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export EEfRT offer schedules for a config and subject list.")
+    parser.add_argument("config", type=Path, help="Task config YAML.")
+    parser.add_argument("--subjects", nargs="+", default=["sim"], help="Subject ids (matter for seed_mode same_within_sub).")
+    parser.add_argument("--out-dir", type=Path, default=Path("schedules"), help="Directory for schedule files.")
+    args = parser.parse_args()
+    written = export_schedules(args.config, args.subjects, args.out_dir)
+    with open(args.out_dir / "schedule_index.json", "w", encoding="utf-8") as f:
+        json.dump({subject: path.name for subject, path in written.items()}, f, indent=2)
+    print(f"[EEfRT schedule] subjects={len(written)} files={len(set(written.values()))} out_dir={args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
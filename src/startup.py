@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class StartupTimer:
+    """Startup marks relative to process launch (`time.perf_counter()` at `main.py` import).
+
+    `mark()` records points in time, `phase()` times a named step (imports,
+    config load, window, StimBank, triggers) for the `--profile-startup` table.
+    """
+
+    def __init__(self, launch_t: float) -> None:
+        self.launch_t = float(launch_t)
+        self.marks: dict[str, float] = {}
+        self.phases: dict[str, float] = {}
+        self.info: dict[str, Any] = {}
+
+    def mark(self, name: str) -> float:
+        """Record `name` once; later calls keep the first time."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.launch_t
+        return self.marks[name]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+
+    def mark_first_flip(self, win: Any) -> None:
+        """Mark `first_flip` when the next flip reaches the screen."""
+        win.callOnFlip(self.mark, "first_flip")
+
+    def report(self) -> dict[str, Any]:
+        return {**self.info, "marks_s": dict(self.marks), "phases_s": dict(self.phases)}
+
+    def format_profile(self) -> str:
+        """Human-readable phase/mark table printed by `--profile-startup`."""
+        lines = ["[EEfRT startup profile]"]
+        for name, dt in self.phases.items():
+            lines.append(f"  {name:<24} {dt * 1e3:9.1f} ms")
+        lines.append(f"  {'(phases total)':<24} {sum(self.phases.values()) * 1e3:9.1f} ms")
+        for name, t in self.marks.items():
+            lines.append(f"  @{name:<23} {t * 1e3:9.1f} ms since launch")
+        return "\n".join(lines)
+
+    def write_report(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+class LazyPreloader:
+    """Warm the rest of a `StimBank` during idle screens instead of before the first one.
+
+    PsychoPy stimuli must be built on the thread that owns the GL context, so
+    warming runs on the main thread: while an `idle()` scope is active, each
+    `win.flip` is followed by instantiating pending stimuli until `budget_s`
+    of that frame is spent. `StimBank.get` stays lazy, so a stimulus needed
+    before it is warmed is simply built on first use.
+    """
+
+    def __init__(
+        self,
+        win: Any,
+        stim_bank: Any,
+        names: list[str],
+        *,
+        budget_s: float = 0.004,
+        timer: StartupTimer | None = None,
+    ) -> None:
+        self.win = win
+        self.stim_bank = stim_bank
+        self.pending = deque(names)
+        self.budget_s = float(budget_s)
+        self.timer = timer
+        self.n_warmed = 0
+        self._idle = False
+        self._orig_flip = win.flip
+        win.flip = self._flip
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    @contextmanager
+    def idle(self) -> Iterator[None]:
+        """Allow warming after flips inside this scope (static screens: instructions, ITI)."""
+        self._idle = True
+        try:
+            yield
+        finally:
+            self._idle = False
+
+    def step(self, budget_s: float | None = None) -> int:
+        """Instantiate pending stimuli until the budget is spent; returns how many were built."""
+        deadline = time.perf_counter() + (self.budget_s if budget_s is None else float(budget_s))
+        built = 0
+        while self.pending and time.perf_counter() < deadline:
+            self.stim_bank.get(self.pending.popleft())
+            built += 1
+        self.n_warmed += built
+        if self.done:
+            if self.timer is not None:
+                self.timer.mark("stim_warm_complete")
+            self.uninstall()
+        return built
+
+    def _flip(self, *args: Any, **kwargs: Any) -> Any:
+        t = self._orig_flip(*args, **kwargs)
+        if self._idle and self.pending:
+            self.step()
+        return t
+
+    def uninstall(self) -> None:
+        # Only unwrap if nothing (e.g. FrameTimer) wrapped flip after us.
+        if self.win.flip == self._flip:
+            self.win.flip = self._orig_flip
+
+
+def idle_scope(preloader: LazyPreloader | None):
+    return preloader.idle() if preloader is not None else nullcontext()
+
+
+def startup_report_path(res_file: str | Path) -> Path:
+    res = Path(res_file)
+    return res.with_name(f"{res.stem}_startup.json")
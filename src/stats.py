@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import csv
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class CellStats:
+    n: int = 0
+    hard: int = 0
+    completed: int = 0
+    reward: float = 0.0
+
+    def add(self, *, hard: bool, completed: bool, reward: float) -> None:
+        self.n += 1
+        self.hard += int(hard)
+        self.completed += int(completed)
+        self.reward += reward
+
+    def summary(self) -> dict[str, Any]:
+        n = max(1, self.n)
+        return {
+            "n_trials": self.n,
+            "hard_rate": self.hard / n,
+            "completion_rate": self.completed / n,
+            "total_reward": self.reward,
+        }
+
+
+@dataclass
+class _Scope:
+    total: CellStats = field(default_factory=CellStats)
+    cells: dict[tuple[float, float], CellStats] = field(default_factory=dict)
+
+
+class OnlineLogisticFit:
+    """Recursive (extended Kalman) logistic regression of hard choice.
+
+    Features mirror the sampler utility: `[1, hard_reward - easy_reward,
+    probability - 0.5]`. Each update is a constant-cost rank-one step, so the
+    estimate stays current without refitting on past trials.
+    """
+
+    names = ("bias", "reward_weight", "prob_weight")
+
+    def __init__(self, prior_var: float = 10.0) -> None:
+        self.w = [0.0, 0.0, 0.0]
+        self.P = [[prior_var if i == j else 0.0 for j in range(3)] for i in range(3)]
+        self.n = 0
+
+    def update(self, x: tuple[float, float, float], y: int) -> None:
+        z = sum(wi * xi for wi, xi in zip(self.w, x))
+        p = 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+        Px = [sum(self.P[i][j] * x[j] for j in range(3)) for i in range(3)]
+        v = p * (1.0 - p)
+        denom = 1.0 + v * sum(x[i] * Px[i] for i in range(3))
+        for i in range(3):
+            for j in range(3):
+                self.P[i][j] -= v * Px[i] * Px[j] / denom
+        gain = [sum(self.P[i][j] * x[j] for j in range(3)) for i in range(3)]
+        self.w = [wi + gi * (y - p) for wi, gi in zip(self.w, gain)]
+        self.n += 1
+
+    def summary(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"fit_n": self.n}
+        for i, name in enumerate(self.names):
+            out[f"fit_{name}"] = self.w[i]
+            out[f"fit_{name}_se"] = math.sqrt(max(0.0, self.P[i][i]))
+        return out
+
+
+class OfferStatsAccumulator:
+    """O(1)-per-trial session statistics per block and per offer cell.
+
+    Feed each trial row to `add()`; block breaks, the goodbye screen, the final
+    summary CSV and live monitoring read from here instead of rescanning rows.
+    """
+
+    def __init__(self) -> None:
+        self.session = _Scope()
+        self.blocks: dict[str, _Scope] = {}
+        self.fit = OnlineLogisticFit()
+
+    def add(self, row: dict[str, Any]) -> None:
+        prob = float(row.get("offer_probability") or 0.0)
+        hard_reward = float(row.get("offer_hard_reward") or 0.0)
+        easy_reward = float(row.get("offer_easy_reward") or 0.0)
+        hard = row.get("choice_option") == "hard"
+        completed = bool(row.get("effort_completed", False))
+        reward = float(row.get("reward_amount") or 0.0)
+
+        cell = (prob, hard_reward)
+        block = self.blocks.setdefault(str(row.get("block_id")), _Scope())
+        for scope in (self.session, block):
+            scope.total.add(hard=hard, completed=completed, reward=reward)
+            scope.cells.setdefault(cell, CellStats()).add(hard=hard, completed=completed, reward=reward)
+        if not row.get("choice_forced", False):
+            # Forced (timeout fallback) choices carry no preference information.
+            self.fit.update((1.0, hard_reward - easy_reward, prob - 0.5), int(hard))
+
+    def block_summary(self, block_id: str) -> dict[str, Any]:
+        return self.blocks.get(block_id, _Scope()).total.summary()
+
+    def session_summary(self) -> dict[str, Any]:
+        return {**self.session.total.summary(), **self.fit.summary()}
+
+    def monitor_line(self) -> str:
+        s = self.session_summary()
+        return (
+            f"[EEfRTStats] n={s['n_trials']} hard_rate={s['hard_rate']:.3f} "
+            f"completion_rate={s['completion_rate']:.3f} total_reward={s['total_reward']:.2f} "
+            f"fit_bias={s['fit_bias']:.3f} fit_reward_weight={s['fit_reward_weight']:.3f} "
+            f"fit_prob_weight={s['fit_prob_weight']:.3f}"
+        )
+
+    def cell_rows(self) -> list[dict[str, Any]]:
+        rows = []
+        scopes = [("session", "", self.session)] + [("block", bid, scope) for bid, scope in self.blocks.items()]
+        for scope_name, block_id, scope in scopes:
+            for (prob, hard_reward), cell in sorted(scope.cells.items()):
+                rows.append(
+                    {
+                        "scope": scope_name,
+                        "block_id": block_id,
+                        "offer_probability": prob,
+                        "offer_hard_reward": hard_reward,
+                        **cell.summary(),
+                    }
+                )
+        return rows
+
+    def write_summary_csv(self, path: str | Path) -> Path:
+        path = Path(path)
+        rows = self.cell_rows()
+        fieldnames = ["scope", "block_id", "offer_probability", "offer_hard_reward", "n_trials", "hard_rate", "completion_rate", "total_reward"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+            session = self.session_summary()
+            writer.writerow({"scope": "session_total", **{k: session[k] for k in fieldnames[4:]}})
+        fit_path = path.with_name(f"{path.stem}_fit.csv")
+        with open(fit_path, "w", encoding="utf-8", newline="") as f:
+            fit = self.fit.summary()
+            writer = csv.DictWriter(f, fieldnames=list(fit))
+            writer.writeheader()
+            writer.writerow(fit)
+        return path
+
+
+def summary_path(res_file: str | Path) -> Path:
+    res = Path(res_file)
+    return res.with_name(f"{res.stem}_summary.csv")
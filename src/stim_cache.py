@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+# Formatted text screens whose arguments come from a small finite set per
+# session. `effort_counter` is excluded: its text is rewritten in place every
+# frame of the effort phase.
+CACHEABLE_STIMS = (
+    "choice_header",
+    "choice_left",
+    "choice_right",
+    "ready_text",
+    "effort_prompt",
+    "reward_win_feedback",
+)
+
+
+class CachedStimBank:
+    """`StimBank` proxy with a bounded LRU cache for `get_and_format`.
+
+    Cached stims are keyed by stim name plus format arguments, so repeated
+    offers reuse an already laid-out TextStim instead of rebuilding it right
+    before onset. Names outside `names` and every other `StimBank` method go
+    straight to the wrapped bank.
+    """
+
+    def __init__(self, stim_bank: Any, *, maxsize: int = 64, names: tuple[str, ...] = CACHEABLE_STIMS) -> None:
+        self.stim_bank = stim_bank
+        self.maxsize = max(1, int(maxsize))
+        self.names = frozenset(names)
+        self._cache: OrderedDict[tuple, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.stim_bank, attr)
+
+    def get_and_format(self, name: str, **format_kwargs: Any) -> Any:
+        if name not in self.names:
+            return self.stim_bank.get_and_format(name, **format_kwargs)
+        key = (name, *sorted(format_kwargs.items()))
+        stim = self._cache.get(key)
+        if stim is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return stim
+        self.misses += 1
+        stim = self.stim_bank.get_and_format(name, **format_kwargs)
+        self._cache[key] = stim
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return stim
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
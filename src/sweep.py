@@ -0,0 +1,204 @@
+"""Parameter sweeps over the headless sim engine.
+
+Usage::
+
+    python -m src.sweep config/sweep_grid.yaml [--max-workers N]
+
+The grid spec names a base sim config and dotted override keys restricted to
+`sim.seed`, `task.overall_seed`, `sim.responder.kwargs.*` and
+`condition_generation.*`. `sim.seed` only reseeds the responder: block offer
+schedules come from the task's block seeds, which `task.overall_seed` sets
+(with `seed_mode: same_across_sub`), so sweep both to vary the schedules too.
+
+Every grid point runs in its own process with its own output dir and sim event
+log. Each cell records a hash of the base config it ran with; on a re-run,
+completed cells are skipped only while that hash still matches, and cells from
+an edited base config are run again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+TASK_ROOT = Path(__file__).resolve().parent.parent
+SWEEPABLE_KEYS = ("sim.seed", "task.overall_seed")
+SWEEPABLE_PREFIXES = ("sim.responder.kwargs.", "condition_generation.")
+CELL_STATUS_FILE = "cell.json"
+CELL_TRIALS_FILE = "trials.csv"
+
+
+def _read_yaml(path: Path) -> dict[str, Any]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _set_dotted(cfg: dict[str, Any], dotted: str, value: Any) -> None:
+    node = cfg
+    *parents, leaf = dotted.split(".")
+    for key in parents:
+        node = node.setdefault(key, {})
+    node[leaf] = value
+
+
+def expand_grid(grid: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    """Cartesian product of the grid spec, one dict of dotted overrides per cell."""
+    for key in grid:
+        if key not in SWEEPABLE_KEYS and not key.startswith(SWEEPABLE_PREFIXES):
+            allowed = ", ".join(SWEEPABLE_KEYS + tuple(f"{p}*" for p in SWEEPABLE_PREFIXES))
+            raise ValueError(f"Unsupported sweep key {key!r}; allowed: {allowed}")
+    keys = list(grid)
+    values = [v if isinstance(v, list) else [v] for v in grid.values()]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def cell_id_for(point: dict[str, Any]) -> str:
+    """Stable id for a grid point so re-runs find finished cells."""
+    digest = hashlib.sha1(json.dumps(point, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"cell-{digest[:12]}"
+
+
+def config_hash(base_config: str | Path) -> str:
+    """Hash of the parsed base config, so edits (not just grid changes) invalidate finished cells."""
+    raw = _read_yaml(Path(base_config))
+    return hashlib.sha1(json.dumps(raw, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def run_cell(base_config: str, point: dict[str, Any], cell_dir: str) -> dict[str, Any]:
+    """Worker entry point: run one grid point headlessly and record its status."""
+    out_dir = Path(cell_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    status: dict[str, Any] = {"cell_id": out_dir.name, "point": point}
+    try:
+        status["config_hash"] = config_hash(base_config)
+
+        from psyflow import load_config
+
+        from src.headless import run_headless_session
+
+        raw = copy.deepcopy(_read_yaml(Path(base_config)))
+        for key, value in point.items():
+            _set_dotted(raw, key, value)
+        _set_dotted(raw, "sim.output_dir", str(out_dir))
+        log_path = out_dir / "sim_events.jsonl"
+        # a re-run cell starts over; drop events a failed earlier attempt left behind
+        for stale in (log_path, log_path.with_name(f"{log_path.name}.gz")):
+            stale.unlink(missing_ok=True)
+        _set_dotted(raw, "sim.log_path", str(log_path))
+        _set_dotted(raw, "sim.session_id", out_dir.name)
+        _set_dotted(raw, "task.save_path", str(out_dir))
+        cell_config = out_dir / "config.yaml"
+        with open(cell_config, "w", encoding="utf-8") as f:
+            yaml.safe_dump(raw, f, allow_unicode=True, sort_keys=False)
+
+        cfg = load_config(str(cell_config), extra_keys=["condition_generation"])
+        _settings, rows = run_headless_session(cfg, task_root=TASK_ROOT)
+        rows.to_pandas().to_csv(out_dir / CELL_TRIALS_FILE, index=False)
+        status.update({"status": "ok", "n_trials": len(rows)})
+    except Exception as exc:
+        status.update({"status": "failed", "error": repr(exc), "traceback": traceback.format_exc()})
+
+    with open(out_dir / CELL_STATUS_FILE, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2, default=str)
+    return status
+
+
+def _cell_done(cell_dir: Path, base_hash: str | None = None) -> bool:
+    """A cell finished ok (and, given `base_hash`, ran with that base config)."""
+    path = cell_dir / CELL_STATUS_FILE
+    if not path.exists() or not (cell_dir / CELL_TRIALS_FILE).exists():
+        return False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return status.get("status") == "ok" and (base_hash is None or status.get("config_hash") == base_hash)
+
+
+def merge_cells(output_dir: Path, points: dict[str, dict[str, Any]], base_hash: str | None = None) -> Path:
+    """Concatenate finished cells (of the `base_hash` config, if given) into one tidy dataset keyed by grid point."""
+    import pandas as pd
+
+    frames = []
+    for cell_id, point in points.items():
+        trials = output_dir / cell_id / CELL_TRIALS_FILE
+        if not _cell_done(output_dir / cell_id, base_hash):
+            continue
+        df = pd.read_csv(trials)
+        df.insert(0, "cell_id", cell_id)
+        for i, (key, value) in enumerate(point.items(), start=1):
+            df.insert(i, key, value)
+        frames.append(df)
+    merged_path = output_dir / "sweep_results.csv"
+    if frames:
+        pd.concat(frames, ignore_index=True).to_csv(merged_path, index=False)
+    return merged_path
+
+
+def run_sweep(spec_path: Path, *, max_workers: int | None = None) -> list[dict[str, Any]]:
+    spec = _read_yaml(spec_path)
+    base_config = str((TASK_ROOT / spec.get("base_config", "config/config_sampler_sim.yaml")).resolve())
+    output_dir = (TASK_ROOT / spec.get("output_dir", "outputs/sweep")).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    points = {cell_id_for(p): p for p in expand_grid(dict(spec.get("grid") or {}))}
+    base_hash = config_hash(base_config)
+
+    statuses: list[dict[str, Any]] = []
+    pending = {}
+    for cell_id, point in points.items():
+        if _cell_done(output_dir / cell_id, base_hash):
+            statuses.append({"cell_id": cell_id, "point": point, "status": "skipped"})
+        else:
+            pending[cell_id] = point
+    print(f"[EEfRT sweep] cells={len(points)} pending={len(pending)} skipped={len(points) - len(pending)}")
+
+    workers = max_workers or spec.get("max_workers") or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=int(workers)) as pool:
+        futures = {
+            pool.submit(run_cell, base_config, point, str(output_dir / cell_id)): cell_id
+            for cell_id, point in pending.items()
+        }
+        for future in as_completed(futures):
+            cell_id = futures[future]
+            try:
+                status = future.result()
+            except Exception as exc:  # worker process died before writing its status
+                status = {"cell_id": cell_id, "point": pending[cell_id], "status": "failed", "error": repr(exc)}
+            statuses.append(status)
+            print(f"[EEfRT sweep] {cell_id} {status['status']} {status.get('error', '')}".rstrip())
+
+    with open(output_dir / "sweep_cells.json", "w", encoding="utf-8") as f:
+        json.dump(
+            [{k: v for k, v in s.items() if k != "traceback"} for s in statuses],
+            f,
+            indent=2,
+            default=str,
+        )
+    merged = merge_cells(output_dir, points, base_hash)
+    n_failed = sum(1 for s in statuses if s["status"] == "failed")
+    print(f"[EEfRT sweep] failed={n_failed} merged={merged}")
+    return statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run an EEfRT sim parameter sweep on the headless engine.")
+    parser.add_argument("spec", type=Path, help="Sweep grid YAML (see config/sweep_grid.yaml).")
+    parser.add_argument("--max-workers", type=int, default=None, help="Worker processes (default: all cores).")
+    args = parser.parse_args()
+    statuses = run_sweep(args.spec, max_workers=args.max_workers)
+    raise SystemExit(1 if any(s["status"] == "failed" for s in statuses) else 0)
+
+
+if __name__ == "__main__":
+    main()
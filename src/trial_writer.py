@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any, Iterator
+
+
+def _scalar(value: Any) -> Any:
+    """Reduce a trial value to a JSON scalar, rendering containers like pandas' CSV does."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    item = getattr(value, "item", None)
+    if callable(item):
+        try:
+            return item()
+        except (TypeError, ValueError):
+            pass
+    return str(value)
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return value
+
+
+def stream_path(res_file: str | Path) -> Path:
+    """Stream file that backs `res_file` until the session finishes."""
+    res = Path(res_file)
+    return res.with_name(f"{res.stem}.stream.jsonl")
+
+
+def iter_stream(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Yield rows from a trial stream, ignoring a torn last line after a crash."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
+
+
+class TrialStreamWriter:
+    """Crash-safe per-trial result stream.
+
+    Each row is appended as one JSON line as soon as the trial returns and the
+    file is flushed and fsynced at that trial boundary, so an interrupted
+    session keeps every finished trial. Columns keep their first-seen order;
+    `finalize_csv()` streams the rows into the results CSV without building a
+    DataFrame.
+
+    A fresh writer truncates any stream left at `path` by an earlier run; pass
+    `resume=True` only when continuing the session recorded in that stream.
+    """
+
+    def __init__(self, path: str | Path, *, resume: bool = False, buffer_size: int = 1 << 16) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.columns: list[str] = []
+        self._known: set[str] = set()
+        if resume and self.path.exists():
+            for row in iter_stream(self.path):
+                self._track(row)
+        self._f = open(self.path, "a" if resume else "w", encoding="utf-8", buffering=buffer_size)
+        self.n_rows = 0
+
+    def _track(self, row: dict[str, Any]) -> None:
+        for key in row:
+            if key not in self._known:
+                self._known.add(key)
+                self.columns.append(key)
+
+    def write(self, row: dict[str, Any]) -> None:
+        record = {k: _scalar(v) for k, v in row.items()}
+        self._track(record)
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.n_rows += 1
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+
+    def finalize_csv(self, csv_path: str | Path, *, remove_stream: bool = True) -> Path:
+        """Write the final results CSV from the stream, one row at a time."""
+        self.close()
+        csv_path = Path(csv_path)
+        tmp_path = csv_path.with_name(csv_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns, restval="")
+            writer.writeheader()
+            for row in iter_stream(self.path):
+                writer.writerow({k: _csv_cell(v) for k, v in row.items()})
+        os.replace(tmp_path, csv_path)
+        if remove_stream:
+            self.path.unlink()
+        return csv_path
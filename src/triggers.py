@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+_STOP = object()
+
+
+class AsyncTriggerRuntime:
+    """Non-blocking front end for a psyflow trigger runtime.
+
+    `send()` only timestamps the code and puts it on a `queue.SimpleQueue`; a
+    dedicated sender thread performs the (possibly blocking) driver write and
+    records when the write started and finished. `trial_columns()` drains the
+    finished records into per-trial latency columns. Every other attribute is
+    forwarded to the wrapped runtime.
+
+    Timestamps use `time.perf_counter`, the clock behind `psychopy.core.getTime`.
+    """
+
+    def __init__(self, runtime: Any, *, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.runtime = runtime
+        self.clock = clock
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._records: deque[dict[str, Any]] = deque()
+        self._thread = threading.Thread(target=self._run, name="eefrt-trigger-sender", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.runtime, attr)
+
+    def send(self, code: Any, *args: Any, **kwargs: Any) -> None:
+        if code is None:
+            return None
+        self._queue.put((code, self.clock(), args, kwargs))
+        return None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            code, enqueue_t, args, kwargs = item
+            write_t = self.clock()
+            error = None
+            try:
+                self.runtime.send(code, *args, **kwargs)
+            except Exception as exc:  # a failed write must not kill the sender thread
+                error = repr(exc)
+            done_t = self.clock()
+            self._records.append(
+                {"code": code, "enqueue_t": enqueue_t, "write_t": write_t, "done_t": done_t, "error": error}
+            )
+
+    def flush(self, timeout: float = 0.1) -> bool:
+        """Wait until every code queued so far has been written (or `timeout` passes)."""
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    def drain(self) -> list[dict[str, Any]]:
+        records = []
+        while self._records:
+            records.append(self._records.popleft())
+        return records
+
+    def begin_trial(self, *, flush_timeout: float = 0.1) -> list[dict[str, Any]]:
+        """Drain codes sent since the last trial boundary (e.g. exp/block onsets).
+
+        Call right before a trial starts so `trial_columns()` covers only that
+        trial's sends; returns the drained records.
+        """
+        self.flush(flush_timeout)
+        return self.drain()
+
+    def trial_columns(self, *, flush_timeout: float = 0.1) -> dict[str, Any]:
+        """Per-trial trigger latency columns; call at the trial boundary, not inside a frame loop."""
+        self.flush(flush_timeout)
+        records = self.drain()
+        latencies = [(r["done_t"] - r["enqueue_t"]) * 1e3 for r in records]
+        log = [
+            {
+                "code": r["code"],
+                "enqueue_t": round(r["enqueue_t"], 6),
+                "queue_ms": round((r["write_t"] - r["enqueue_t"]) * 1e3, 3),
+                "write_ms": round((r["done_t"] - r["write_t"]) * 1e3, 3),
+                **({"error": r["error"]} if r["error"] else {}),
+            }
+            for r in records
+        ]
+        return {
+            "trigger_n": len(records),
+            "trigger_errors": sum(1 for r in records if r["error"]),
+            "trigger_latency_mean_ms": sum(latencies) / len(latencies) if latencies else None,
+            "trigger_latency_max_ms": max(latencies) if latencies else None,
+            "trigger_log": json.dumps(log, separators=(",", ":")),
+        }
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout=2.0)
+        self.runtime.close()
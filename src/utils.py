@@ -2,15 +2,22 @@ from __future__ import annotations
 
 import itertools
 import random
-from typing import Any
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable
 
-from psychopy import core, logging
-from psyflow.sim import Observation, ResponderAdapter, get_context
+import numpy as np
+
+from .presses import press_buffer, record_presses
 
 
 EEFRTOfferCondition = tuple[float, float, str, int, str, float]
 
 
+def offer_condition_id(probability: float, hard_reward: float, trial_index: int) -> str:
+    return f"p{int(round(probability * 100)):02d}_h{hard_reward:.2f}_t{trial_index:03d}"
+
+
 def build_eefrt_offer_conditions(
     n_trials: int,
     condition_labels: list[Any] | None = None,
@@ -51,12 +58,14 @@ def build_eefrt_offer_conditions(
 
     out: list[EEFRTOfferCondition] = []
     for trial_index, (prob, hard_reward) in enumerate(offers, start=1):
-        cond_id = f"p{int(round(prob * 100)):02d}_h{hard_reward:.2f}_t{trial_index:03d}"
+        cond_id = offer_condition_id(prob, hard_reward, trial_index)
         fallback_choice = "hard" if rng.random() < p_hard else "easy"
         reward_draw_u = float(rng.random())
         out.append((float(prob), float(hard_reward), cond_id, int(trial_index), fallback_choice, reward_draw_u))
 
     if enable_logging:
+        from psychopy import logging
+
         prob_dist: dict[int, int] = {}
         for prob, *_rest in out:
             key = int(round(float(prob) * 100))
@@ -66,6 +75,59 @@ def build_eefrt_offer_conditions(
     return out
 
 
+def condition_generation_kwargs(cg_cfg: dict[str, Any] | None) -> dict[str, Any]:
+    """Map the `condition_generation` config section to generator kwargs."""
+    cfg = dict(cg_cfg or {})
+    return {
+        "probability_levels": list(cfg.get("probability_levels", [0.12, 0.50, 0.88])),
+        "hard_reward_levels": list(cfg.get("hard_reward_levels", [1.24, 1.68, 2.11, 2.55, 2.99, 3.43, 3.86, 4.30])),
+        "randomize_order": bool(cfg.get("randomize_order", True)),
+        "no_choice_hard_prob": float(cfg.get("no_choice_hard_prob", 0.50)),
+        "enable_logging": bool(cfg.get("enable_logging", True)),
+        "rng": str(cfg.get("rng", "sequential") or "sequential").strip().lower(),
+    }
+
+
+def offer_text_args(
+    *,
+    probability: float,
+    hard_reward: float,
+    easy_reward: float,
+    easy_presses: int,
+    hard_presses: int,
+    easy_deadline: float,
+    hard_deadline: float,
+) -> dict[str, dict[str, Any]]:
+    """Format arguments for the three choice-screen text stims."""
+    return {
+        "choice_header": {"probability_pct": int(round(probability * 100))},
+        "choice_left": {
+            "easy_reward": f"{easy_reward:.2f}",
+            "easy_presses": easy_presses,
+            "easy_deadline_s": f"{easy_deadline:.1f}",
+        },
+        "choice_right": {
+            "hard_reward": f"{hard_reward:.2f}",
+            "hard_presses": hard_presses,
+            "hard_deadline_s": f"{hard_deadline:.1f}",
+        },
+    }
+
+
+def effort_text_args(*, choice_label: str, required_presses: int, effort_key: str, effort_deadline: float) -> dict[str, Any]:
+    """Format arguments shared by `ready_text` and `effort_prompt`."""
+    return {
+        "choice_label": choice_label,
+        "required_presses": required_presses,
+        "effort_key": effort_key.upper(),
+        "time_limit_s": f"{effort_deadline:.1f}",
+    }
+
+
+def reward_text_args(reward_amount: float) -> dict[str, Any]:
+    return {"reward_amount": f"{reward_amount:.2f}"}
+
+
 def choose_fallback_key(*, fallback_choice: str, easy_key: str, hard_key: str) -> str:
     return hard_key if str(fallback_choice).strip().lower() == "hard" else easy_key
 
@@ -89,8 +151,72 @@ def parse_offer_condition(condition: Any) -> tuple[float, float, str, int | None
     raise ValueError(f"Unsupported EEfRT condition format: {condition!r}")
 
 
-def formatted_stim_text(stim_bank: Any, stim_id: str, **kwargs: Any) -> str:
-    return str(getattr(stim_bank.get_and_format(stim_id, **kwargs), "text"))
+def qa_scale_duration(duration_s: float, frame_s: float) -> float:
+    """Apply the active QA timing scale to a phase duration (no-op outside QA)."""
+    from psyflow.sim import get_context
+
+    base = max(0.0, float(duration_s))
+    ctx = get_context()
+    if ctx is None or not ctx.config.enable_scaling:
+        return base
+    min_frames = int(max(1, ctx.config.min_frames))
+    scaled = base * float(ctx.config.timing_scale)
+    return max(scaled, float(frame_s) * min_frames)
+
+
+@dataclass(frozen=True)
+class SessionResponder:
+    """Responder adapter and config snapshot for one qa/sim runtime context."""
+
+    context: Callable[[], Any]  # weakref to the runtime context
+    adapter: Any
+    responder: Any
+    mode: str
+    default_rt_s: float
+    observation: type
+
+
+_SESSION_RESPONDER: SessionResponder | None = None
+
+
+def session_responder(ctx: Any = None) -> SessionResponder | None:
+    """The session's `ResponderAdapter`, built on the first effort observation.
+
+    Reused for the rest of the runtime context (rebuilt only when a different
+    context becomes active); `None` outside qa/sim or without a responder.
+    """
+    global _SESSION_RESPONDER
+    from psyflow.sim import get_context
+
+    if ctx is None:
+        ctx = get_context()
+    if ctx is None or ctx.responder is None or ctx.mode not in ("qa", "sim"):
+        return None
+    cached = _SESSION_RESPONDER
+    if cached is not None and cached.context() is ctx and cached.responder is ctx.responder:
+        return cached
+
+    from psyflow.sim import Observation, ResponderAdapter
+
+    try:
+        ref = weakref.ref(ctx)
+    except TypeError:
+        ref = lambda: ctx  # noqa: E731 - context type without weakref support
+    _SESSION_RESPONDER = SessionResponder(
+        context=ref,
+        adapter=ResponderAdapter(
+            policy=str(ctx.config.sim_policy),
+            default_rt_s=float(ctx.config.default_rt_s),
+            clamp_rt=bool(ctx.config.clamp_rt),
+            logger=ctx.sim_logger,
+            session=ctx.session,
+        ),
+        responder=ctx.responder,
+        mode=str(ctx.mode),
+        default_rt_s=float(ctx.config.default_rt_s),
+        observation=Observation,
+    )
+    return _SESSION_RESPONDER
 
 
 def simulate_effort_via_responder(
@@ -101,13 +227,20 @@ def simulate_effort_via_responder(
     task_factors: dict[str, Any],
     effort_key: str,
     deadline_s: float,
-) -> tuple[int, float | None]:
-    ctx = get_context()
-    if ctx is None or ctx.responder is None or ctx.mode not in ("qa", "sim"):
-        return 0, None
+) -> tuple[int, float | None, np.ndarray]:
+    """Resolve the effort window through the session responder.
+
+    Returns `(press_count, first_rt, press_times)`. `press_times` is the
+    responder's press timeline (`meta["press_times_s"]`, renewal effort model)
+    capped at `deadline_s`, or an empty array when only a count/rate is given.
+    """
+    no_times = np.empty(0, dtype=np.float64)
+    session = session_responder()
+    if session is None:
+        return 0, None, no_times
 
-    obs = Observation(
-        mode=ctx.mode,
+    obs = session.observation(
+        mode=session.mode,
         trial_id=trial_id,
         block_id=block_id,
         phase="effort_execution_window",
@@ -119,34 +252,48 @@ def simulate_effort_via_responder(
         task_factors=task_factors,
         stim_id="effort_stage",
     )
-    adapter = ResponderAdapter(
-        policy=str(ctx.config.sim_policy),
-        default_rt_s=float(ctx.config.default_rt_s),
-        clamp_rt=bool(ctx.config.clamp_rt),
-        logger=ctx.sim_logger,
-        session=ctx.session,
-    )
-    handled = adapter.handle_response(obs, ctx.responder)
+    handled = session.adapter.handle_response(obs, session.responder)
     action = handled.used_action
     if action.key is None:
-        return 0, None
+        return 0, None, no_times
 
     meta = dict(action.meta or {})
-    rt = float(action.rt_s) if action.rt_s is not None else float(ctx.config.default_rt_s)
+    rt = float(action.rt_s) if action.rt_s is not None else session.default_rt_s
+    if "press_times_s" in meta:
+        try:
+            times = np.asarray(meta["press_times_s"], dtype=np.float64).ravel()
+            times = times[np.isfinite(times) & (times <= deadline_s)]
+            if times.size:
+                return int(times.size), float(times[0]), times
+            return 0, None, no_times
+        except Exception:
+            pass
     if "press_count" in meta:
         try:
-            return max(0, int(meta["press_count"])), rt
+            return max(0, int(meta["press_count"])), rt, no_times
         except Exception:
             pass
     if "press_rate_hz" in meta:
         try:
             rate = max(0.0, float(meta["press_rate_hz"]))
-            return max(0, int(rate * deadline_s)), rt
+            return max(0, int(rate * deadline_s)), rt, no_times
         except Exception:
             pass
 
     interval = max(0.05, rt)
-    return max(1, int(deadline_s / interval)), rt
+    return max(1, int(deadline_s / interval)), rt, no_times
+
+
+def simulated_close_time(
+    press_times: np.ndarray, *, press_count: int, first_rt: float | None, required_presses: int, deadline_s: float
+) -> float:
+    """When a simulated effort window closes: the criterion press if the timeline
+    reaches it, the deadline if it does not, else the legacy first-press close."""
+    if press_times.size:
+        return float(press_times[required_presses - 1]) if press_times.size >= required_presses else deadline_s
+    if press_count > 0:
+        return min(deadline_s, max(first_rt or 0.0, 0.01))
+    return deadline_s
 
 
 def run_effort_execution(
@@ -165,14 +312,26 @@ def run_effort_execution(
     required_presses: int,
     effort_key: str,
     effort_deadline: float,
+    planned_trial_index: int | None = None,
+    press_log: Any = None,
 ) -> dict[str, Any]:
-    """Run the repeated-key effort execution phase outside run_trial orchestration."""
+    """Run the repeated-key effort execution phase outside run_trial orchestration.
+
+    Every press timestamp (seconds from effort onset) goes into a buffer
+    preallocated before the frame loop and, when `press_log` is given, into the
+    session's `EffortPressLog` side-car.
+    """
+    from psychopy import core
+    from psyflow.sim import get_context
+
     prompt = stim_bank.get_and_format(
         "effort_prompt",
-        choice_label=choice_label,
-        required_presses=required_presses,
-        effort_key=effort_key.upper(),
-        time_limit_s=f"{effort_deadline:.1f}",
+        **effort_text_args(
+            choice_label=choice_label,
+            required_presses=required_presses,
+            effort_key=effort_key,
+            effort_deadline=effort_deadline,
+        ),
     )
     counter = stim_bank.get_and_format(
         "effort_counter",
@@ -190,6 +349,9 @@ def run_effort_execution(
     press_count = 0
     first_rt = None
     close_time = effort_deadline
+    counter_renders = 0
+    dropped_frames = 0
+    press_times = np.empty(0, dtype=np.float64)
 
     if responder_active:
         prompt.draw()
@@ -197,7 +359,7 @@ def run_effort_execution(
         flip_time = win.flip()
         target.set_state(flip_time=flip_time)
 
-        press_count, first_rt = simulate_effort_via_responder(
+        press_count, first_rt, press_times = simulate_effort_via_responder(
             trial_id=trial_id,
             block_id=block_id,
             condition_id=condition_id,
@@ -207,8 +369,22 @@ def run_effort_execution(
         )
         if press_count > 0:
             trigger_runtime.send(task_factors.get("target_key_press_trigger"))
-            close_time = min(effort_deadline, max(first_rt or 0.0, 0.01))
+        close_time = simulated_close_time(
+            press_times,
+            press_count=press_count,
+            first_rt=first_rt,
+            required_presses=required_presses,
+            deadline_s=effort_deadline,
+        )
     else:
+        # Re-layout the counter only when the displayed press count or tenth of
+        # a second changes; formatting goes straight from the template string.
+        counter_template = str(stim_bank.get("effort_counter").text)
+        shown = (0, f"{effort_deadline:.1f}")
+        frame_s = float(getattr(win, "monitorFramePeriod", 1.0 / 60.0) or (1.0 / 60.0))
+        last_flip = None
+
+        press_times = press_buffer(required_presses)
         kb.clearEvents()
         kb.clock.reset()
         stage_clock = core.Clock()
@@ -216,32 +392,40 @@ def run_effort_execution(
 
         while stage_clock.getTime() < effort_deadline and press_count < required_presses:
             elapsed = stage_clock.getTime()
-            remain = max(0.0, effort_deadline - elapsed)
-            counter.text = formatted_stim_text(
-                stim_bank,
-                "effort_counter",
-                current_presses=press_count,
-                required_presses=required_presses,
-                time_left_s=f"{remain:.1f}",
-            )
+            display = (press_count, f"{max(0.0, effort_deadline - elapsed):.1f}")
+            if display != shown:
+                counter.text = counter_template.format(
+                    current_presses=display[0],
+                    required_presses=required_presses,
+                    time_left_s=display[1],
+                )
+                counter_renders += 1
+                shown = display
             prompt.draw()
             counter.draw()
             flip_time = win.flip()
             if first_flip is None:
                 first_flip = flip_time
                 target.set_state(flip_time=flip_time)
+            if last_flip is not None and flip_time - last_flip > 1.5 * frame_s:
+                dropped_frames += int(round((flip_time - last_flip) / frame_s)) - 1
+            last_flip = flip_time
 
             keys = kb.getKeys(keyList=[effort_key], waitRelease=False)
             if keys:
-                press_count += len(keys)
+                for key in keys:
+                    if press_count < press_times.size:
+                        try:
+                            press_times[press_count] = float(key.rt)
+                        except Exception:
+                            press_times[press_count] = float(stage_clock.getTime())
+                    press_count += 1
                 if first_rt is None:
-                    try:
-                        first_rt = float(keys[0].rt)
-                    except Exception:
-                        first_rt = float(stage_clock.getTime())
+                    first_rt = float(press_times[0])
                     trigger_runtime.send(task_factors.get("target_key_press_trigger"))
 
         close_time = min(effort_deadline, float(stage_clock.getTime()))
+        press_times = press_times[: min(press_count, press_times.size)]
 
     effort_completed = press_count >= required_presses
     trigger_runtime.send(task_factors.get("target_complete_trigger" if effort_completed else "target_fail_trigger"))
@@ -261,6 +445,16 @@ def run_effort_execution(
         choice_option=task_factors.get("choice_option"),
         close_time=close_time,
         close_time_global=close_global,
+        counter_renders=counter_renders,
+        dropped_frames=dropped_frames,
+        **record_presses(
+            press_log,
+            press_times,
+            required_presses=required_presses,
+            trial_id=trial_id,
+            block_id=block_id,
+            planned_trial_index=planned_trial_index,
+        ),
     ).to_dict(trial_data)
 
     return {
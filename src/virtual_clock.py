@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class VirtualClock:
+    """Simulated time source that advances instantly instead of waiting.
+
+    `now()` mirrors `core.getAbsTime()` and `advance(...)` moves time forward by
+    a phase duration, a response time or a single frame.
+    """
+
+    def __init__(self, start_s: float = 0.0, frame_s: float = 1.0 / 60.0) -> None:
+        self._t = float(start_s)
+        self.frame_s = max(1e-6, float(frame_s))
+
+    def now(self) -> float:
+        return self._t
+
+    def advance(self, dt_s: float) -> float:
+        self._t += max(0.0, float(dt_s))
+        return self._t
+
+    def flip(self) -> float:
+        """Advance by one frame and return the flip time."""
+        return self.advance(self.frame_s)
+
+
+class _VirtualPsychoClock:
+    """`core.Clock` stand-in reading a `VirtualClock` (same reset/addTime semantics)."""
+
+    def __init__(self, source: VirtualClock, base_s: float = 0.0) -> None:
+        self._source = source
+        self._zero = source.now() - float(base_s)
+
+    def getTime(self, applyZero: bool = True) -> float:
+        if not applyZero:
+            return self._source.now()
+        return self._source.now() - self._zero
+
+    def getLastResetTime(self) -> float:
+        return self._zero
+
+    def reset(self, newT: float = 0.0) -> None:
+        self._zero = self._source.now() + float(newT)
+
+    def addTime(self, t: float) -> None:
+        self._zero -= float(t)
+
+
+class FastForward:
+    """Run a PsychoPy window on virtual time (qa/sim fast-forward).
+
+    PsychoPy/psyflow units pace every phase by counting `win.flip()` calls and
+    time-stamp with `core.Clock`, `core.getTime` and `core.getAbsTime`. While
+    installed, `win.flip` skips the buffer swap (no vsync wait), runs the
+    `callOnFlip` callbacks and advances the clock by one frame, and those core
+    clocks read the virtual time, so durations, deadlines and responder RTs
+    elapse instantly while onsets, RTs and close times stay self-consistent.
+    Clocks created before `install` (e.g. `kb.clock`) are replaced explicitly.
+    """
+
+    _CORE_ATTRS = ("Clock", "getTime", "getAbsTime", "monotonicClock", "wait")
+
+    def __init__(self, frame_s: float = 1.0 / 60.0) -> None:
+        self.clock = VirtualClock(frame_s=frame_s)
+        self.n_flips = 0
+        self._core: Any = None
+        self._saved: dict[str, Any] = {}
+        self._win: Any = None
+        self._kb_clock: tuple[Any, Any] | None = None
+        self._on_flip: list[tuple[Any, tuple, dict]] = []
+
+    def install(self, win: Any, kb: Any = None) -> "FastForward":
+        from psychopy import core
+
+        mono_base = float(core.getTime())
+        abs_base = float(core.getAbsTime())
+        source = self.clock
+        self._core = core
+        self._saved = {name: getattr(core, name) for name in self._CORE_ATTRS if hasattr(core, name)}
+        core.Clock = lambda *args, **kwargs: _VirtualPsychoClock(source)
+        core.getTime = lambda *args, **kwargs: mono_base + source.now()
+        core.getAbsTime = lambda *args, **kwargs: abs_base + source.now()
+        core.monotonicClock = _VirtualPsychoClock(source, base_s=mono_base)
+        core.wait = lambda secs, *args, **kwargs: source.advance(secs)
+
+        self._win = win
+        win.callOnFlip = self._call_on_flip
+        win.flip = self._flip
+        if kb is not None and hasattr(kb, "clock"):
+            self._kb_clock = (kb, kb.clock)
+            kb.clock = _VirtualPsychoClock(source)
+        return self
+
+    def _call_on_flip(self, function: Any, *args: Any, **kwargs: Any) -> None:
+        self._on_flip.append((function, args, kwargs))
+
+    def _flip(self, clearBuffer: bool = True) -> float:
+        self.clock.flip()
+        self.n_flips += 1
+        callbacks, self._on_flip = self._on_flip, []
+        for function, args, kwargs in callbacks:
+            function(*args, **kwargs)
+        if clearBuffer and hasattr(self._win, "clearBuffer"):
+            self._win.clearBuffer()
+        return float(self._core.getTime())
+
+    def uninstall(self) -> None:
+        if self._core is None:
+            return
+        for name, value in self._saved.items():
+            setattr(self._core, name, value)
+        # Instance attributes shadowed the Window methods; drop them if still ours.
+        for name, ours in (("flip", self._flip), ("callOnFlip", self._call_on_flip)):
+            if getattr(self._win, name, None) == ours:
+                delattr(self._win, name)
+        if self._kb_clock is not None:
+            kb, clock = self._kb_clock
+            kb.clock = clock
+        self._core = None
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import `src` and `responders` from the task root without installing it.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
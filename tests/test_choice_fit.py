@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("psyflow.sim")
+
+from responders import TaskSamplerResponder  # noqa: E402
+from src.choice_fit import CHOICE_PARAMS, ChoiceData, fit_choice_model, sampler_choice_params  # noqa: E402
+
+PROBS = [0.12, 0.50, 0.88]
+REWARDS = [1.24, 1.68, 2.11, 2.55, 2.99, 3.43, 3.86, 4.30]
+EASY_PRESSES, HARD_PRESSES = 8, 14
+SAMPLER = {
+    "lapse_rate": 0.05,
+    "hard_choice_bias": -0.3,
+    "hard_choice_reward_weight": 0.45,
+    "hard_choice_prob_weight": 1.8,
+    "hard_choice_effort_weight": 0.05,
+}
+
+
+def _simulate_sessions(n_sessions, n_trials, seed):
+    rng = np.random.default_rng(seed)
+    responder = TaskSamplerResponder(**SAMPLER)
+    n = n_sessions * n_trials
+    prob = rng.choice(PROBS, size=n)
+    hard_reward = rng.choice(REWARDS, size=n)
+    fallback_hard = rng.random(n) < 0.5
+    batch = responder.act_batch(
+        prob, hard_reward, 1.0, EASY_PRESSES, HARD_PRESSES, fallback_hard=fallback_hard, rng=rng
+    )
+    sessions = {}
+    for s in range(n_sessions):
+        rows = []
+        for i in range(s * n_trials, (s + 1) * n_trials):
+            forced = batch.choice[i] < 0
+            hard = fallback_hard[i] if forced else batch.choice[i] == 1
+            rows.append(
+                {
+                    "offer_probability": float(prob[i]),
+                    "offer_hard_reward": float(hard_reward[i]),
+                    "offer_easy_reward": 1.0,
+                    "choice_option": "hard" if hard else "easy",
+                    "choice_forced": bool(forced),
+                }
+            )
+        sessions[f"s{s}"] = rows
+    return sessions
+
+
+def test_recovers_sampler_params_within_standard_errors():
+    truth = sampler_choice_params(SAMPLER, easy_presses=EASY_PRESSES, hard_presses=HARD_PRESSES)
+    assert truth["bias"] == pytest.approx(-0.3 - 0.05 * (HARD_PRESSES - EASY_PRESSES))
+
+    fit = fit_choice_model(ChoiceData.from_rows(_simulate_sessions(1, 4000, seed=11)))
+    assert fit.converged.all()
+    for i, name in enumerate(CHOICE_PARAMS):
+        assert abs(fit.params[0, i] - truth[name]) < 3 * fit.se[0, i], (name, fit.params[0, i], truth[name])
+    assert abs(fit.lapse[0] - truth["lapse_rate"]) < 3 * fit.lapse_se[0]
+    assert fit.n_choices[0] + round(fit.lapse[0] * 4000) == 4000
+
+
+def test_standard_errors_cover_the_truth_across_sessions():
+    truth = sampler_choice_params(SAMPLER, easy_presses=EASY_PRESSES, hard_presses=HARD_PRESSES)
+    fit = fit_choice_model(ChoiceData.from_rows(_simulate_sessions(200, 300, seed=12)))
+    true = np.array([truth[name] for name in CHOICE_PARAMS])
+    z = (fit.params - true) / fit.se
+    # about 95% of |z| should be under 2; allow sampling slack over 200 sessions
+    coverage = (np.abs(z) < 2).mean(axis=0)
+    assert (coverage > 0.88).all(), coverage
+    assert np.abs(z.mean(axis=0)).max() < 0.3
@@ -0,0 +1,49 @@
+from collections import Counter
+
+import pytest
+
+from src.counter_offers import build_counter_offer_conditions, counter_offer_condition
+
+CG = {"probability_levels": [0.12, 0.50, 0.88], "hard_reward_levels": [1.24, 2.55, 4.30], "enable_logging": False}
+GRID = 9
+
+
+def _block(n, **kwargs):
+    return build_counter_offer_conditions(n, ["offer"], **{"seed": 7, "block_idx": 1, "subject": "101", **CG, **kwargs})
+
+
+def test_random_access_matches_block():
+    block = _block(20)
+    for trial_index in (1, 9, 10, 20):
+        condition = counter_offer_condition(trial_index, n_trials=20, seed=7, block_idx=1, subject="101", cg_cfg=CG)
+        assert condition == block[trial_index - 1]
+
+
+def test_complete_cycles_show_each_offer_once():
+    block = _block(2 * GRID + 4)
+    for start in (0, GRID):
+        cycle = block[start : start + GRID]
+        assert len({(p, r) for p, r, *_ in cycle}) == GRID
+    tail = block[2 * GRID :]
+    assert max(Counter((p, r) for p, r, *_ in tail).values()) == 1
+    assert [t for _p, _r, _id, t, *_ in block] == list(range(1, 2 * GRID + 5))
+
+
+def test_keys_separate_sessions():
+    assert _block(GRID) == _block(GRID)
+    assert _block(GRID) != _block(GRID, subject="102")
+    assert _block(GRID) != _block(GRID, block_idx=2)
+    assert _block(GRID) != _block(GRID, seed=8)
+
+
+def test_fixed_order_keeps_grid_order_in_complete_cycles():
+    block = _block(GRID + 2, randomize_order=False)
+    grid = [(p, r) for p in CG["probability_levels"] for r in CG["hard_reward_levels"]]
+    assert [(p, r) for p, r, *_ in block[:GRID]] == grid
+
+
+def test_out_of_range_trial_raises():
+    with pytest.raises(IndexError):
+        counter_offer_condition(0, n_trials=5, seed=1, block_idx=0, cg_cfg=CG)
+    with pytest.raises(IndexError):
+        counter_offer_condition(6, n_trials=5, seed=1, block_idx=0, cg_cfg=CG)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.event_log import BufferedEventLog, EventTable, convert_logs, iter_events
+
+
+def _events(session, n):
+    for i in range(n):
+        yield {
+            "session_id": session,
+            "phase": "offer_choice" if i % 2 else "effort_execution_window",
+            "trial_id": n - i,
+            "rt": None if i == 0 else 0.1 * i,
+            "meta": {"i": i},
+        }
+
+
+def test_buffered_log_truncates_unless_appending(tmp_path):
+    path = tmp_path / "events.jsonl"
+    with BufferedEventLog(path, flush_every=2) as log:
+        for event in _events("a", 3):
+            log(event)
+    with BufferedEventLog(path, flush_every=2) as log:
+        log({"phase": "x"})
+    assert list(iter_events(path)) == [{"phase": "x"}]
+    with BufferedEventLog(path, append=True) as log:
+        log({"phase": "y"})
+    assert [e["phase"] for e in iter_events(path)] == ["x", "y"]
+
+
+def test_convert_and_select_round_trip(tmp_path):
+    plain = tmp_path / "a.jsonl"
+    with BufferedEventLog(plain, flush_every=3) as log:
+        for event in _events("a", 6):
+            log(event)
+    with BufferedEventLog(tmp_path / "b.jsonl", compress=True) as log:
+        gz_path = log.path
+        for event in _events("b", 4):
+            log(event)
+
+    table = EventTable.load(convert_logs([plain, gz_path], tmp_path / "events.npz"))
+    assert len(table) == 10
+    assert table.columns["rt"].dtype == np.float64
+    assert table.columns["meta"][0].startswith("{")
+
+    rows = table.select(phase="offer_choice", session="a", columns=["trial_id", "rt"])
+    assert rows["trial_id"].tolist() == [1, 3, 5]
+    one = table.select(phase="effort_execution_window", session="b", trial_id=4)
+    assert one["rt"].size == 1 and np.isnan(one["rt"][0])
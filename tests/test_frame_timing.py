@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from src.frame_timing import FrameTimer, frame_report_path
+
+
+class _Window:
+    monitorFramePeriod = 0.01
+
+    def __init__(self):
+        self.t = None
+
+    def flip(self):
+        return self.t
+
+
+def _flips(timer, win, phase, requested_s, times):
+    timer.begin_phase(phase, requested_s)
+    for t in times:
+        win.t = t
+        win.flip()
+
+
+def test_per_phase_drops_p95_and_duration_deviation():
+    win = _Window()
+    timer = FrameTimer(win)
+    _flips(timer, win, "cue", 0.05, [0.00, 0.01, 0.02, 0.03, 0.04])
+    _flips(timer, win, "effort", None, [0.05, 0.06, 0.09, 0.10])
+    cols = timer.end_trial()
+
+    assert cols["cue_frame_n"] == 5
+    assert cols["cue_frame_dropped"] == 0
+    assert cols["cue_frame_max_ms"] == pytest.approx(10.0)
+    assert cols["cue_frame_duration_dev_ms"] == pytest.approx(0.0, abs=1e-9)
+    assert cols["effort_frame_n"] == 4
+    assert cols["effort_frame_dropped"] == 2
+    assert cols["effort_frame_max_ms"] == pytest.approx(30.0)
+    assert cols["effort_frame_p95_ms"] == pytest.approx(27.0)
+    assert cols["effort_frame_duration_dev_ms"] is None
+    assert cols["frame_overflow"] == 0
+
+    # next trial starts straight after the last flip: the carried interval counts, the phase ran 20 ms short
+    _flips(timer, win, "cue", 0.05, [0.13, 0.14, 0.15])
+    _flips(timer, win, "effort", None, [0.16])
+    cols = timer.end_trial()
+    assert cols["cue_frame_dropped"] == 2
+    assert cols["cue_frame_max_ms"] == pytest.approx(30.0)
+    assert cols["cue_frame_duration_dev_ms"] == pytest.approx(-20.0)
+
+
+def test_block_transition_is_not_charged_to_the_next_trial():
+    win = _Window()
+    timer = FrameTimer(win)
+    _flips(timer, win, "iti", 0.02, [0.00, 0.01])
+    timer.end_trial()
+    # block break screen flips outside any trial
+    win.t = 0.5
+    win.flip()
+    _flips(timer, win, "cue", 0.02, [3.00, 3.01])
+    cols = timer.end_trial()
+    assert cols["cue_frame_dropped"] == 0
+    assert cols["cue_frame_max_ms"] == pytest.approx(10.0)
+
+    # begin_block() alone also drops the carry (e.g. pre-warming without a flip)
+    timer.begin_block()
+    _flips(timer, win, "cue", 0.02, [6.00, 6.01])
+    assert timer.end_trial()["cue_frame_dropped"] == 0
+
+
+def test_overflow_and_session_report(tmp_path):
+    win = _Window()
+    timer = FrameTimer(win, capacity=3)
+    _flips(timer, win, "cue", 0.05, [0.00, 0.01, 0.02, 0.03, 0.04])
+    assert timer.end_trial()["frame_overflow"] == 2
+    # the carry runs from the last flip, even one past the buffer
+    _flips(timer, win, "cue", 0.02, [0.05, 0.06])
+    timer.end_trial()
+
+    path = timer.write_report(frame_report_path(tmp_path / "sub-1.csv"))
+    assert path.name == "sub-1_frame_timing.json"
+    cue = json.loads(path.read_text(encoding="utf-8"))["phases"]["cue"]
+    assert cue["trials"] == 2
+    assert cue["dropped_frames"] == 0
+    assert cue["interval_max_ms"] == pytest.approx(10.0)
+    timer.uninstall()
+    _flips(timer, win, "cue", 0.02, [2.00])
+    assert timer.end_trial() == {"frame_overflow": 0}
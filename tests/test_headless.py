@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("psyflow.sim")
+
+from psyflow import load_config  # noqa: E402
+from psyflow.sim.contracts import Action  # noqa: E402
+
+from src.headless import run_headless_session  # noqa: E402
+from src.presses import EffortPressLog  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Columns run_trial writes for every trial: its explicit trial_data keys plus
+# StimUnit state of each phase (the QA acceptance columns are a subset).
+RUN_TRIAL_COLUMNS = {
+    "offer_probability",
+    "offer_hard_reward",
+    "offer_easy_reward",
+    "planned_trial_index",
+    "condition_label",
+    "choice_option",
+    "choice_key",
+    "choice_forced",
+    "effort_required_presses",
+    "effort_press_count",
+    "effort_completed",
+    "reward_win",
+    "reward_amount",
+    "offer_choice_response",
+    "offer_choice_rt",
+    "offer_choice_choice_option",
+    "effort_execution_required_presses",
+    "effort_execution_press_count",
+    "effort_execution_hit",
+    "effort_execution_press_log_row",
+    "reward_feedback_reward_amount",
+    "reward_feedback_reward_win",
+    *(
+        f"{phase}_{column}"
+        for phase in ("offer_fixation", "offer_choice", "ready", "effort_feedback", "reward_feedback", "iti")
+        for column in ("onset_time", "onset_time_global", "close_time", "duration")
+    ),
+}
+
+
+class StubResponder:
+    """Deterministic responder: hard offers above a reward cut, fixed press rate."""
+
+    def __init__(self, easy_key="f", hard_key="j", effort_key="space", press_interval_s=0.15):
+        self.keys = {"easy": easy_key, "hard": hard_key}
+        self.effort_key = effort_key
+        self.press_interval_s = press_interval_s
+
+    def start_session(self, session, rng):
+        self.n_obs = 0
+
+    def on_feedback(self, fb):
+        pass
+
+    def end_session(self):
+        pass
+
+    def act(self, obs):
+        self.n_obs += 1
+        factors = dict(obs.task_factors or {})
+        if obs.phase == "offer_choice":
+            option = "hard" if float(factors["offer_hard_reward"]) >= 2.5 else "easy"
+            return Action(key=self.keys[option], rt_s=0.4, meta={"source": "stub"})
+        if obs.phase == "effort_execution_window":
+            n = int(float(obs.deadline_s) / self.press_interval_s)
+            times = [self.press_interval_s * (i + 1) for i in range(n)]
+            return Action(key=self.effort_key, rt_s=times[0], meta={"press_times_s": times})
+        return Action(key=None, rt_s=None, meta={"source": "stub"})
+
+
+def _config(tmp_path, seed=5):
+    cfg = load_config(str(ROOT / "config" / "config_sampler_sim.yaml"), extra_keys=["condition_generation"])
+    cfg["task_config"].update({"total_blocks": 1, "trial_per_block": 4, "total_trials": 4, "overall_seed": seed})
+    cfg["sim_config"].update(
+        {
+            "output_dir": str(tmp_path),
+            "log_path": str(tmp_path / "sim_events.jsonl"),
+            "responder": {"type": "tests.test_headless:StubResponder", "kwargs": {}},
+        }
+    )
+    return cfg
+
+
+def _run(tmp_path, seed=5):
+    press_log = EffortPressLog()
+    settings, rows = run_headless_session(_config(tmp_path, seed), task_root=ROOT, press_log=press_log)
+    return settings, list(rows), press_log
+
+
+def test_headless_rows_carry_run_trial_columns(tmp_path):
+    settings, rows, press_log = _run(tmp_path)
+    assert len(rows) == 4
+    for row in rows:
+        assert RUN_TRIAL_COLUMNS <= set(row), sorted(RUN_TRIAL_COLUMNS - set(row))
+        assert row["block_id"] == "block_0"
+        assert row["choice_option"] == ("hard" if row["offer_hard_reward"] >= 2.5 else "easy")
+        assert row["effort_press_count"] == press_log.trial_times(row["effort_execution_press_log_row"]).size
+        # sim runs are unscaled: phases last exactly as configured
+        assert row["offer_fixation_duration"] == pytest.approx(float(settings.cue_duration))
+    assert [row["trial_index"] for row in rows] == [0, 1, 2, 3]
+
+
+def test_same_seed_gives_identical_rows(tmp_path):
+    _, first, _ = _run(tmp_path / "a")
+    _, again, _ = _run(tmp_path / "b")
+    assert first == again
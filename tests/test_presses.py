@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.presses import EffortPressLog, press_log_path, record_presses
+
+
+def _log_trials(log, n, *, first_trial_id=1, block_id="block_0"):
+    rows = []
+    for i in range(n):
+        times = np.linspace(0.2, 0.2 * (i + 2), i + 2)
+        state = record_presses(
+            log,
+            times,
+            required_presses=2,
+            trial_id=first_trial_id + i,
+            block_id=block_id,
+            planned_trial_index=i + 1,
+        )
+        rows.append(
+            {"effort_execution_press_log_row": state["press_log_row"], "block_id": block_id, "planned_trial_index": i + 1}
+        )
+    return rows
+
+
+def test_save_load_round_trip(tmp_path):
+    log = EffortPressLog(capacity=2)
+    _log_trials(log, 5)
+    path = log.save(press_log_path(tmp_path / "sub-1.csv"))
+    assert path.name == "sub-1_effort_presses.npz"
+
+    loaded = EffortPressLog.load(path)
+    assert len(loaded) == 5
+    assert loaded.max_trial_id == 5
+    for row in range(5):
+        np.testing.assert_array_equal(loaded.trial_times(row), log.trial_times(row))
+
+
+def test_resume_extends_saved_side_car(tmp_path):
+    path = tmp_path / "sub-1_effort_presses.npz"
+    first = EffortPressLog()
+    rows = _log_trials(first, 3)
+    first.save(path)
+
+    resumed = EffortPressLog.for_resume(path, rows)
+    new_rows = _log_trials(resumed, 2, first_trial_id=4, block_id="block_1")
+    assert [r["effort_execution_press_log_row"] for r in new_rows] == [3, 4]
+    np.testing.assert_array_equal(resumed.trial_times(0), first.trial_times(0))
+
+
+def test_resume_without_side_car_skips_referenced_rows(tmp_path):
+    rows = [
+        {"effort_execution_press_log_row": i, "block_id": "block_0", "planned_trial_index": i + 1} for i in range(4)
+    ]
+    resumed = EffortPressLog.for_resume(tmp_path / "missing.npz", rows)
+    assert len(resumed) == 4
+    assert resumed.trial_times(3).size == 0
+    assert _log_trials(resumed, 1)[0]["effort_execution_press_log_row"] == 4
+
+
+def test_summary_columns():
+    times = np.array([0.1, 0.3, 0.5, 0.7])
+    state = record_presses(None, times, required_presses=3, trial_id=1, block_id=None, planned_trial_index=None)
+    assert state["press_log_row"] is None
+    assert state["time_to_criterion_s"] == pytest.approx(0.5)
+    assert state["press_rate_hz"] == pytest.approx(5.0)
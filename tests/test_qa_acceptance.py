@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from src.qa_acceptance import AcceptanceValidator, QAAcceptanceError, acceptance_report_path
+
+TRIGGERS = {"exp_onset": 98, "cue_onset": 1, "choice_onset": 2}
+
+
+class _Runtime:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, code):
+        self.sent.append(code)
+
+
+def _row(i=0, **extra):
+    return {
+        "trial_index": i,
+        "block_id": "block_0",
+        "condition_label": "p50_r2.55_t1",
+        "offer_choice_response": "f",
+        "choice_key": "f",
+        "reward_amount": 0.0,
+        **extra,
+    }
+
+
+def _fail(validator, row):
+    with pytest.raises(QAAcceptanceError) as info:
+        validator.check_row(row)
+    return info.value.report
+
+
+def test_passing_rows_and_finish():
+    validator = AcceptanceValidator(required_columns=["choice_key"], expected_trial_count=2, allowed_keys=["f", "j"])
+    validator.check_row(_row(0))
+    validator.check_row(_row(1, choice_key="j"))
+    validator.finish()
+    assert validator.n_trials == 2
+
+
+def test_missing_required_column_names_phase(tmp_path):
+    report_path = acceptance_report_path(tmp_path / "qa_trace.csv")
+    validator = AcceptanceValidator(required_columns=["offer_choice_rt"], report_path=report_path)
+    report = _fail(validator, _row(0, offer_choice_rt=None))
+    assert report["criterion"] == "required_columns"
+    assert report["column"] == "offer_choice_rt"
+    assert report["phase"] == "offer_choice"
+    assert json.loads(report_path.read_text(encoding="utf-8"))["trial_index"] == 0
+
+
+def test_bad_key():
+    validator = AcceptanceValidator(allowed_keys=["f", "j"])
+    validator.check_row(_row(0))
+    report = _fail(validator, _row(1, effort_execution_response="x"))
+    assert report["criterion"] == "allowed_keys"
+    assert report["column"] == "effort_execution_response"
+    assert report["phase"] == "effort_execution"
+    assert report["trial_index"] == 1
+
+
+def test_unmapped_trigger_code():
+    validator = AcceptanceValidator(triggers_required=True, trigger_map=TRIGGERS)
+    runtime = validator.watch(_Runtime())
+    validator.begin_trial()
+    runtime.send(1)
+    runtime.send(77)
+    report = _fail(validator, _row(0))
+    assert report["criterion"] == "triggers_required"
+    assert report["code"] == 77
+    assert report["phase"] is None
+    assert runtime.runtime.sent == [1, 77]
+
+
+def test_sends_between_trials_do_not_count_toward_the_trial():
+    validator = AcceptanceValidator(triggers_required=True, trigger_map=TRIGGERS)
+    runtime = validator.watch(_Runtime())
+    runtime.send(TRIGGERS["exp_onset"])
+    validator.begin_trial()
+    report = _fail(validator, _row(0))
+    assert report["message"] == "no trigger was sent during the trial"
+
+
+def test_trial_count_overrun_and_shortfall():
+    validator = AcceptanceValidator(expected_trial_count=1)
+    validator.check_row(_row(0))
+    report = _fail(validator, _row(1))
+    assert report["criterion"] == "expected_trial_count"
+    assert report["trials_checked"] == 2
+
+    short = AcceptanceValidator(expected_trial_count=3)
+    short.check_row(_row(0))
+    with pytest.raises(QAAcceptanceError, match="expected 3"):
+        short.finish()
+
+
+def test_from_config_without_criteria():
+    assert AcceptanceValidator.from_config(None) is None
+    validator = AcceptanceValidator.from_config({"triggers_required": True}, trigger_map=TRIGGERS)
+    assert validator.triggers_required
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.records import TrialRecordStore
+
+
+def test_round_trip_with_growth():
+    rows = [
+        {"trial_index": i, "rt": 0.25 * i, "choice_option": "hard" if i % 2 else "easy", "hit": i % 3 == 0}
+        for i in range(10)
+    ]
+    store = TrialRecordStore(capacity=2)
+    store.extend(rows)
+    assert len(store) == 10
+    assert list(store) == rows
+    assert store[-1] == rows[-1]
+    with pytest.raises(IndexError):
+        store.row(10)
+
+
+def test_missing_values_round_trip_as_none():
+    store = TrialRecordStore()
+    store.extend([{"rt": 0.4, "n": 3, "hit": True, "key": "f"}, {"rt": None, "n": None, "hit": None, "key": None}])
+    assert store[1] == {"rt": None, "n": None, "hit": None, "key": None}
+
+
+def test_bool_column_widened_by_int_stays_int():
+    store = TrialRecordStore()
+    store.extend([{"x": True}, {"x": 3}, {"x": None}])
+    assert store.column("x").dtype == np.int64
+    assert [row["x"] for row in store] == [1, 3, None]
+    assert all(type(row["x"]) is int for row in list(store)[:2])
+
+
+def test_int_column_keeps_int_for_bool_and_widens_for_float():
+    store = TrialRecordStore()
+    store.extend([{"x": 2}, {"x": False}])
+    assert store.column("x").dtype == np.int64
+    assert [row["x"] for row in store] == [2, 0]
+    store.append({"x": 0.5})
+    assert [row["x"] for row in store] == [2.0, 0.0, 0.5]
+
+
+def test_string_widens_numeric_column_to_object():
+    store = TrialRecordStore()
+    store.extend([{"x": 1}, {"x": "a"}])
+    assert [row["x"] for row in store] == [1, "a"]
+
+
+def test_columns_keep_first_seen_order():
+    store = TrialRecordStore()
+    store.append({"a": None, "b": 1, "c": None})
+    store.append({"a": "x", "b": 2, "c": None, "d": 0.5})
+    assert store.columns == ["a", "b", "c", "d"]
+    assert list(store[0]) == ["a", "b", "c", "d"]
+    assert store[0] == {"a": None, "b": 1, "c": None, "d": None}
+    assert store[1] == {"a": "x", "b": 2, "c": None, "d": 0.5}
+
+
+def test_to_pandas_keeps_order_and_kinds():
+    pd = pytest.importorskip("pandas")
+    store = TrialRecordStore()
+    store.append({"a": None, "b": True, "c": "easy"})
+    store.append({"a": 1.5, "b": 4, "c": None})
+    df = store.to_pandas()
+    assert list(df.columns) == ["a", "b", "c"]
+    assert str(df["b"].dtype) == "Int64"
+    assert df["b"].tolist() == [1, 4]
+    assert pd.isna(df.loc[1, "c"])
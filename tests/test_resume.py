@@ -0,0 +1,78 @@
+import pytest
+
+from src.adaptive import AdaptiveOfferDesigner
+from src.resume import ResumeState
+from src.trial_writer import TrialStreamWriter
+from src.utils import build_eefrt_offer_conditions, parse_offer_condition
+
+PROBS = [0.12, 0.50, 0.88]
+REWARDS = [1.24, 2.55, 4.30]
+
+
+def _schedule(n=12, seed=3):
+    return build_eefrt_offer_conditions(
+        n, ["offer"], seed=seed, probability_levels=PROBS, hard_reward_levels=REWARDS, enable_logging=False
+    )
+
+
+def _row(condition, block_id="block_0", designer=None, hard=True):
+    if designer is not None:
+        condition_shown = designer.assign(condition)
+    else:
+        condition_shown = condition
+    prob, reward, cond_id, planned, _fallback, _u = parse_offer_condition(condition_shown)
+    row = {
+        "block_id": block_id,
+        "planned_trial_index": planned,
+        "condition_label": cond_id,
+        "offer_probability": prob,
+        "offer_hard_reward": reward,
+        "offer_easy_reward": 1.0,
+        "choice_option": "hard" if hard else "easy",
+        "choice_forced": False,
+        "reward_amount": reward if hard else 1.0,
+    }
+    if designer is not None:
+        designer.update(probability=prob, hard_reward=reward, hard=hard)
+        row.update(designer.trial_columns())
+    return row
+
+
+def _write(tmp_path, rows):
+    path = tmp_path / "run.stream.jsonl"
+    writer = TrialStreamWriter(path)
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    return path
+
+
+def test_remaining_skips_completed_grid_trials(tmp_path):
+    schedule = _schedule()
+    path = _write(tmp_path, [_row(c) for c in schedule[:5]])
+    state = ResumeState.load(path)
+    assert state.remaining("block_0", schedule) == schedule[5:]
+    assert state.remaining("block_1", schedule) == schedule
+    assert state.total_reward == pytest.approx(sum(c[1] for c in schedule[:5]))
+
+
+def test_remaining_rejects_a_different_schedule(tmp_path):
+    path = _write(tmp_path, [_row(c) for c in _schedule(seed=3)[:5]])
+    with pytest.raises(ValueError, match="Resume schedule mismatch"):
+        ResumeState.load(path).remaining("block_0", _schedule(seed=4))
+
+
+def test_adaptive_rows_resume_and_replay(tmp_path):
+    schedule = _schedule()
+    designer = AdaptiveOfferDesigner(PROBS, REWARDS, seed=1, n_particles=500)
+    rows = [_row(c, designer=designer, hard=i % 3 != 0) for i, c in enumerate(schedule[:6])]
+    # the designer's offers rename the shown condition, so only the planned id still matches
+    assert any(row["condition_label"] != row["planned_condition_id"] for row in rows)
+    state = ResumeState.load(_write(tmp_path, rows))
+    assert state.remaining("block_0", schedule) == schedule[6:]
+
+    resumed = AdaptiveOfferDesigner(PROBS, REWARDS, seed=1, n_particles=500)
+    resumed.replay(state.rows)
+    assert resumed.n_updates == 6
+    prior = AdaptiveOfferDesigner(PROBS, REWARDS, seed=1, n_particles=500)
+    assert resumed.posterior()["design_bias_sd"] < prior.posterior()["design_bias_sd"]
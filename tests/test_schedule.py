@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.schedule import OfferSchedule, schedule_filename, schedule_key, session_schedule
+from src.utils import build_eefrt_offer_conditions
+
+CG = {"probability_levels": [0.12, 0.88], "hard_reward_levels": [1.24, 4.30], "enable_logging": False}
+SEEDS = [11, 12, 13]
+
+
+def _build(cg=CG, seeds=SEEDS, subject=""):
+    return OfferSchedule.build(cg, condition_labels=["offer"], trials_per_block=6, block_seeds=seeds, subject=subject)
+
+
+def _settings(seeds=SEEDS):
+    return SimpleNamespace(
+        conditions=["offer"],
+        trials_per_block=6,
+        block_seed=list(seeds),
+        seed_mode="same_across_sub",
+        subject_id="101",
+    )
+
+
+def test_blocks_match_direct_generation():
+    schedule = _build()
+    assert schedule.n_blocks == 3
+    for block_idx, seed in enumerate(SEEDS):
+        expected = build_eefrt_offer_conditions(6, ["offer"], seed=seed, **CG)
+        assert schedule.block(block_idx) == expected
+
+
+def test_save_load_round_trip(tmp_path):
+    schedule = _build()
+    path = schedule.save(tmp_path / schedule_filename(schedule.key))
+    loaded = OfferSchedule.load(path, expected_key=schedule.key)
+    assert loaded.key == schedule.key
+    for block_idx in range(schedule.n_blocks):
+        assert loaded.block(block_idx) == schedule.block(block_idx)
+    assert not list(tmp_path.glob("*.tmp.npz"))
+
+
+def test_load_rejects_other_key(tmp_path):
+    path = _build().save(tmp_path / "schedule.npz")
+    other = schedule_key(CG, condition_labels=["offer"], trials_per_block=6, block_seeds=[1, 2, 3])
+    with pytest.raises(ValueError, match="does not match"):
+        OfferSchedule.load(path, expected_key=other)
+
+
+def test_key_tracks_inputs():
+    base = _build().key
+    assert _build().key == base
+    assert _build(seeds=[11, 12, 14]).key != base
+    assert _build(cg={**CG, "randomize_order": False}).key != base
+    # sequential schedules ignore the subject; counter schedules are keyed on it
+    assert _build(subject="101").key == base
+    counter = {**CG, "rng": "counter"}
+    assert _build(cg=counter, subject="101").key != _build(cg=counter, subject="102").key
+
+
+def test_counter_rng_round_trip(tmp_path):
+    schedule = _build(cg={**CG, "rng": "counter"}, subject="101")
+    loaded = OfferSchedule.load(schedule.save(tmp_path / "s.npz"), expected_key=schedule.key)
+    assert [loaded.block(i) for i in range(3)] == [schedule.block(i) for i in range(3)]
+    np.testing.assert_array_equal(loaded.trial_index, np.tile(np.arange(1, 7), 3))
+
+
+def test_unknown_rng_raises():
+    with pytest.raises(ValueError, match="rng"):
+        _build(cg={**CG, "rng": "mersenne"})
+
+
+def test_session_schedule_saves_then_loads(tmp_path):
+    cg = {**CG, "schedule_dir": "schedules"}
+    built, source = session_schedule(_settings(), cg, task_root=tmp_path)
+    assert source == "saved"
+    assert (tmp_path / "schedules" / schedule_filename(built.key)).exists()
+    loaded, source = session_schedule(_settings(), cg, task_root=tmp_path)
+    assert source == "loaded"
+    assert [loaded.block(i) for i in range(3)] == [built.block(i) for i in range(3)]
+
+
+def test_session_schedule_without_dir_builds(tmp_path):
+    schedule, source = session_schedule(_settings(), CG, task_root=tmp_path)
+    assert source == "built"
+    assert schedule.key == _build().key
+    assert not any(tmp_path.iterdir())
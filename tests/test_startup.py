@@ -0,0 +1,81 @@
+import json
+
+from src.startup import LazyPreloader, StartupTimer, idle_scope, startup_report_path
+
+
+class _Window:
+    def __init__(self):
+        self.n_flips = 0
+        self._on_flip = []
+
+    def flip(self):
+        self.n_flips += 1
+        callbacks, self._on_flip = self._on_flip, []
+        for func, args in callbacks:
+            func(*args)
+        return float(self.n_flips)
+
+    def callOnFlip(self, func, *args):
+        self._on_flip.append((func, args))
+
+
+class _StimBank:
+    def __init__(self):
+        self.built = []
+
+    def get(self, name):
+        self.built.append(name)
+        return name
+
+
+def test_timer_marks_phases_and_report(tmp_path):
+    timer = StartupTimer(0.0)
+    first = timer.mark("window_ready")
+    assert timer.mark("window_ready") == first
+    with timer.phase("stim_bank"):
+        pass
+    with timer.phase("stim_bank"):
+        pass
+    win = _Window()
+    timer.mark_first_flip(win)
+    assert "first_flip" not in timer.marks
+    win.flip()
+    assert "first_flip" in timer.marks
+    timer.info["mode"] = "qa"
+    path = timer.write_report(startup_report_path(tmp_path / "sub-1.csv"))
+    assert path.name == "sub-1_startup.json"
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["mode"] == "qa"
+    assert set(report["phases_s"]) == {"stim_bank"}
+    assert set(report["marks_s"]) == {"window_ready", "first_flip"}
+    profile = timer.format_profile()
+    assert "stim_bank" in profile and "@first_flip" in profile
+
+
+def test_preloader_warms_only_inside_idle_scope():
+    win, bank, timer = _Window(), _StimBank(), StartupTimer(0.0)
+    preloader = LazyPreloader(win, bank, ["a", "b", "c"], budget_s=10.0, timer=timer)
+    win.flip()
+    assert bank.built == [] and not preloader.done
+    with idle_scope(preloader):
+        win.flip()
+    assert bank.built == ["a", "b", "c"]
+    assert preloader.done and preloader.n_warmed == 3
+    assert "stim_warm_complete" in timer.marks
+    # finished preloader unwraps the window's flip
+    assert win.flip == win.__class__.flip.__get__(win)
+
+
+def test_preloader_respects_the_frame_budget():
+    win, bank = _Window(), _StimBank()
+    preloader = LazyPreloader(win, bank, ["a", "b"], budget_s=0.0)
+    with preloader.idle():
+        win.flip()
+    assert bank.built == []
+    assert preloader.step(budget_s=10.0) == 2
+    assert preloader.done
+
+
+def test_idle_scope_without_preloader():
+    with idle_scope(None):
+        pass
@@ -0,0 +1,94 @@
+import csv
+
+import numpy as np
+import pytest
+
+from src.choice_fit import CHOICE_PARAMS, ChoiceData, fit_choice_model
+from src.stats import OfferStatsAccumulator, summary_path
+
+PROBS = [0.12, 0.50, 0.88]
+REWARDS = [1.24, 2.55, 4.30]
+TRUE_W = np.array([-0.8, 0.7, 1.5])
+
+
+def _rows(n_blocks=3, n_per_block=200, seed=4):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for b in range(n_blocks):
+        for t in range(n_per_block):
+            prob = float(rng.choice(PROBS))
+            hard_reward = float(rng.choice(REWARDS))
+            x = np.array([1.0, hard_reward - 1.0, prob - 0.5])
+            forced = bool(rng.random() < 0.05)
+            hard = bool(rng.random() < 1.0 / (1.0 + np.exp(-x @ TRUE_W)))
+            completed = bool(rng.random() < (0.6 if hard else 0.95))
+            win = completed and rng.random() < prob
+            rows.append(
+                {
+                    "block_id": f"block_{b}",
+                    "trial_index": t,
+                    "offer_probability": prob,
+                    "offer_hard_reward": hard_reward,
+                    "offer_easy_reward": 1.0,
+                    "choice_option": "hard" if hard else "easy",
+                    "choice_forced": forced,
+                    "effort_completed": completed,
+                    "reward_amount": (hard_reward if hard else 1.0) if win else 0.0,
+                }
+            )
+    return rows
+
+
+def _direct(rows):
+    n = len(rows)
+    return {
+        "n_trials": n,
+        "hard_rate": sum(r["choice_option"] == "hard" for r in rows) / n,
+        "completion_rate": sum(r["effort_completed"] for r in rows) / n,
+        "total_reward": sum(r["reward_amount"] for r in rows),
+    }
+
+
+def _accumulate(rows):
+    stats = OfferStatsAccumulator()
+    for row in rows:
+        stats.add(row)
+    return stats
+
+
+def test_block_and_session_summaries_match_recomputation():
+    rows = _rows()
+    stats = _accumulate(rows)
+    for block_id in ("block_0", "block_1", "block_2"):
+        expected = _direct([r for r in rows if r["block_id"] == block_id])
+        assert stats.block_summary(block_id) == pytest.approx(expected)
+    session = stats.session_summary()
+    assert {k: session[k] for k in _direct(rows)} == pytest.approx(_direct(rows))
+    assert session["fit_n"] == sum(not r["choice_forced"] for r in rows)
+    assert stats.block_summary("block_9")["n_trials"] == 0
+
+
+def test_cell_rows_match_recomputation(tmp_path):
+    rows = _rows(n_blocks=1)
+    stats = _accumulate(rows)
+    for cell in stats.cell_rows():
+        key = (cell["offer_probability"], cell["offer_hard_reward"])
+        subset = [r for r in rows if (r["offer_probability"], r["offer_hard_reward"]) == key]
+        assert {k: cell[k] for k in _direct(subset)} == pytest.approx(_direct(subset))
+
+    path = stats.write_summary_csv(summary_path(tmp_path / "sub-1.csv"))
+    with open(path, encoding="utf-8") as f:
+        written = list(csv.DictReader(f))
+    assert len(written) == 2 * len(PROBS) * len(REWARDS) + 1
+    assert written[-1]["scope"] == "session_total"
+    assert float(written[-1]["total_reward"]) == pytest.approx(_direct(rows)["total_reward"])
+    assert path.with_name("sub-1_summary_fit.csv").exists()
+
+
+def test_online_fit_tracks_batch_mle():
+    rows = _rows()
+    online = _accumulate(rows).session_summary()
+    batch = fit_choice_model(ChoiceData.from_rows({"s": rows}))
+    for i, name in enumerate(CHOICE_PARAMS):
+        assert online[f"fit_{name}"] == pytest.approx(batch.params[0, i], abs=0.5 * batch.se[0, i])
+        assert online[f"fit_{name}_se"] == pytest.approx(batch.se[0, i], rel=0.25)
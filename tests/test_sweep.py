@@ -0,0 +1,85 @@
+import json
+
+import pytest
+import yaml
+
+from src.sweep import (
+    CELL_STATUS_FILE,
+    CELL_TRIALS_FILE,
+    cell_id_for,
+    config_hash,
+    expand_grid,
+    merge_cells,
+    run_sweep,
+)
+
+
+def _write_cell(output_dir, point, base_hash, status="ok", n=2):
+    cell_dir = output_dir / cell_id_for(point)
+    cell_dir.mkdir(parents=True)
+    with open(cell_dir / CELL_STATUS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"cell_id": cell_dir.name, "point": point, "status": status, "config_hash": base_hash}, f)
+    rows = "\n".join(f"{i},{point['sim.seed'] * 10 + i}" for i in range(n))
+    (cell_dir / CELL_TRIALS_FILE).write_text(f"trial_index,reward_amount\n{rows}\n", encoding="utf-8")
+    return cell_dir
+
+
+def _spec(tmp_path, grid):
+    base = tmp_path / "base.yaml"
+    base.write_text(yaml.safe_dump({"sim": {"seed": 0}, "task": {"total_blocks": 1}}), encoding="utf-8")
+    spec = tmp_path / "grid.yaml"
+    spec.write_text(
+        yaml.safe_dump({"base_config": str(base), "output_dir": str(tmp_path / "out"), "max_workers": 1, "grid": grid}),
+        encoding="utf-8",
+    )
+    return spec, base
+
+
+def test_expand_grid_product_and_scalars():
+    points = expand_grid({"sim.seed": [0, 1], "task.overall_seed": 7, "sim.responder.kwargs.lapse_rate": [0.0, 0.1]})
+    assert len(points) == 4
+    assert {p["task.overall_seed"] for p in points} == {7}
+    assert points[0] == {"sim.seed": 0, "task.overall_seed": 7, "sim.responder.kwargs.lapse_rate": 0.0}
+
+
+def test_expand_grid_rejects_other_keys():
+    with pytest.raises(ValueError, match="Unsupported sweep key"):
+        expand_grid({"timing.iti_duration": [0.5]})
+
+
+def test_cell_id_is_stable_and_order_free():
+    assert cell_id_for({"a": 1, "b": 2}) == cell_id_for({"b": 2, "a": 1})
+    assert cell_id_for({"a": 1}) != cell_id_for({"a": 2})
+
+
+def test_rerun_skips_cells_of_the_same_base_config(tmp_path):
+    spec, base = _spec(tmp_path, {"sim.seed": [0, 1]})
+    for seed in (0, 1):
+        _write_cell(tmp_path / "out", {"sim.seed": seed}, config_hash(base))
+    statuses = run_sweep(spec, max_workers=1)
+    assert [s["status"] for s in statuses] == ["skipped", "skipped"]
+    assert (tmp_path / "out" / "sweep_results.csv").exists()
+
+
+def test_rerun_repeats_cells_when_base_config_changed(tmp_path):
+    spec, base = _spec(tmp_path, {"sim.seed": [0]})
+    _write_cell(tmp_path / "out", {"sim.seed": 0}, config_hash(base))
+    base.write_text(yaml.safe_dump({"sim": {"seed": 0}, "task": {"total_blocks": 2}}), encoding="utf-8")
+    statuses = run_sweep(spec, max_workers=1)
+    assert [s["status"] for s in statuses] != ["skipped"]
+    status = json.loads((tmp_path / "out" / cell_id_for({"sim.seed": 0}) / CELL_STATUS_FILE).read_text(encoding="utf-8"))
+    assert status["config_hash"] == config_hash(base)
+
+
+def test_merge_cells_keeps_finished_cells_of_the_current_config(tmp_path):
+    pd = pytest.importorskip("pandas")
+    points = {cell_id_for({"sim.seed": s}): {"sim.seed": s} for s in (0, 1, 2, 3)}
+    _write_cell(tmp_path, {"sim.seed": 0}, "current")
+    _write_cell(tmp_path, {"sim.seed": 1}, "current", n=3)
+    _write_cell(tmp_path, {"sim.seed": 2}, "current", status="failed")
+    _write_cell(tmp_path, {"sim.seed": 3}, "stale")
+    merged = pd.read_csv(merge_cells(tmp_path, points, "current"))
+    assert list(merged.columns[:2]) == ["cell_id", "sim.seed"]
+    assert merged["sim.seed"].tolist() == [0, 0, 1, 1, 1]
+    assert merged["reward_amount"].tolist() == [0, 1, 10, 11, 12]
+    assert len(pd.read_csv(merge_cells(tmp_path, points))) == 7
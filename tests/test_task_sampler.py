@@ -0,0 +1,183 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("psyflow.sim")
+
+from psyflow.sim.contracts import Observation  # noqa: E402
+
+from responders import SamplerBatch, TaskSamplerResponder  # noqa: E402
+
+N = 20000
+OFFER = {
+    "offer_probability": 0.88,
+    "offer_hard_reward": 2.55,
+    "offer_easy_reward": 1.0,
+    "easy_required_presses": 8,
+    "hard_required_presses": 14,
+}
+
+
+def _choice_obs():
+    return Observation(
+        mode="sim",
+        trial_id=1,
+        block_id="block_0",
+        phase="offer_choice",
+        valid_keys=["f", "j"],
+        deadline_s=4.0,
+        response_window_open=True,
+        response_window_s=4.0,
+        condition_id="c",
+        task_factors={"stage": "offer_choice", **OFFER},
+        stim_id="choice_layout",
+    )
+
+
+def _effort_obs(choice_option):
+    return Observation(
+        mode="sim",
+        trial_id=1,
+        block_id="block_0",
+        phase="effort_execution_window",
+        valid_keys=["space"],
+        deadline_s=7.0,
+        response_window_open=True,
+        response_window_s=7.0,
+        condition_id="c",
+        task_factors={"stage": "effort_execution_window", "choice_option": choice_option, "required_presses": 8},
+        stim_id="effort_stage",
+    )
+
+
+def _scalar_stats(responder, n, seed):
+    responder.start_session(None, np.random.default_rng(seed))
+    actions = [responder.act(_choice_obs()) for _ in range(n)]
+    chosen = [a for a in actions if a.key is not None]
+    rates = [responder.act(_effort_obs("easy")).meta.get("press_rate_hz") for _ in range(n)]
+    return {
+        "lapse": np.array([a.key is None for a in actions]),
+        "hard": np.array([a.key == responder.hard_key for a in chosen]),
+        "rt": np.array([a.rt_s for a in chosen]),
+        "effort_lapse": np.array([r is None for r in rates]),
+        "rate": np.array([r for r in rates if r is not None]),
+    }
+
+
+def _batch_stats(batch, executed_easy):
+    chosen = batch.choice >= 0
+    rate = batch.press_rate_hz[executed_easy]
+    return {
+        "lapse": ~chosen,
+        "hard": batch.choice[chosen] == 1,
+        "rt": batch.rt_s[chosen],
+        "effort_lapse": np.isnan(rate),
+        "rate": rate[~np.isnan(rate)],
+    }
+
+
+def _assert_same_distribution(scalar, batch):
+    """Means of every per-draw sample agree within 4 standard errors of their difference."""
+    for key in ("lapse", "hard", "rt", "effort_lapse", "rate"):
+        a, b = scalar[key].astype(float), batch[key].astype(float)
+        se = np.sqrt(a.var() / a.size + b.var() / b.size) + 1e-9
+        assert abs(a.mean() - b.mean()) < 4 * se, (key, a.mean(), b.mean())
+
+
+def test_act_batch_matches_scalar_act():
+    responder = TaskSamplerResponder(lapse_rate=0.1, hard_choice_bias=0.2)
+    batch = responder.act_batch(
+        np.full(N, OFFER["offer_probability"]),
+        OFFER["offer_hard_reward"],
+        OFFER["offer_easy_reward"],
+        OFFER["easy_required_presses"],
+        OFFER["hard_required_presses"],
+        rng=np.random.default_rng(1),
+    )
+    executed_easy = batch.choice != 1  # lapses fall back to easy without `fallback_hard`
+    _assert_same_distribution(_scalar_stats(responder, N, seed=2), _batch_stats(batch, executed_easy))
+    assert batch.p_hard == pytest.approx(np.full(N, batch.p_hard[0]))
+
+
+def test_act_batch_per_agent_params_match_scalar_agents():
+    agents = [
+        {"hard_choice_bias": -1.0, "lapse_rate": 0.0, "choice_rt_mean_s": 0.35, "base_press_rate_hz": 6.0},
+        {"hard_choice_bias": 1.0, "lapse_rate": 0.2, "choice_rt_mean_s": 0.60, "base_press_rate_hz": 9.0},
+    ]
+    group = np.arange(N) % 2
+    params = {key: np.array([agent[key] for agent in agents])[group] for key in agents[0]}
+    batch = TaskSamplerResponder().act_batch(
+        np.full(N, OFFER["offer_probability"]),
+        OFFER["offer_hard_reward"],
+        OFFER["offer_easy_reward"],
+        OFFER["easy_required_presses"],
+        OFFER["hard_required_presses"],
+        params=params,
+        rng=np.random.default_rng(3),
+    )
+    for g, agent in enumerate(agents):
+        sel = group == g
+        sub = SamplerBatch(**{name: getattr(batch, name)[sel] for name in ("choice", "rt_s", "p_hard", "press_rate_hz")})
+        scalar = _scalar_stats(TaskSamplerResponder(**agent), N // 2, seed=10 + g)
+        _assert_same_distribution(scalar, _batch_stats(sub, sub.choice != 1))
+
+
+def test_act_batch_rejects_unknown_params():
+    with pytest.raises(ValueError, match="Unsupported act_batch params"):
+        TaskSamplerResponder().act_batch(0.5, 2.0, params={"press_ipi_cv": 0.2})
+
+
+def test_simulate_presses_respects_requirement_and_deadline():
+    responder = TaskSamplerResponder(effort_model="renewal")
+    n = 5000
+    rng = np.random.default_rng(4)
+    rate = rng.uniform(2.0, 10.0, n)
+    required = rng.choice([8, 14, 30], n)
+    deadline = rng.uniform(1.0, 7.0, n)
+    batch = responder.simulate_presses(rate, required, deadline, rng=rng, return_times=True)
+
+    assert (batch.press_count <= required).all()
+    counts = np.isfinite(batch.times_s).sum(axis=1)
+    np.testing.assert_array_equal(counts, batch.press_count)
+    pressed = batch.press_count > 0
+    last = batch.times_s[pressed, batch.press_count[pressed] - 1]
+    assert (last <= deadline[pressed]).all()
+    gaps = np.diff(batch.times_s, axis=1)
+    assert (gaps[np.isfinite(gaps)] > 0).all()
+    np.testing.assert_array_equal(batch.first_rt_s[pressed], batch.times_s[pressed, 0])
+
+    np.testing.assert_array_equal(batch.completed, batch.press_count == required)
+    assert 0 < batch.completed.mean() < 1
+    done = np.nonzero(batch.completed)[0]
+    np.testing.assert_array_equal(batch.time_to_criterion_s[done], batch.times_s[done, required[done] - 1])
+    assert np.isnan(batch.time_to_criterion_s[~batch.completed]).all()
+
+
+def test_simulate_presses_nan_rate_produces_no_presses():
+    responder = TaskSamplerResponder(effort_model="renewal")
+    batch = responder.simulate_presses(
+        np.array([np.nan, 6.0, np.nan]), 8, 7.0, rng=np.random.default_rng(5), return_times=True
+    )
+    np.testing.assert_array_equal(batch.press_count, [0, 8, 0])
+    np.testing.assert_array_equal(batch.completed, [False, True, False])
+    assert np.isnan(batch.first_rt_s[[0, 2]]).all()
+    assert np.isnan(batch.time_to_criterion_s[[0, 2]]).all()
+    assert np.isnan(batch.times_s[[0, 2]]).all()
+
+
+def test_simulate_presses_chunking_and_per_agent_params():
+    responder = TaskSamplerResponder(effort_model="renewal")
+    args = (np.full(1000, 7.0), 14, 7.0)
+    whole = responder.simulate_presses(*args, rng=np.random.default_rng(6))
+    chunked = responder.simulate_presses(*args, rng=np.random.default_rng(6), chunk_size=1000)
+    np.testing.assert_array_equal(whole.press_count, chunked.press_count)
+
+    tired = responder.simulate_presses(
+        np.full(1000, 7.0),
+        14,
+        3.0,
+        params={"fatigue_per_press": np.r_[np.zeros(500), np.full(500, 0.2)]},
+        rng=np.random.default_rng(7),
+    )
+    assert tired.completed[:500].mean() > 0.9 > 0.1 > tired.completed[500:].mean()
+    with pytest.raises(ValueError, match="Unsupported simulate_presses params"):
+        responder.simulate_presses(*args, params={"lapse_rate": 0.1})
@@ -0,0 +1,50 @@
+import csv
+
+from src.trial_writer import TrialStreamWriter, iter_stream, stream_path
+
+
+def test_stream_round_trip_to_csv(tmp_path):
+    res = tmp_path / "sub-qa.csv"
+    writer = TrialStreamWriter(stream_path(res))
+    writer.write({"trial_index": 0, "choice_option": "hard", "reward_amount": 2.5})
+    writer.write({"trial_index": 1, "choice_option": "easy", "reward_amount": None, "extra": True})
+    writer.finalize_csv(res)
+
+    with open(res, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["trial_index", "choice_option", "reward_amount", "extra"]
+    assert [r["choice_option"] for r in rows] == ["hard", "easy"]
+    assert rows[1]["reward_amount"] == ""
+    assert not stream_path(res).exists()
+
+
+def test_fresh_writer_truncates_stale_stream(tmp_path):
+    path = tmp_path / "qa_trace.stream.jsonl"
+    stale = TrialStreamWriter(path)
+    stale.write({"trial_index": 0, "stale_column": 1})
+    stale.close()
+
+    writer = TrialStreamWriter(path)
+    writer.write({"trial_index": 0})
+    writer.close()
+    assert list(iter_stream(path)) == [{"trial_index": 0}]
+    assert writer.columns == ["trial_index"]
+
+
+def test_resume_appends_to_same_stream(tmp_path):
+    path = tmp_path / "run.stream.jsonl"
+    first = TrialStreamWriter(path)
+    first.write({"trial_index": 0, "a": 1})
+    first.close()
+
+    resumed = TrialStreamWriter(path, resume=True)
+    resumed.write({"trial_index": 1, "b": 2})
+    resumed.close()
+    assert [row["trial_index"] for row in iter_stream(path)] == [0, 1]
+    assert resumed.columns == ["trial_index", "a", "b"]
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "run.stream.jsonl"
+    path.write_text('{"trial_index": 0}\n{"trial_in', encoding="utf-8")
+    assert list(iter_stream(path)) == [{"trial_index": 0}]
@@ -0,0 +1,34 @@
+import json
+
+from src.triggers import AsyncTriggerRuntime
+
+
+class _Recorder:
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    def send(self, code):
+        self.sent.append(code)
+
+    def close(self):
+        self.closed = True
+
+
+def test_trial_columns_exclude_sends_before_the_trial():
+    runtime = AsyncTriggerRuntime(_Recorder())
+    try:
+        runtime.send(98)  # exp_onset
+        runtime.send(100)  # block_onset
+        outside = runtime.begin_trial()
+        runtime.send(1)
+        runtime.send(None)
+        runtime.send(2)
+        columns = runtime.trial_columns()
+    finally:
+        runtime.close()
+    assert [r["code"] for r in outside] == [98, 100]
+    assert columns["trigger_n"] == 2
+    assert [r["code"] for r in json.loads(columns["trigger_log"])] == [1, 2]
+    assert runtime.runtime.sent == [98, 100, 1, 2]
+    assert runtime.runtime.closed